@@ -7,11 +7,16 @@ import glob
 import time
 from threading import Thread
 
+import baudNegotiation
+
 class SerialClient:
-    def __init__(self):
+    def __init__(self, baudrate=baudNegotiation.BASE_BAUDRATE, negotiate_baud=True):
         self.port_mapping = {}
         self.connected = False
         self.running = True
+        self.baudrate = baudrate
+        self.negotiate_baud = negotiate_baud  # PC 의 UART 속도 협상 요청에 응답
+        self.link_result = None
         print("Client initialized")
     
     def save_port_mapping(self):
@@ -28,7 +33,7 @@ class SerialClient:
             # 시리얼 포트 설정 추가
             ser = serial.Serial(
                 port=port_name,
-                baudrate=9600,
+                baudrate=self.baudrate,
                 bytesize=serial.EIGHTBITS,
                 parity=serial.PARITY_NONE,
                 stopbits=serial.STOPBITS_ONE,
@@ -52,6 +57,11 @@ class SerialClient:
                         self.port_mapping[port_name] = "PC"
                         self.save_port_mapping()
                         self.connected = True
+
+                        # UART 속도 협상 (PC 가 지원하지 않으면 기본 속도 유지)
+                        if self.negotiate_baud:
+                            self.link_result = baudNegotiation.negotiate_responder(
+                                ser, base_baudrate=self.baudrate)
                         
                         # 5초 카운트다운 전송
                         print("Starting countdown")
@@ -7,11 +7,16 @@ import datetime
 import time
 from threading import Thread
 
+import baudNegotiation
+
 class SerialServer:
-    def __init__(self):
+    def __init__(self, baudrate=baudNegotiation.BASE_BAUDRATE, negotiate_baud=True):
         self.port_mapping = {}
         self.connected_devices = {}
         self.running = True
+        self.baudrate = baudrate
+        self.negotiate_baud = negotiate_baud  # 핸드셰이크 후 더 빠른 UART 속도 협상
+        self.link_results = {}
         print("Server initialized")
     
     def save_port_mapping(self):
@@ -36,7 +41,7 @@ class SerialServer:
         # 시리얼 포트 설정 및 열기
             ser = serial.Serial(
                 port=port_name,
-                baudrate=9600,
+                baudrate=self.baudrate,
                 bytesize=serial.EIGHTBITS,
                 parity=serial.PARITY_NONE,
                 stopbits=serial.STOPBITS_ONE,
@@ -61,6 +66,11 @@ class SerialServer:
                         print(f"Handshake successful on {port_name}")
                         self.port_mapping[port_name] = "Raspi4"
                         self.save_port_mapping()
+
+                        # UART 속도 협상
+                        if self.negotiate_baud:
+                            self.link_results[port_name] = baudNegotiation.negotiate_initiator(
+                                ser, base_baudrate=self.baudrate)
                     
                         # 데이터 수신 대기
                         while self.running:
@@ -5,6 +5,9 @@ from threading import Thread
 from typing import Callable, Optional
 
 import serial
+
+import picoProtocol
+
 class SerialHandler:
     def __init__(self, port='COM4', baudrate=9600):
         self.port = port
@@ -13,10 +16,16 @@ class SerialHandler:
         self.is_running = False
         self.serial_thread = None
         self.data_callback = None
+        self.message_callback = None
+        self.parser = picoProtocol.LineParser()
         
     def set_callback(self, callback):
         self.data_callback = callback
         self._log_to_callback("[Serial] Callback function registered")
+
+    def set_message_callback(self, callback):
+        """파싱된 Pico 메시지(picoProtocol.Message)를 받을 콜백"""
+        self.message_callback = callback
     
     def _log_to_callback(self, message):
         if self.data_callback:
@@ -31,11 +40,23 @@ class SerialHandler:
                 
                 while self.is_running:
                     if self.serial_connection.in_waiting > 0:
-                        data = self.serial_connection.readline().decode('utf-8').strip()
+                        raw = self.serial_connection.readline()
+                        message = self.parser.parse(raw)
+                        data = raw.decode('utf-8', errors='replace').strip()
+                        if message is None:
+                            # 잘못된 줄은 parser 의 counters / dead_letters 에도 기록됨. 빈 줄은 표시하지 않음
+                            if data:
+                                reason = self.parser.dead_letters[-1][0] if self.parser.dead_letters else 'unknown'
+                                self._log_to_callback(f"[Serial] Rejected ({reason}): {data}")
+                            continue
+                        if self.message_callback:
+                            self.message_callback(message)
                         self._log_to_callback(f"[Serial] Received: {data}")
                         
         except serial.SerialException as e:
             self._log_to_callback(f"[Serial] Error: {e}")
+        finally:
+            self._log_to_callback(f"[Serial] Line stats: {self.parser.summary()}")
             
     def start(self):
         if self.is_running:
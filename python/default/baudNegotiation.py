@@ -0,0 +1,217 @@
+## PC(SerialServer) 와 Raspberry Pi 4(SerialClient) 사이의 UART 속도 협상 모듈입니다.
+## 핸드셰이크(PC_HELLO / RASPI4_HELLO) 직후 양쪽이 같은 순서로 호출해야 합니다.
+##
+## 프로토콜 (모든 메시지는 '\n' 으로 끝나는 한 줄)
+##   PC  -> Pi : BAUD_TRY <rate>        (기본 속도에서 전송)
+##   Pi  -> PC : BAUD_OK <rate>         (기본 속도에서 전송 후 Pi 가 <rate> 로 전환)
+##   PC  -> Pi : PROBE <seq> <payload> <crc32>   (새 속도, Pi 는 그대로 되돌려줌)
+##   PC  -> Pi : BAUD_COMMIT <rate>  /  Pi -> PC : BAUD_COMMITTED <rate>
+##   PC  -> Pi : BAUD_FAIL <rate>       (오류율 초과, 양쪽 모두 기본 속도로 복귀)
+##   PC  -> Pi : BAUD_KEEP <rate>       (협상 종료, 기본 속도 유지)
+## Pi 는 시험 속도에서 일정 시간 유효한 줄을 받지 못하면 스스로 기본 속도로 복귀합니다.
+
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+BASE_BAUDRATE = 9600
+CANDIDATE_BAUDRATES = (921600, 460800, 115200)
+
+PROBE_COUNT = 20
+PROBE_PAYLOAD_SIZE = 48
+MAX_ERROR_RATE = 0.05
+
+REPLY_TIMEOUT = 2.0      # BAUD_OK / BAUD_COMMITTED 응답 대기 시간
+TRIAL_TIMEOUT = 1.5      # Pi 가 시험 속도에서 유효한 줄 없이 버티는 시간
+RESPONDER_IDLE = 3.0     # Pi 가 협상 시작(BAUD_TRY)을 기다리는 시간
+SWITCH_SETTLE = 0.05     # 속도 전환 후 라인 안정화 대기
+LINE_TIMEOUT = 0.2       # 협상 중 readline 타임아웃
+
+
+@dataclass
+class NegotiationResult:
+    """협상 결과 (최종 속도, 측정 오류율, 측정 처리량)"""
+    baudrate: int
+    error_rate: float = 0.0
+    throughput: float = 0.0  # bytes/s, PROBE 왕복 기준
+    negotiated: bool = False
+
+    def summary(self) -> str:
+        if not self.negotiated:
+            return f"kept {self.baudrate} baud (no faster rate agreed)"
+        if not self.throughput:
+            return f"{self.baudrate} baud"
+        nominal = self.baudrate / 10  # 8N1 = 10 bit/byte
+        return (f"{self.baudrate} baud, error rate {self.error_rate:.1%}, "
+                f"throughput {self.throughput:.0f} B/s ({self.throughput / nominal:.0%} of nominal)")
+
+
+def _probe_line(seq: int) -> bytes:
+    """PROBE 한 줄 생성. payload 는 seq 에 따라 달라지는 hex 문자열"""
+    seed = f"{seq:08d}".encode()
+    payload = (zlib.crc32(seed).to_bytes(4, 'big') * PROBE_PAYLOAD_SIZE)[:PROBE_PAYLOAD_SIZE // 2].hex()
+    crc = zlib.crc32(payload.encode())
+    return f"PROBE {seq} {payload} {crc:08x}\n".encode()
+
+
+def _valid_probe(line: str) -> bool:
+    parts = line.split()
+    if len(parts) != 4 or parts[0] != "PROBE":
+        return False
+    try:
+        return zlib.crc32(parts[2].encode()) == int(parts[3], 16)
+    except ValueError:
+        return False
+
+
+def _readline(ser) -> str:
+    try:
+        return ser.readline().decode('utf-8', errors='replace').strip()
+    except Exception:
+        return ""
+
+
+def _write(ser, message: str) -> None:
+    ser.write(f"{message}\n".encode())
+    ser.flush()  # 속도 전환 전에 송신 버퍼를 모두 내보냄
+
+
+def _switch(ser, baudrate: int) -> None:
+    ser.baudrate = baudrate
+    time.sleep(SWITCH_SETTLE)
+    ser.reset_input_buffer()
+
+
+def _wait_for(ser, expected: str, timeout: float, resend: Optional[str] = None) -> bool:
+    """expected 로 시작하는 줄을 timeout 동안 기다림. resend 가 있으면 주기적으로 재전송"""
+    deadline = time.time() + timeout
+    next_send = 0.0
+    while time.time() < deadline:
+        if resend and time.time() >= next_send:
+            _write(ser, resend)
+            next_send = time.time() + 0.5
+        if _readline(ser) == expected:
+            return True
+    return False
+
+
+def _measure(ser, probe_count: int) -> tuple[float, float]:
+    """PROBE 왕복으로 오류율과 처리량 측정"""
+    errors = 0
+    transferred = 0
+    started = time.perf_counter()
+    for seq in range(probe_count):
+        probe = _probe_line(seq)
+        ser.write(probe)
+        echo = ser.readline()
+        transferred += len(probe) + len(echo)
+        if echo != probe:
+            errors += 1
+    elapsed = time.perf_counter() - started
+    return errors / probe_count, transferred / elapsed if elapsed > 0 else 0.0
+
+
+def negotiate_initiator(ser,
+                        candidates: Iterable[int] = CANDIDATE_BAUDRATES,
+                        base_baudrate: int = BASE_BAUDRATE,
+                        probe_count: int = PROBE_COUNT,
+                        max_error_rate: float = MAX_ERROR_RATE,
+                        log: Callable[[str], None] = print) -> NegotiationResult:
+    """
+    PC 쪽 협상. 빠른 속도부터 시험하고 오류율이 허용치 이하인 첫 속도로 확정합니다.
+    상대가 협상을 지원하지 않으면 (첫 BAUD_OK 무응답) 기본 속도를 유지합니다.
+    """
+    original_timeout = ser.timeout
+    ser.timeout = LINE_TIMEOUT
+    result = NegotiationResult(baudrate=base_baudrate)
+    try:
+        for rate in sorted(set(candidates), reverse=True):
+            if rate <= base_baudrate:
+                continue
+
+            if not _wait_for(ser, f"BAUD_OK {rate}", REPLY_TIMEOUT, resend=f"BAUD_TRY {rate}"):
+                log(f"[Baud] No reply to BAUD_TRY {rate}, peer does not support negotiation")
+                break
+
+            _switch(ser, rate)
+            error_rate, throughput = _measure(ser, probe_count)
+            log(f"[Baud] {rate} baud: error rate {error_rate:.1%}, {throughput:.0f} B/s")
+
+            if error_rate <= max_error_rate and _wait_for(
+                    ser, f"BAUD_COMMITTED {rate}", REPLY_TIMEOUT, resend=f"BAUD_COMMIT {rate}"):
+                result = NegotiationResult(rate, error_rate, throughput, negotiated=True)
+                break
+
+            # 실패: 양쪽 모두 기본 속도로 복귀. FAIL 이 유실돼도 Pi 는 TRIAL_TIMEOUT 후 복귀함
+            _write(ser, f"BAUD_FAIL {rate}")
+            _switch(ser, base_baudrate)
+            time.sleep(TRIAL_TIMEOUT)
+        else:
+            _write(ser, f"BAUD_KEEP {base_baudrate}")
+
+        if not result.negotiated and ser.baudrate != base_baudrate:
+            _switch(ser, base_baudrate)
+    finally:
+        ser.timeout = original_timeout
+
+    log(f"[Baud] Negotiated link: {result.summary()}")
+    return result
+
+
+def _run_trial(ser, rate: int, base_baudrate: int) -> bool:
+    """시험 속도에서 PROBE 를 되돌려주고 COMMIT 여부를 반환"""
+    _switch(ser, rate)
+    deadline = time.time() + TRIAL_TIMEOUT
+    committed = False
+    while time.time() < deadline:
+        raw = ser.readline()
+        line = raw.decode('utf-8', errors='replace').strip()
+        if not line:
+            continue
+        if _valid_probe(line):
+            ser.write(raw)
+            deadline = time.time() + TRIAL_TIMEOUT
+        elif line == f"BAUD_COMMIT {rate}":
+            _write(ser, f"BAUD_COMMITTED {rate}")
+            committed = True
+            # 응답이 유실되면 PC 가 COMMIT 을 재전송하므로 잠시 더 응답함
+            deadline = time.time() + LINE_TIMEOUT * 3
+        elif line.startswith("BAUD_FAIL"):
+            break
+    if not committed:
+        _switch(ser, base_baudrate)
+    return committed
+
+
+def negotiate_responder(ser,
+                        base_baudrate: int = BASE_BAUDRATE,
+                        idle_timeout: float = RESPONDER_IDLE,
+                        log: Callable[[str], None] = print) -> NegotiationResult:
+    """
+    Raspberry Pi 쪽 협상. idle_timeout 동안 BAUD_TRY 가 없으면 기본 속도로 진행합니다.
+    """
+    original_timeout = ser.timeout
+    ser.timeout = LINE_TIMEOUT
+    result = NegotiationResult(baudrate=base_baudrate)
+    try:
+        deadline = time.time() + idle_timeout
+        while time.time() < deadline:
+            line = _readline(ser)
+            if line.startswith("BAUD_TRY "):
+                try:
+                    rate = int(line.split()[1])
+                except ValueError:
+                    continue
+                _write(ser, f"BAUD_OK {rate}")
+                if _run_trial(ser, rate, base_baudrate):
+                    result = NegotiationResult(rate, negotiated=True)
+                    break
+                deadline = time.time() + idle_timeout
+            elif line.startswith("BAUD_KEEP"):
+                break
+    finally:
+        ser.timeout = original_timeout
+
+    log(f"[Baud] Link speed: {result.summary()}")
+    return result
@@ -0,0 +1,267 @@
+## Raspberry Pi 4 에서 동작하는 시리얼 -> TCP 브리지입니다.
+## Pico 의 UART 데이터를 읽어 레코드로 파싱하고, 묶음(batch)으로 PC 의 TCP 서버에 전송합니다.
+## 시나리오마다 read-parse-send 루프를 새로 만들지 않고 설정만 바꿔 사용합니다.
+##
+##   sn3 (DHT)    : python serialBridge.py --source sn3 --framing csv --fields temperature,humidity
+##   sn2 (ADC)    : python serialBridge.py --source sn2 --framing raw --fields adc_value
+##   sn1 (status) : python serialBridge.py --source sn1 --port /dev/ttyACM0 --framing json
+##
+## PC 로는 한 줄에 한 묶음씩 JSON 으로 전송합니다.
+##   {"source": "sn3", "count": 2, "dropped": 0, "records": [{"ts": ..., "temperature": 23.5, ...}, ...]}
+
+import argparse
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import serial
+
+import socketCommunication
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def parse_csv(line: str, fields: List[str]) -> Optional[Dict[str, Any]]:
+    """'23.5,45.0' 형식. 값이 숫자가 아니면 (예: 'ERROR,ERROR') 잘못된 레코드"""
+    values = line.split(',')
+    if len(values) != len(fields):
+        return None
+    try:
+        return {name: float(value) for name, value in zip(fields, values)}
+    except ValueError:
+        return None
+
+
+def parse_json(line: str, fields: List[str]) -> Optional[Dict[str, Any]]:
+    """JSON 객체 한 줄. 'TEST MESSAGE' 같은 다른 줄은 건너뜀"""
+    if not line.startswith('{'):
+        return None
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(record, dict):
+        return None
+    return {name: record.get(name) for name in fields} if fields else record
+
+
+def parse_raw(line: str, fields: List[str]) -> Optional[Dict[str, Any]]:
+    """한 줄에 값 하나. 숫자면 숫자로 변환"""
+    name = fields[0] if fields else 'value'
+    try:
+        return {name: float(line) if '.' in line else int(line)}
+    except ValueError:
+        return {name: line}
+
+
+FRAMINGS: Dict[str, Callable[[str, List[str]], Optional[Dict[str, Any]]]] = {
+    'csv': parse_csv,
+    'json': parse_json,
+    'raw': parse_raw,
+}
+
+# --fields 를 생략했을 때 framing 별 기본 필드 (json 은 비워서 레코드 전체를 그대로 전달)
+DEFAULT_FIELDS = {
+    'csv': 'temperature,humidity',
+    'json': '',
+    'raw': 'value',
+}
+
+
+class SerialBridge:
+    """
+    reader 스레드(시리얼 -> 큐)와 sender 스레드(큐 -> TCP) 로 구성됩니다.
+    큐가 가득 차면 overflow 정책에 따라 reader 가 대기(block)하거나 가장 오래된 레코드를 버립니다(drop-oldest).
+    TCP 전송이 실패하면 현재 묶음을 보관하고 재시도하므로, 연결이 끊긴 동안에는 큐가 차면서 압력이 reader 로 전달됩니다.
+    """
+
+    def __init__(self, tcp_client: socketCommunication.TCPClient,
+                 serial_port: str = '/dev/serial0', baud_rate: int = 9600,
+                 source: str = 'pico', framing: str = 'csv', fields: Optional[List[str]] = None,
+                 batch_size: int = 20, batch_interval: float = 1.0,
+                 queue_size: int = 1000, overflow: str = 'drop-oldest',
+                 retry_delay: float = 1.0):
+        if framing not in FRAMINGS:
+            raise ValueError(f"Unknown framing: {framing}")
+        if overflow not in ('block', 'drop-oldest'):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+
+        self.tcp_client = tcp_client
+        self.serial_port = serial_port
+        self.baud_rate = baud_rate
+        self.source = source
+        self.parse = FRAMINGS[framing]
+        self.fields = fields or []
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.overflow = overflow
+        self.retry_delay = retry_delay
+
+        self.records: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.stop_event = threading.Event()
+        self.ser: Optional[serial.Serial] = None
+        self._threads: List[threading.Thread] = []
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'lines': 0, 'records': 0, 'parse_errors': 0,
+            'batches_sent': 0, 'records_sent': 0, 'send_failures': 0, 'dropped': 0,
+        }
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def start(self) -> None:
+        self.ser = serial.Serial(self.serial_port, self.baud_rate, timeout=1)
+        logger.info(f"[Bridge] Reading {self.serial_port} at {self.baud_rate} baud")
+        for target in (self._reader_loop, self._sender_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=5.0)
+        if self.ser and self.ser.is_open:
+            self.ser.close()
+        logger.info(f"[Bridge] Stopped. {self.stats}")
+
+    def _enqueue(self, record: Dict[str, Any]) -> None:
+        if self.overflow == 'block':
+            while not self.stop_event.is_set():
+                try:
+                    self.records.put(record, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+            return
+
+        while True:
+            try:
+                self.records.put_nowait(record)
+                return
+            except queue.Full:
+                try:
+                    self.records.get_nowait()
+                    self._count('dropped')
+                except queue.Empty:
+                    pass
+
+    def _reader_loop(self) -> None:
+        while not self.stop_event.is_set():
+            try:
+                # readline 은 줄이 들어오거나 timeout 까지 대기하므로 in_waiting 폴링이 필요 없음
+                raw = self.ser.readline()
+            except serial.SerialException as e:
+                logger.error(f"[Bridge] Serial error: {e}")
+                self.stop_event.wait(self.retry_delay)
+                continue
+            if not raw:
+                continue
+
+            self._count('lines')
+            line = raw.decode('utf-8', errors='replace').strip()
+            record = self.parse(line, self.fields) if line else None
+            if record is None:
+                self._count('parse_errors')
+                logger.debug(f"[Bridge] Skipped line: {line!r}")
+                continue
+
+            record['ts'] = time.time()
+            self._count('records')
+            self._enqueue(record)
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        """batch_size 개가 모이거나 batch_interval 이 지날 때까지 레코드를 모음"""
+        batch = []
+        deadline = time.monotonic() + self.batch_interval
+        while len(batch) < self.batch_size and not self.stop_event.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.records.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _sender_loop(self) -> None:
+        pending: List[Dict[str, Any]] = []
+        while not self.stop_event.is_set():
+            if not pending:
+                pending = self._next_batch()
+                if not pending:
+                    continue
+
+            with self._stats_lock:
+                dropped = self.stats['dropped']
+            message = {
+                'source': self.source,
+                'count': len(pending),
+                'dropped': dropped,
+                'records': pending,
+            }
+            payload = (json.dumps(message) + "\n").encode()
+
+            if self.tcp_client.send_bytes(payload):
+                self._count('batches_sent')
+                self._count('records_sent', len(pending))
+                pending = []
+            else:
+                # 묶음을 보관한 채 재시도. 그동안 큐가 차면 overflow 정책이 적용됨
+                self._count('send_failures')
+                self.stop_event.wait(self.retry_delay)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serial -> TCP bridge for Pico sensor data")
+    parser.add_argument('--port', default='/dev/serial0')
+    parser.add_argument('--baud', type=int, default=9600)
+    parser.add_argument('--host', default='192.168.0.2')
+    parser.add_argument('--tcp-port', type=int, default=12345)
+    parser.add_argument('--source', default='pico', help="PC 에서 데이터를 구분할 이름")
+    parser.add_argument('--framing', choices=sorted(FRAMINGS), default='csv')
+    parser.add_argument('--fields', default=None,
+                        help="쉼표로 구분한 필드 이름. 생략하면 framing 별 기본값 "
+                             "(csv: temperature,humidity / raw: value / json: 전체 필드)")
+    parser.add_argument('--batch-size', type=int, default=20)
+    parser.add_argument('--batch-interval', type=float, default=1.0, help="묶음 최대 대기 시간(초)")
+    parser.add_argument('--queue-size', type=int, default=1000)
+    parser.add_argument('--overflow', choices=('block', 'drop-oldest'), default='drop-oldest')
+    parser.add_argument('--stats-interval', type=float, default=30.0)
+    args = parser.parse_args()
+    fields = DEFAULT_FIELDS[args.framing] if args.fields is None else args.fields
+
+    tcp_client = socketCommunication.TCPClient(args.host, args.tcp_port)
+    if not tcp_client.start():
+        logger.error("Failed to establish TCP connection")
+        return
+
+    bridge = SerialBridge(
+        tcp_client, serial_port=args.port, baud_rate=args.baud, source=args.source,
+        framing=args.framing, fields=[f for f in fields.split(',') if f],
+        batch_size=args.batch_size, batch_interval=args.batch_interval,
+        queue_size=args.queue_size, overflow=args.overflow)
+    bridge.start()
+
+    try:
+        while True:
+            time.sleep(args.stats_interval)
+            logger.info(f"[Bridge] {bridge.stats}, queued={bridge.records.qsize()}")
+    except KeyboardInterrupt:
+        logger.info("Bridge shutting down...")
+    finally:
+        bridge.stop()
+        tcp_client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+## 시리얼 수신 코드의 처리량/지연 벤치마크입니다. (Linux 전용, serialSimulator 의 pty 사용)
+## 보드 없이 PC 나 Pi 에서 실행할 수 있으며, 폴링 루프 교체 전/후 수치를 비교하는 용도입니다.
+##
+##   python serialBenchmark.py --label before --json bench_results.json
+##   python serialBenchmark.py --targets sensor_reader --rates 10 100 1000 --sizes 16 64
+##
+## 대상
+##   serial_handler : Server_socket.SerialHandler (메시지 콜백까지의 지연)
+##   serial_server  : Server_portlistener.SerialServer.handle_client (출력까지의 지연)
+##   sensor_reader  : sn3 Senario_3_Pi4.SensorReader.read_data (반환까지의 지연)
+##
+## 시뮬레이터는 별도 프로세스에서 동작하므로 CPU 사용률은 측정 대상 코드만 포함합니다.
+## 각 줄에는 전송 시각(time.monotonic)이 들어 있어 프로세스 간에도 지연을 계산할 수 있습니다.
+## pty 는 baud rate 를 강제하지 않으므로 결과 표의 min_baud 로 실제 UART 에서 필요한 속도를 확인하세요.
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import threading
+import time
+import types
+from typing import Dict, List, Optional
+
+import serialSimulator
+
+TARGETS = ('serial_handler', 'serial_server', 'sensor_reader')
+DEFAULT_RATES = (100, 1000, 5000)
+DEFAULT_SIZES = (16, 64, 256)
+DRAIN_TIME = 0.5  # 전송 중단 후 남은 줄을 읽을 시간
+SN3_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sn3')
+
+
+class BenchProfile(serialSimulator.Raspi4Profile):
+    """
+    고정 크기의 줄에 순번과 전송 시각을 넣어 보내는 프로파일.
+    csv=True 이면 picoProtocol 이 DHT 값으로 파싱할 수 있도록 "<seq>.0,<sent_at>" 형식을 사용합니다.
+    handshake=True 이면 PC_HELLO 에 응답한 이후부터 전송합니다.
+    pyserial 은 포트를 열 때 입력 버퍼를 비우므로, 측정 대상이 포트를 연 뒤 enabled 로 전송을 시작합니다.
+    """
+    name = "bench"
+
+    def __init__(self, rng, size: int = 64, csv: bool = False, handshake: bool = False):
+        super().__init__(rng)
+        self.size = size
+        self.csv = csv
+        self.connected = not handshake
+        self.enabled = False
+
+    def next_line(self, seq):
+        if not (self.enabled and self.connected):
+            return None
+        sent_at = f"{time.monotonic():.6f}"
+        if self.csv:
+            # 앞자리 0 으로 길이를 맞춤 (float() 은 앞의 0 을 무시)
+            width = max(1, self.size - len(sent_at) - 4)
+            return f"{seq:0{width}d}.0,{sent_at}\n"
+        head = f"BENCH {seq} {sent_at} "
+        return head + "x" * max(0, self.size - len(head) - 1) + "\n"
+
+
+def parse_bench_line(text: str) -> Optional[tuple]:
+    """수신한 텍스트에서 (seq, 전송 시각) 추출"""
+    index = text.find("BENCH ")
+    if index < 0:
+        return None
+    parts = text[index:].split()
+    try:
+        return int(parts[1]), float(parts[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def _simulator_process(conn, rate, size, csv, handshake):
+    profile = BenchProfile(None, size=size, csv=csv, handshake=handshake)
+    device = serialSimulator.PtySerialDevice(rate=rate, profile_obj=profile)
+    conn.send(device.start())
+    conn.recv()  # 측정 대상이 포트를 열면 전송 시작
+    profile.enabled = True
+    conn.recv()  # 전송 중단 요청
+    device.stop_event.set()
+    conn.send(device.stats)
+    conn.recv()  # 수신 측이 남은 줄을 모두 읽은 뒤 pty 정리
+    device.stop()
+
+
+class Recorder:
+    """수신 시각 기록 (콜백 스레드에서 호출)"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.seqs = set()
+
+    def record(self, seq: int, sent_at: float) -> None:
+        self.latencies.append(time.monotonic() - sent_at)
+        self.seqs.add(seq)
+
+
+class _PrintCapture(io.TextIOBase):
+    """SerialServer 의 print 출력을 가로채 수신 줄을 기록"""
+
+    def __init__(self, recorder: Recorder):
+        self.recorder = recorder
+
+    def write(self, text):
+        parsed = parse_bench_line(text)
+        if parsed:
+            self.recorder.record(*parsed)
+        return len(text)
+
+
+def _load_sensor_reader():
+    """
+    sn3 의 SensorReader 를 불러옵니다.
+    Pi 전용 모듈(RPi.GPIO, RPLCD)이 없는 PC 에서는 빈 모듈로 대체합니다. (SensorReader 는 사용하지 않음)
+    """
+    for name in ('RPi', 'RPi.GPIO', 'RPLCD', 'RPLCD.i2c'):
+        try:
+            __import__(name)
+        except ImportError:
+            sys.modules[name] = types.ModuleType(name)
+    sys.modules['RPLCD.i2c'].CharLCD = getattr(sys.modules['RPLCD.i2c'], 'CharLCD', None)
+    sys.modules['RPi'].GPIO = sys.modules['RPi.GPIO']
+    if SN3_DIR not in sys.path:
+        sys.path.insert(0, SN3_DIR)
+    import Senario_3_Pi4
+    return Senario_3_Pi4.SensorReader
+
+
+def _run_serial_handler(path, recorder, ready, stop_event, counters):
+    import Server_socket
+
+    def callback(message):
+        if "[Serial] Connected" in message:
+            ready.set()
+
+    def message_callback(message):
+        recorder.record(int(message.temperature), message.humidity)
+
+    handler = Server_socket.SerialHandler(port=path)
+    handler.set_callback(callback)
+    handler.set_message_callback(message_callback)
+    handler.start()
+    stop_event.wait()
+    # 루프가 끝난 뒤 포트를 닫음 (stop() 은 루프 도중에 포트를 닫음)
+    handler.is_running = False
+    handler.serial_thread.join(timeout=5.0)
+    handler.stop()
+
+
+def _run_serial_server(path, recorder, ready, stop_event, counters):
+    import Server_portlistener
+
+    with contextlib.redirect_stdout(_PrintCapture(recorder)):
+        server = Server_portlistener.SerialServer(negotiate_baud=False)
+        server.save_port_mapping = lambda: None
+        thread = threading.Thread(target=server.handle_client, args=(path,), daemon=True)
+        thread.start()
+        ready.set()  # 핸드셰이크 이후에만 전송되므로 바로 시작
+        stop_event.wait()
+        server.running = False
+        thread.join(timeout=5.0)
+
+
+def _run_sensor_reader(path, recorder, ready, stop_event, counters):
+    reader = _load_sensor_reader()(serial_port=path)
+    ready.set()
+    polls = 0
+    # sensor_thread 와 같은 방식이지만 2 초 대기 없이 read_data 를 반복 호출
+    while not stop_event.is_set():
+        temp, humid = reader.read_data()
+        polls += 1
+        if temp is not None:
+            recorder.record(int(temp), humid)
+    counters['polls'] = polls
+    reader.cleanup()
+
+
+RUNNERS = {
+    'serial_handler': _run_serial_handler,
+    'serial_server': _run_serial_server,
+    'sensor_reader': _run_sensor_reader,
+}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_case(target: str, rate: float, size: int, duration: float) -> Dict:
+    ctx = multiprocessing.get_context('fork')
+    parent_conn, child_conn = ctx.Pipe()
+    simulator = ctx.Process(
+        target=_simulator_process,
+        args=(child_conn, rate, size, target != 'serial_server', target == 'serial_server'),
+        daemon=True)
+    simulator.start()
+    path = parent_conn.recv()
+
+    recorder = Recorder()
+    ready = threading.Event()
+    stop_event = threading.Event()
+    counters: Dict[str, int] = {}
+    worker = threading.Thread(target=RUNNERS[target],
+                              args=(path, recorder, ready, stop_event, counters), daemon=True)
+    worker.start()
+    ready.wait(timeout=10.0)
+
+    usage_start = resource.getrusage(resource.RUSAGE_SELF)
+    wall_start = time.perf_counter()
+    parent_conn.send("go")
+    time.sleep(duration)
+    usage_end = resource.getrusage(resource.RUSAGE_SELF)
+    wall = time.perf_counter() - wall_start
+
+    parent_conn.send("stop")
+    sim_stats = parent_conn.recv()
+    time.sleep(DRAIN_TIME)
+    stop_event.set()
+    worker.join(timeout=10.0)
+    parent_conn.send("close")
+    simulator.join(timeout=5.0)
+
+    cpu = (usage_end.ru_utime - usage_start.ru_utime) + (usage_end.ru_stime - usage_start.ru_stime)
+    latencies_ms = [value * 1000 for value in recorder.latencies]
+    result = {
+        'target': target,
+        'rate': rate,
+        'size': size,
+        'duration': round(wall, 3),
+        'min_baud': int(rate * size * 10),  # 8N1 기준 필요한 최소 baud rate
+        'sent': sim_stats['lines_sent'],
+        'received': len(recorder.seqs),
+        'overruns': sim_stats['overruns'],
+        'lines_per_s': round(len(recorder.seqs) / wall, 1),
+        'cpu_percent': round(cpu / wall * 100, 1),
+        'latency_ms': {
+            'p50': round(percentile(latencies_ms, 50), 3),
+            'p95': round(percentile(latencies_ms, 95), 3),
+            'p99': round(percentile(latencies_ms, 99), 3),
+            'max': round(max(latencies_ms), 3) if latencies_ms else float('nan'),
+            'mean': round(statistics.fmean(latencies_ms), 3) if latencies_ms else float('nan'),
+        },
+    }
+    result.update(counters)
+    return result
+
+
+def print_table(results: List[Dict]) -> None:
+    header = (f"{'target':<15}{'rate':>8}{'size':>6}{'min_baud':>10}{'sent':>8}{'recv':>8}"
+              f"{'lines/s':>10}{'cpu%':>7}{'p50ms':>9}{'p95ms':>9}{'p99ms':>9}{'maxms':>9}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        lat = r['latency_ms']
+        print(f"{r['target']:<15}{r['rate']:>8g}{r['size']:>6}{r['min_baud']:>10}{r['sent']:>8}"
+              f"{r['received']:>8}{r['lines_per_s']:>10}{r['cpu_percent']:>7}"
+              f"{lat['p50']:>9}{lat['p95']:>9}{lat['p99']:>9}{lat['max']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="시리얼 수신 처리량/지연 벤치마크")
+    parser.add_argument('--targets', nargs='+', choices=TARGETS, default=list(TARGETS))
+    parser.add_argument('--rates', nargs='+', type=float, default=list(DEFAULT_RATES), help="lines/s")
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(DEFAULT_SIZES), help="bytes/line")
+    parser.add_argument('--duration', type=float, default=3.0, help="케이스당 측정 시간(초)")
+    parser.add_argument('--label', default=None, help="결과에 붙일 이름 (예: before, after)")
+    parser.add_argument('--json', default=None, help="결과를 추가 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    results = []
+    for target in args.targets:
+        for rate in args.rates:
+            for size in args.sizes:
+                print(f"[Bench] {target} rate={rate:g} size={size} ...", file=sys.stderr)
+                result = run_case(target, rate, size, args.duration)
+                if args.label:
+                    result['label'] = args.label
+                results.append(result)
+
+    print_table(results)
+
+    if args.json:
+        previous = []
+        if os.path.exists(args.json):
+            with open(args.json) as f:
+                previous = json.load(f)
+        with open(args.json, 'w') as f:
+            json.dump(previous + results, f, indent=2)
+        print(f"[Bench] Results appended to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
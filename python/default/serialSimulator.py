@@ -0,0 +1,354 @@
+## 보드 없이 시리얼 코드를 실행하기 위한 가상 시리얼 장치(pty) 시뮬레이터입니다. (Linux 전용)
+## Pico 펌웨어 동작을 흉내 내며, 출력되는 slave 경로를 실제 포트 대신 사용하면 됩니다.
+##
+##   python serialSimulator.py dht --rate 0.5 --error-rate 0.1 --link /tmp/ttyPICO
+##   python Senario_3_Pi4.py  (SensorReader(serial_port='/tmp/ttyPICO'))
+##
+## 프로파일
+##   dht    : sn3 Pico  - "23.5,45.0\n" (센서 오류 시 "ERROR,ERROR\n")
+##   adc    : sn2 Pico  - "<adc>\n", "alert" 수신 시 "Alert mode activated\n" 후 ADC 전송 중단
+##   status : sn1 Pico  - "TEST MESSAGE\r\n" + JSON 상태 "\r\n"
+##   raspi4 : Client_portscanner 역할 - PC_HELLO 에 응답, UART 속도 협상 응답, 카운트다운 전송
+##   pc     : Server_portlistener 역할 - PC_HELLO 전송 후 Pi 의 응답을 수신
+
+import argparse
+import json
+import math
+import os
+import random
+import select
+import threading
+import time
+import tty
+from typing import Callable, Dict, Optional
+
+
+class Profile:
+    """장치 동작 정의. 주기적으로 보낼 줄과 수신한 줄에 대한 응답을 만듭니다."""
+    name = "base"
+    default_rate = 1.0  # lines/s
+    unterminated_commands = False  # 줄바꿈 없는 명령을 받는 펌웨어인지
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    def greeting(self) -> Optional[str]:
+        """장치 시작 시 한 번 보내는 줄"""
+        return None
+
+    def next_line(self, seq: int) -> Optional[str]:
+        """seq 번째 주기적 출력. None 이면 이번 주기는 전송하지 않음"""
+        return None
+
+    def error_line(self, seq: int) -> Optional[str]:
+        """펌웨어가 보내는 오류 줄 (error_rate 로 주입)"""
+        return None
+
+    def on_line(self, line: str) -> Optional[str]:
+        """수신한 줄에 대한 응답"""
+        return None
+
+
+class DHTProfile(Profile):
+    name = "dht"
+    default_rate = 0.5  # sn3/pico/main.py: sleep(2)
+
+    def next_line(self, seq):
+        temp = 23.0 + 2.0 * math.sin(seq / 30.0) + self.rng.uniform(-0.2, 0.2)
+        humid = 45.0 + 5.0 * math.cos(seq / 45.0) + self.rng.uniform(-0.5, 0.5)
+        return f"{temp:.1f},{humid:.1f}\n"
+
+    def error_line(self, seq):
+        return "ERROR,ERROR\n"
+
+
+class ADCProfile(Profile):
+    name = "adc"
+    default_rate = 10.0  # sn2/pico/main.py: asyncio.sleep(0.1)
+    unterminated_commands = True  # Pi 는 줄바꿈 없이 'alert' 를 보냄
+
+    def __init__(self, rng):
+        super().__init__(rng)
+        self.alert_flag = False
+
+    def next_line(self, seq):
+        if self.alert_flag:
+            return None
+        value = int(32768 + 30000 * math.sin(seq / 20.0)) + self.rng.randint(-200, 200)
+        return f"{max(0, min(65535, value))}\n"
+
+    def on_line(self, line):
+        if "alert" in line:
+            self.alert_flag = True
+            return "Alert mode activated\n"
+        return None
+
+
+class StatusProfile(Profile):
+    name = "status"
+    default_rate = 1.0
+
+    def __init__(self, rng):
+        super().__init__(rng)
+        self.duty = 0
+
+    def greeting(self):
+        return "PICO INITIALIZED\r\n"
+
+    def next_line(self, seq):
+        self.duty = max(0, min(255, self.duty + self.rng.choice((-10, 0, 10))))
+        status = {
+            "pwm_duty": self.duty,
+            "pwm_percent": round(self.duty / 255 * 100, 2),
+            "button_status": self.rng.choice(("None", "None", "UP", "DOWN")),
+            "bluetooth_data": "None"
+        }
+        return "TEST MESSAGE\r\n" + json.dumps(status) + "\r\n"
+
+
+class Raspi4Profile(Profile):
+    name = "raspi4"
+    default_rate = 1.0
+
+    def __init__(self, rng):
+        super().__init__(rng)
+        self.connected = False
+        self.countdown = 5
+
+    def next_line(self, seq):
+        if not self.connected or self.countdown <= 0:
+            return None
+        message = f"{self.countdown} seconds left\n"
+        self.countdown -= 1
+        return message
+
+    def on_line(self, line):
+        if line == "PC_HELLO":
+            self.connected = True
+            return "RASPI4_HELLO\n"
+        # baudNegotiation 응답 (pty 는 속도 변경이 의미 없으므로 그대로 수락)
+        if line.startswith("BAUD_TRY "):
+            return f"BAUD_OK {line.split()[1]}\n"
+        if line.startswith("BAUD_COMMIT "):
+            return f"BAUD_COMMITTED {line.split()[1]}\n"
+        if line.startswith("PROBE "):
+            return line + "\n"
+        return None
+
+
+class PCProfile(Profile):
+    name = "pc"
+    default_rate = 1.0
+
+    def __init__(self, rng):
+        super().__init__(rng)
+        self.connected = False
+
+    def next_line(self, seq):
+        return None if self.connected else "PC_HELLO\n"
+
+    def on_line(self, line):
+        if line == "RASPI4_HELLO":
+            self.connected = True
+        return None
+
+
+PROFILES: Dict[str, type] = {
+    profile.name: profile
+    for profile in (DHTProfile, ADCProfile, StatusProfile, Raspi4Profile, PCProfile)
+}
+
+
+class PtySerialDevice:
+    """
+    pty 쌍으로 가상 시리얼 장치를 만듭니다.
+    테스트 대상 코드는 slave_path 를 serial.Serial 로 열고, 시뮬레이터는 master 쪽에서 읽고 씁니다.
+    """
+
+    def __init__(self, profile: str = "dht", rate: Optional[float] = None,
+                 error_rate: float = 0.0, garble_rate: float = 0.0,
+                 count: Optional[int] = None, seed: Optional[int] = None,
+                 link: Optional[str] = None, profile_obj: Optional[Profile] = None,
+                 on_write: Optional[Callable[[int, float, bytes], None]] = None):
+        self.rng = random.Random(seed)
+        self.profile = profile_obj or PROFILES[profile](self.rng)
+        self.rate = rate if rate is not None else self.profile.default_rate
+        self.error_rate = error_rate      # 펌웨어 오류 줄 주입 확률
+        self.garble_rate = garble_rate    # 선로 잡음(바이트 손상/잘림) 주입 확률
+        self.count = count                # 주기적 출력 최대 개수 (None = 무한)
+        self.link = link                  # slave 경로에 대한 심볼릭 링크
+        self.on_write = on_write          # (seq, monotonic 시각, 전송 바이트) 콜백
+
+        self.master_fd = None
+        self.slave_fd = None
+        self.slave_path = None
+        self.stop_event = threading.Event()
+        self.finished = threading.Event()
+        self._threads = []
+        self._write_lock = threading.Lock()
+        self.stats = {
+            'lines_sent': 0, 'bytes_sent': 0, 'errors_injected': 0,
+            'garbled': 0, 'overruns': 0, 'lines_received': 0,
+        }
+
+    def start(self) -> str:
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)  # 에코/줄 편집 없이 UART 처럼 동작
+        os.set_blocking(self.master_fd, False)
+        self.slave_path = os.ttyname(self.slave_fd)
+        if self.link:
+            if os.path.islink(self.link):
+                os.unlink(self.link)
+            os.symlink(self.slave_path, self.link)
+
+        greeting = self.profile.greeting()
+        if greeting:
+            self._write(greeting.encode())
+
+        for target in (self._writer_loop, self._reader_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self.link or self.slave_path
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        if self.link and os.path.islink(self.link):
+            os.unlink(self.link)
+        for fd in (self.master_fd, self.slave_fd):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self.master_fd = self.slave_fd = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _write(self, data: bytes) -> bool:
+        """UART 처럼 동작: 수신 측이 버퍼를 비우지 않아 가득 차면 데이터가 유실됨(overrun)"""
+        with self._write_lock:
+            try:
+                os.write(self.master_fd, data)
+            except BlockingIOError:
+                self.stats['overruns'] += 1
+                return False
+            except OSError:
+                return False
+        self.stats['bytes_sent'] += len(data)
+        return True
+
+    def _garble(self, line: str) -> bytes:
+        data = bytearray(line.encode())
+        if self.rng.random() < 0.5 and len(data) > 2:
+            # 줄 잘림 - 다음 줄과 붙어서 도착
+            return bytes(data[:self.rng.randrange(1, len(data) - 1)])
+        index = self.rng.randrange(len(data))
+        data[index] = self.rng.randrange(0x80, 0x100)  # utf-8 디코딩 오류 유발
+        return bytes(data)
+
+    def _writer_loop(self) -> None:
+        interval = 1.0 / self.rate if self.rate > 0 else None
+        next_time = time.monotonic()
+        seq = 0
+        while not self.stop_event.is_set():
+            if self.count is not None and seq >= self.count:
+                break
+            if interval is None:
+                self.stop_event.wait(0.1)
+                continue
+
+            if self.error_rate and self.rng.random() < self.error_rate:
+                line = self.profile.error_line(seq)
+                if line:
+                    self.stats['errors_injected'] += 1
+            else:
+                line = None
+            if line is None:
+                line = self.profile.next_line(seq)
+
+            if line is not None:
+                if self.garble_rate and self.rng.random() < self.garble_rate:
+                    payload = self._garble(line)
+                    self.stats['garbled'] += 1
+                else:
+                    payload = line.encode()
+                sent_at = time.monotonic()
+                if self._write(payload):
+                    self.stats['lines_sent'] += 1
+                    if self.on_write:
+                        self.on_write(seq, sent_at, payload)
+            seq += 1
+
+            # 누적 오차 없이 일정한 주기 유지
+            next_time += interval
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                self.stop_event.wait(delay)
+            elif delay < -1.0:
+                next_time = time.monotonic()
+        self.finished.set()
+
+    def _reader_loop(self) -> None:
+        buffer = b""
+        while not self.stop_event.is_set():
+            try:
+                readable, _, _ = select.select([self.master_fd], [], [], 0.1)
+                if not readable:
+                    continue
+                chunk = os.read(self.master_fd, 4096)
+            except (OSError, ValueError, TypeError):
+                if self.stop_event.wait(0.1):
+                    break
+                continue
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            if buffer and self.profile.unterminated_commands:
+                # 줄바꿈 없이 들어온 명령('alert')도 바로 처리
+                lines, buffer = lines + [buffer], b""
+            for raw in lines:
+                line = raw.decode('utf-8', errors='replace').strip()
+                if not line:
+                    continue
+                self.stats['lines_received'] += 1
+                reply = self.profile.on_line(line)
+                if reply:
+                    self._write(reply.encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pty 기반 Pico 시리얼 장치 시뮬레이터")
+    parser.add_argument('profile', choices=sorted(PROFILES), help="흉내 낼 펌웨어")
+    parser.add_argument('--rate', type=float, default=None, help="초당 출력 줄 수 (기본값: 펌웨어 주기)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="펌웨어 오류 줄 주입 확률")
+    parser.add_argument('--garble-rate', type=float, default=0.0, help="손상/잘린 줄 주입 확률")
+    parser.add_argument('--count', type=int, default=None, help="출력할 줄 수 (기본값: 무한)")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--link', default=None, help="slave 경로에 만들 심볼릭 링크 (예: /tmp/ttyPICO)")
+    args = parser.parse_args()
+
+    device = PtySerialDevice(args.profile, rate=args.rate, error_rate=args.error_rate,
+                             garble_rate=args.garble_rate, count=args.count,
+                             seed=args.seed, link=args.link)
+    path = device.start()
+    print(f"[Simulator] {args.profile} device at {path} ({device.rate} lines/s)")
+    try:
+        while not device.finished.wait(1.0):
+            pass
+        device.stop_event.wait(1.0)  # 마지막 줄이 읽힐 시간을 줌
+    except KeyboardInterrupt:
+        pass
+    finally:
+        device.stop()
+        print(f"[Simulator] Stopped. {device.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
-import smbus
-import serial
 import threading
-from time import sleep
 import socketCommunication
+import mpu6050
+import dropDetector
+import imuSummary
+import sensorSnapshot
+import sensorDrivers
+import sensorTrace
+import numpy as np
 import json
+import argparse
 import logging
-from threading import Lock
 
 logger = logging.getLogger(__name__)
 
@@ -34,82 +38,102 @@ def MPU_Init(bus, Device_Address):
     # Write to interrupt enable register
     bus.write_byte_data(Device_Address, INT_ENABLE, 1)
 
-def read_raw_data(bus, addr, Device_Address):
-    # Accelero and Gyro value are 16-bit
-    high = bus.read_byte_data(Device_Address, addr)
-    low = bus.read_byte_data(Device_Address, addr + 1)
-    # concatenate higher and lower value
-    value = ((high << 8) | low)
-    # to get signed value from mpu6050
-    if value > 32768:
-        value = value - 65536
-    return value
-
 class SensorData:
+    """
+    값은 sensorSnapshot 으로 보관. 메인 루프 한 곳에서만 update_data 를 호출하고,
+    TCP 전송 스레드의 get_data 는 lock 없이 현재 snapshot 을 읽음 (문자열 변환은 snapshot 마다 한 번)
+    """
     def __init__(self):
-        self.gyro_x = 0.0
-        self.gyro_y = 0.0
-        self.gyro_z = 0.0
-        self.acc_x = 0.0
-        self.acc_y = 0.0
-        self.acc_z = 0.0
-        self.is_dropped = False
-        self.lock = Lock()
+        self.store = sensorSnapshot.SnapshotStore(
+            {'gyro_x': 0.0, 'gyro_y': 0.0, 'gyro_z': 0.0, 'acc_x': 0.0, 'acc_y': 0.0, 'acc_z': 0.0,
+             'is_dropped': False}, format=self._format)
+
+    @staticmethod
+    def _format(snapshot: sensorSnapshot.Snapshot):
+        return {
+            'gyro_x': f"{snapshot.gyro_x:.2f}",
+            'gyro_y': f"{snapshot.gyro_y:.2f}",
+            'gyro_z': f"{snapshot.gyro_z:.2f}",
+            'acc_x': f"{snapshot.acc_x:.2f}",
+            'acc_y': f"{snapshot.acc_y:.2f}",
+            'acc_z': f"{snapshot.acc_z:.2f}",
+            'is_dropped': snapshot.is_dropped
+        }
         
     def update_data(self, gyro_x, gyro_y, gyro_z, acc_x, acc_y, acc_z, is_dropped):
-        with self.lock:
-            self.gyro_x = gyro_x / 131.0  # 변환 계수 적용
-            self.gyro_y = gyro_y / 131.0
-            self.gyro_z = gyro_z / 131.0
-            self.acc_x = acc_x / 16384.0
-            self.acc_y = acc_y / 16384.0
-            self.acc_z = acc_z / 16384.0
-            self.is_dropped = is_dropped
+        # 변환 계수 적용
+        self.store.publish(
+            gyro_x=gyro_x / 131.0,
+            gyro_y=gyro_y / 131.0,
+            gyro_z=gyro_z / 131.0,
+            acc_x=acc_x / 16384.0,
+            acc_y=acc_y / 16384.0,
+            acc_z=acc_z / 16384.0,
+            is_dropped=is_dropped
+        )
     
     def get_data(self):
-        with self.lock:
-            return {
-                'gyro_x': f"{self.gyro_x:.2f}",
-                'gyro_y': f"{self.gyro_y:.2f}",
-                'gyro_z': f"{self.gyro_z:.2f}",
-                'acc_x': f"{self.acc_x:.2f}",
-                'acc_y': f"{self.acc_y:.2f}",
-                'acc_z': f"{self.acc_z:.2f}",
-                'is_dropped': self.is_dropped
-            }
-
-def read_from_pico(ser):
-    while True:
-        if ser.in_waiting > 0:
-            response = ser.readline().decode('utf-8').strip()
-            logger.info(f"[Serial] Pico says: {response}")
-            print("Pico says:", response)
+        return self.store.current.as_dict()
 
+# 요약 출력 순서: 자이로 (deg/s), 가속도 (g)
+SUMMARY_COLUMNS = [4, 5, 6, 0, 1, 2]
+SUMMARY_SCALE = np.array([131.0, 131.0, 131.0, 16384.0, 16384.0, 16384.0])
 
-def main():
+def read_from_pico(ser, summary):
+    while True:
+        # 한 줄이 오거나 timeout(1초) 까지 대기. 받은 줄은 주기적 요약에 포함
+        try:
+            line = ser.readline()
+        except sensorTrace.TraceEnd:  # Pico 재생 기록 끝. 메인 루프는 I2C 기록이 끝날 때 종료
+            break
+        if line:
+            summary.record_pico(line.decode('utf-8', errors='replace').strip())
+
+
+def main(mode: str = 'poll', rate_hz: int = 500, int_pin=None, simulate: bool = False, speed: float = 1.0,
+         server_host: str = '192.168.0.2', record=None, replay=None):
+    """
+    mode     : 'poll' (0.2초마다 레지스터 읽기), 'fifo' (센서 FIFO 로 rate_hz 연속 수집)
+    simulate : MPU6050, Pico 대신 sensorDrivers 시뮬레이션 장치 사용 (speed 배속)
+    record   : MPU6050 I2C, Pico 시리얼, TCP 전송 데이터를 sensorTrace 파일로 기록
+    replay   : 장치 대신 sensorTrace 기록을 speed 배속으로 재생 (기록할 때와 같은 mode 로 실행)
+    """
+    clock = sensorDrivers.SimClock(speed if simulate or replay else 1.0)
+    trace = sensorTrace.TraceSession(record=record, replay=replay, clock=clock)
     sensor_data = SensorData()
-    tcp_client = socketCommunication.TCPClient('192.168.0.2', 12345)
+    summary = imuSummary.ImuSummary(interval=5.0, logger=logger)  # 샘플마다 print 하지 않고 5초마다 요약
+    tcp_client = socketCommunication.TCPClient(server_host, 12345)
     
     # 시리얼 통신 설정
-    ser = serial.Serial('/dev/serial0', 9600, timeout=1)
+    ser = trace.serial(lambda: sensorDrivers.open_serial('/dev/serial0', 9600, timeout=1,
+                                                         profile='adc' if simulate else None, clock=clock))
     ser.flush()
     logger.info("[Serial] Connected to Pico")
     print("Connected to Pico")
     
     # 피코 읽기 스레드 시작 (인자 수정)
-    thread = threading.Thread(target=read_from_pico, args=(ser,))
+    thread = threading.Thread(target=read_from_pico, args=(ser, summary))
     thread.daemon = True
     thread.start()
     
-    bus = smbus.SMBus(1)
     Device_Address = 0x68
+    bus = trace.bus(lambda: sensorDrivers.open_i2c_bus(
+        1, devices={Device_Address: sensorDrivers.SimulatedMPU6050(clock=clock)} if simulate else None))
 
     MPU_Init(bus, Device_Address)
+    imu = mpu6050.MPU6050Reader(bus, Device_Address)  # 모든 축을 14바이트 한 번에 읽음
+    acquisition = None
+    if mode == 'fifo':
+        acquisition = mpu6050.FifoAcquisition(bus, Device_Address, rate_hz=rate_hz, int_pin=int_pin,
+                                                 clock=clock)
+        # 최근 2초 샘플로 자유 낙하 + 충돌을 batch 단위로 판정
+        detector = dropDetector.DropDetector(acquisition.rate_hz)
     print("Reading Data of Gyroscope and Accelerometer")
 
     # TCP 연결 시도 - 연결 실패시 프로그램 종료
     if not tcp_client.start():
         logger.error("Failed to establish TCP connection")
+        trace.close()
         return
         
     def get_sensor_data():
@@ -117,28 +141,43 @@ def main():
         return sensor_data.get_data()
     
     # 주기적 데이터 전송 시작 (2초 간격)
-    tcp_client.start_periodic_send(get_sensor_data, 2.0)
+    tcp_client.start_periodic_send(trace.tcp_callback(get_sensor_data), 2.0)
 
     try:
         # 이전 값 초기화
-        previous_acc_z = read_raw_data(bus, ACCEL_ZOUT_H, Device_Address)
-        previous_gyro_x = read_raw_data(bus, GYRO_XOUT_H, Device_Address)
-        previous_gyro_y = read_raw_data(bus, GYRO_YOUT_H, Device_Address)
-        previous_gyro_z = read_raw_data(bus, GYRO_ZOUT_H, Device_Address)
+        sample = imu.read_raw()
+        previous_acc_z = sample.acc_z
+        previous_gyro_x = sample.gyro_x
+        previous_gyro_y = sample.gyro_y
+        previous_gyro_z = sample.gyro_z
+        if acquisition:
+            acquisition.start()
 
         while True:
             # 센서 데이터 읽기
-            acc_x = read_raw_data(bus, ACCEL_XOUT_H, Device_Address)
-            acc_y = read_raw_data(bus, ACCEL_YOUT_H, Device_Address)
-            acc_z = read_raw_data(bus, ACCEL_ZOUT_H, Device_Address)
-            gyro_x = read_raw_data(bus, GYRO_XOUT_H, Device_Address)
-            gyro_y = read_raw_data(bus, GYRO_YOUT_H, Device_Address)
-            gyro_z = read_raw_data(bus, GYRO_ZOUT_H, Device_Address)
-
-            # 낙하 감지
-            acc_z_change = previous_acc_z - acc_z
-            
-            is_dropped = acc_z_change > 3000
+            if acquisition:
+                # 지난 0.2초 동안 FIFO 로 수집한 샘플 전체. 표시는 마지막 샘플, 낙하 감지는 전체 샘플 사용
+                batch = acquisition.read_new(timeout=1.0)
+                if not batch:
+                    continue
+                acc_x, acc_y, acc_z, _, gyro_x, gyro_y, gyro_z = batch[-1][1]
+
+                # 낙하 감지
+                drops = detector.push(batch)
+                for drop in drops:
+                    logger.info(f"Drop detected: free fall {drop.free_fall_s * 1000:.0f}ms, "
+                                f"impact {drop.impact_g:.2f}g, jerk {drop.max_jerk_g_s:.0f}g/s")
+                is_dropped = bool(drops)
+                summary.record(np.array([sample for _, sample in batch], dtype=float)[:, SUMMARY_COLUMNS]
+                               / SUMMARY_SCALE)
+            else:
+                acc_x, acc_y, acc_z, _, gyro_x, gyro_y, gyro_z = imu.read_raw()
+
+                # 낙하 감지 (0.2초 간격 샘플로는 자유 낙하 구간을 볼 수 없어 Z 축 변화로 판정)
+                acc_z_change = previous_acc_z - acc_z
+                
+                is_dropped = acc_z_change > 3000
+                summary.record(np.array([gyro_x, gyro_y, gyro_z, acc_x, acc_y, acc_z]) / SUMMARY_SCALE)
 
             # SensorData 객체 업데이트
             sensor_data.update_data(
@@ -154,10 +193,8 @@ def main():
             # 낙하 감지시 Pico에 알림
             if is_dropped:
                 ser.write('alert'.encode('utf-8'))
-                print("Alert!! \nsensor is dropped!")
-                if ser.in_waiting > 0:
-                    line = ser.readline().decode('utf-8').rstrip()
-                    print("Pico says:", line)
+                summary.record_drop()
+                logger.warning("Alert!! sensor is dropped!")
 
             # 이전 값 업데이트
             previous_acc_z = acc_z
@@ -165,21 +202,39 @@ def main():
             previous_gyro_y = gyro_y
             previous_gyro_z = gyro_z
 
-            # 센서 데이터 출력
-            print(f"Gx={gyro_x/131:.2f} °/s\tGy={gyro_y/131:.2f} °/s\tGz={gyro_z/131:.2f} °/s\t"
-                  f"Ax={acc_x/16384:.2f} g\tAy={acc_y/16384:.2f} g\tAz={acc_z/16384:.2f} g")
-
-            sleep(0.2)
+            clock.sleep(0.2)
 
     except KeyboardInterrupt:
         print("\nClosing connections...")
         tcp_client.close()
         ser.close()
         
+    except sensorTrace.TraceEnd:
+        logger.info("Replay finished")
+        tcp_client.close()
+        ser.close()
+
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
         tcp_client.close()
         ser.close()
 
+    finally:
+        if acquisition:
+            acquisition.stop()
+        trace.close()
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scenario 2 Raspberry Pi 4 IMU drop detection")
+    parser.add_argument('--mode', choices=('poll', 'fifo'), default='poll',
+                        help="poll: 0.2초마다 레지스터 읽기, fifo: MPU6050 FIFO 로 연속 수집")
+    parser.add_argument('--rate', type=int, default=500, help="fifo 모드 샘플링 주파수 (4~1000Hz)")
+    parser.add_argument('--int-pin', type=int, default=None, help="MPU6050 INT 가 연결된 BCM 핀 (선택)")
+    parser.add_argument('--simulate', action='store_true', help="센서 없이 시뮬레이션 MPU6050 / Pico 사용")
+    parser.add_argument('--speed', type=float, default=1.0, help="시뮬레이션 배속 (--simulate 일 때)")
+    parser.add_argument('--tcp-host', default='192.168.0.2', help="TCP 서버 주소")
+    parser.add_argument('--record', default=None, help="센서 입력과 TCP 전송 데이터를 기록할 파일")
+    parser.add_argument('--replay', default=None, help="장치 대신 재생할 기록 파일 (--speed 배속)")
+    args = parser.parse_args()
+    main(mode=args.mode, rate_hz=args.rate, int_pin=args.int_pin, simulate=args.simulate, speed=args.speed,
+         server_host=args.tcp_host, record=args.record, replay=args.replay)
@@ -0,0 +1,105 @@
+## IMU 샘플 묶음(batch)으로 낙하를 판정하는 detector
+##
+## 기존 판정은 샘플 하나의 Z 축 변화 (previous_acc_z - acc_z > 3000) 라서 기울이거나 흔들기만 해도 알림이 갔습니다.
+## 여기서는 최근 window 초의 샘플을 NumPy ring buffer 에 두고 batch 마다 한 번에 계산합니다.
+##
+##   1. 가속도 크기 |a| (세 축 모두) 가 free_fall_g 아래로 min_free_fall_s 이상 유지 -> 자유 낙하
+##   2. 낙하가 끝난 뒤 impact_window_s 안에 |a| >= impact_g 또는 jerk >= impact_jerk_g_s -> 충돌
+##   1, 2 를 모두 만족하면 낙하 한 번으로 보고합니다.
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+ACC_LSB_PER_G = 16384.0     # ACCEL_CONFIG 기본값 (+-2g)
+GYRO_LSB_PER_DPS = 16.4     # GYRO_CONFIG 24 (+-2000 deg/s), MPU_Init 설정
+
+
+@dataclass
+class DropThresholds:
+    free_fall_g: float = 0.35        # 이보다 작으면 자유 낙하 중으로 봄 (정지 시 1g)
+    min_free_fall_s: float = 0.06    # 약 2cm 이상 떨어져야 하는 시간
+    impact_g: float = 1.8            # +-2g 범위에서 포화 직전
+    impact_jerk_g_s: float = 60.0    # 부드러운 곳에 떨어져 |a| 가 작을 때 jerk 로 판정
+    impact_window_s: float = 0.3
+
+
+@dataclass
+class DropEvent:
+    timestamp: float          # 자유 낙하 시작 시각
+    free_fall_s: float
+    impact_g: float
+    max_jerk_g_s: float
+    max_rotation_dps: float
+
+
+class DropDetector:
+    def __init__(self, rate_hz: float, window_s: float = 2.0, thresholds: Optional[DropThresholds] = None):
+        self.rate_hz = rate_hz
+        self.period = 1.0 / rate_hz
+        self.thresholds = thresholds or DropThresholds()
+        self.capacity = max(int(window_s * rate_hz), 8)
+        # 같은 값을 두 번 써 두면 ring 이 한 바퀴 돌아도 최근 window 를 복사 없이 연속 view 로 얻을 수 있음
+        self.times = np.zeros(2 * self.capacity)
+        self.acc = np.zeros((2 * self.capacity, 3), dtype=np.float32)
+        self.gyro = np.zeros((2 * self.capacity, 3), dtype=np.float32)
+        self.head = 0
+        self.count = 0
+        self.checked_until = float('-inf')  # 이 시각 이전에 시작한 자유 낙하는 이미 판정 완료 (판정한 낙하의 끝)
+        self.last_stats = {}
+
+    def _append(self, times: np.ndarray, samples: np.ndarray) -> None:
+        if len(times) > self.capacity:
+            times, samples = times[-self.capacity:], samples[-self.capacity:]
+        index = (self.head + np.arange(len(times))) % self.capacity
+        for offset in (0, self.capacity):
+            self.times[index + offset] = times
+            self.acc[index + offset] = samples[:, 0:3]
+            self.gyro[index + offset] = samples[:, 4:7]
+        self.head = (self.head + len(times)) % self.capacity
+        self.count = min(self.count + len(times), self.capacity)
+
+    def _window(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        end = self.head + self.capacity
+        start = end - self.count
+        return self.times[start:end], self.acc[start:end], self.gyro[start:end]
+
+    def push(self, batch: Sequence[Tuple[float, Sequence[int]]]) -> List[DropEvent]:
+        """
+        batch: (timestamp, RawSample) 목록 (mpu6050.FifoAcquisition.read_new 결과).
+        새로 확정된 낙하 목록을 반환
+        """
+        if not batch:
+            return []
+        self._append(np.fromiter((t for t, _ in batch), dtype=float, count=len(batch)),
+                     np.array([sample for _, sample in batch], dtype=np.float32))
+
+        times, acc, gyro = self._window()
+        magnitude = np.sqrt(np.einsum('ij,ij->i', acc, acc)) / ACC_LSB_PER_G
+        jerk = np.abs(np.diff(magnitude, prepend=magnitude[0])) * self.rate_hz
+        rotation = np.sqrt(np.einsum('ij,ij->i', gyro, gyro)) / GYRO_LSB_PER_DPS
+        self.last_stats = {'min_g': float(magnitude.min()), 'max_g': float(magnitude.max()),
+                           'max_jerk_g_s': float(jerk.max())}
+
+        # 자유 낙하 구간 (연속된 True) 의 시작/끝 위치
+        edges = np.diff(np.concatenate(([0], (magnitude < self.thresholds.free_fall_g).view(np.int8), [0])))
+        starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+        durations = (ends - starts) * self.period
+        candidates = np.flatnonzero((durations >= self.thresholds.min_free_fall_s) &
+                                    (times[starts] > self.checked_until))
+
+        impact_samples = int(round(self.thresholds.impact_window_s * self.rate_hz))
+        events = []
+        for i in candidates:
+            start, end = starts[i], ends[i]
+            if end + impact_samples > len(magnitude):
+                break  # 낙하가 아직 진행 중이거나 충돌 구간이 덜 들어옴. 다음 batch 에서 다시 판정
+            after = slice(end, end + impact_samples)
+            impact, max_jerk = float(magnitude[after].max()), float(jerk[after].max())
+            # 판정한 낙하가 window 밖으로 일부 밀려나도 남은 부분을 새 낙하로 보지 않도록 끝 시각까지 완료 처리
+            self.checked_until = times[end - 1]
+            if impact >= self.thresholds.impact_g or max_jerk >= self.thresholds.impact_jerk_g_s:
+                events.append(DropEvent(float(times[start]), float(durations[i]), impact, max_jerk,
+                                        float(rotation[start:end + impact_samples].max())))
+        return events
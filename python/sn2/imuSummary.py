@@ -0,0 +1,73 @@
+## 샘플마다 print 하는 대신 interval 초마다 요약 한 줄을 로그로 남깁니다.
+## (SSH 터미널 출력이 느리면 print 가 루프 시간의 상당 부분을 차지해 샘플링 주기를 올릴 수 없음)
+##
+##   imu summary 5.0s samples=2500 rate=500.0/s drops=0 pico_lines=2 last_pico='OK'
+##     gx=-0.12/0.01/0.15 gy=... az=0.98/1.00/1.02  (min/mean/max)
+
+import logging
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+AXES = ('gx', 'gy', 'gz', 'ax', 'ay', 'az')
+
+
+class ImuSummary:
+    def __init__(self, interval: float = 5.0, logger: Optional[logging.Logger] = None):
+        self.interval = interval
+        self.logger = logger or logging.getLogger(__name__)
+        self.totals = {'samples': 0, 'drops': 0, 'pico_lines': 0}
+        self._reset(time.monotonic())
+
+    def _reset(self, now: float) -> None:
+        self.started = now
+        self.samples = 0
+        self.drops = 0
+        self.pico_lines = 0
+        self.last_pico: Optional[str] = None
+        self.minimum = np.full(len(AXES), np.inf)
+        self.maximum = np.full(len(AXES), -np.inf)
+        self.total = np.zeros(len(AXES))
+
+    def record(self, values) -> None:
+        """values: (n, 6) 또는 (6,) 배열, 순서는 AXES (자이로 deg/s, 가속도 g)"""
+        rows = np.atleast_2d(np.asarray(values, dtype=float))
+        self.minimum = np.minimum(self.minimum, rows.min(axis=0))
+        self.maximum = np.maximum(self.maximum, rows.max(axis=0))
+        self.total += rows.sum(axis=0)
+        self.samples += len(rows)
+        self.totals['samples'] += len(rows)
+        self.maybe_log()
+
+    def record_drop(self) -> None:
+        self.drops += 1
+        self.totals['drops'] += 1
+
+    def record_pico(self, line: str) -> None:
+        """Pico 에서 받은 줄은 개수와 마지막 줄만 요약에 포함 (줄마다는 DEBUG)"""
+        self.pico_lines += 1
+        self.totals['pico_lines'] += 1
+        self.last_pico = line
+        self.logger.debug(f"[Serial] Pico says: {line}")
+
+    def summary(self, now: Optional[float] = None) -> Dict:
+        elapsed = max((now or time.monotonic()) - self.started, 1e-9)
+        result = {'elapsed': round(elapsed, 1), 'samples': self.samples,
+                  'rate': round(self.samples / elapsed, 1), 'drops': self.drops,
+                  'pico_lines': self.pico_lines, 'last_pico': self.last_pico}
+        if self.samples:
+            mean = self.total / self.samples
+            for i, axis in enumerate(AXES):
+                result[axis] = (round(self.minimum[i], 2), round(mean[i], 2), round(self.maximum[i], 2))
+        return result
+
+    def maybe_log(self) -> None:
+        now = time.monotonic()
+        if now - self.started < self.interval:
+            return
+        s = self.summary(now)
+        axes = ' '.join(f"{axis}={'/'.join(str(v) for v in s[axis])}" for axis in AXES if axis in s)
+        self.logger.info(f"imu summary {s['elapsed']}s samples={s['samples']} rate={s['rate']}/s "
+                         f"drops={s['drops']} pico_lines={s['pico_lines']} last_pico={s['last_pico']!r} {axes}")
+        self._reset(now)
@@ -0,0 +1,272 @@
+## MPU6050 가속도/자이로 센서 읽기
+##
+## 기존 read_raw_data 는 축마다 read_byte_data 를 두 번 호출해 샘플 하나에 I2C 트랜잭션 12번이 필요했습니다.
+## ACCEL_XOUT_H(0x3B) 부터 GYRO_ZOUT_L(0x48) 까지 14바이트는 연속된 레지스터이므로
+## read_i2c_block_data 한 번으로 읽고 struct 로 한 번에 풀어 씁니다.
+##
+## FifoAcquisition 은 센서 내부 FIFO 에 샘플을 쌓게 하고 주기적으로 한꺼번에 읽어
+## 200~1000Hz 로 빠짐없이 수집합니다 (0.2초 폴링으로는 짧은 낙하를 놓침).
+##
+##   python mpu6050.py   # 축별 읽기와 block 읽기의 초당 샘플 수 비교 (Pi 에서 실행)
+
+import logging
+import struct
+import time
+from collections import deque, namedtuple
+from itertools import islice
+from threading import Condition, Event, Thread
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SMPLRT_DIV = 0x19
+CONFIG = 0x1A
+FIFO_EN = 0x23
+INT_PIN_CFG = 0x37
+INT_ENABLE = 0x38
+INT_STATUS = 0x3A
+ACCEL_XOUT_H = 0x3B
+USER_CTRL = 0x6A
+PWR_MGMT_1 = 0x6B
+FIFO_COUNTH = 0x72
+FIFO_R_W = 0x74
+
+FIFO_SIZE = 1024
+FIFO_SOURCES = 0xF8        # TEMP, XG, YG, ZG, ACCEL -> 레지스터 순서와 같은 14바이트 샘플
+USER_CTRL_FIFO_EN = 0x40
+USER_CTRL_FIFO_RESET = 0x04
+INT_DATA_RDY = 0x01
+INT_FIFO_OFLOW = 0x10
+GYRO_OUTPUT_RATE = 1000    # DLPF 사용 시 (CONFIG 1~6) 샘플 기준 주파수
+SMBUS_BLOCK_MAX = 32
+SAMPLE_LENGTH = 14  # ACCEL X/Y/Z, TEMP, GYRO X/Y/Z (각 16bit big-endian)
+
+# 미리 컴파일한 struct. 부호 있는 16bit 변환까지 한 번에 처리
+SAMPLE_STRUCT = struct.Struct('>7h')
+
+RawSample = namedtuple('RawSample', 'acc_x acc_y acc_z temp gyro_x gyro_y gyro_z')
+
+
+class MPU6050Reader:
+    """14바이트 burst 읽기로 한 번에 모든 축을 가져오는 reader"""
+
+    def __init__(self, bus, address: int = 0x68):
+        self.bus = bus
+        self.address = address
+
+    def read_raw(self) -> RawSample:
+        data = self.bus.read_i2c_block_data(self.address, ACCEL_XOUT_H, SAMPLE_LENGTH)
+        return RawSample._make(SAMPLE_STRUCT.unpack(bytes(data)))
+
+
+class FifoAcquisition:
+    """
+    MPU6050 FIFO 를 켜고 별도 스레드가 batch_interval 마다 쌓인 샘플을 한꺼번에 읽어 ring buffer 에 넣습니다.
+    FIFO 에는 시각 정보가 없으므로 샘플 주기로 시각을 이어 붙이고, 읽은 시각과 어긋나면 다시 맞춥니다.
+
+    int_pin 을 주면 (센서 INT -> Pi GPIO, BCM 번호) FIFO 가 비었을 때 data-ready 인터럽트로 깨어나고,
+    없으면 batch_interval 마다 FIFO 개수를 확인합니다.
+    clock 은 시뮬레이션/재생을 speed 배로 돌릴 때의 가상 시계 (sensorDrivers.SimClock). 샘플 시각과 읽기 주기에 사용
+    """
+
+    def __init__(self, bus, address: int = 0x68, rate_hz: int = 500, capacity: int = 4096,
+                 batch_interval: float = 0.02, int_pin: Optional[int] = None, gpio=None,
+                 clock=None):
+        if not 4 <= rate_hz <= GYRO_OUTPUT_RATE:
+            raise ValueError(f"rate_hz must be between 4 and {GYRO_OUTPUT_RATE}")
+        self.bus = bus
+        self.address = address
+        self.divider = round(GYRO_OUTPUT_RATE / rate_hz) - 1
+        self.rate_hz = GYRO_OUTPUT_RATE / (self.divider + 1)
+        self.period = 1.0 / self.rate_hz
+        # FIFO(1024바이트 = 73 샘플) 가 넘치기 전에 읽도록 제한
+        self.batch_interval = min(batch_interval, 0.5 * (FIFO_SIZE // SAMPLE_LENGTH) * self.period)
+        self.int_pin = int_pin
+        self.gpio = gpio
+        self.clock = clock
+        self.end_of_input: Optional[EOFError] = None
+
+        self.ring: deque = deque(maxlen=capacity)  # (timestamp, RawSample)
+        self.total = 0       # 지금까지 ring 에 넣은 샘플 수
+        self.consumed = 0    # read_new 로 가져간 샘플 수
+        self.next_timestamp: Optional[float] = None
+        self.condition = Condition()
+        self.stop_event = Event()
+        self.thread: Optional[Thread] = None
+        self.stats = {'samples': 0, 'reads': 0, 'fifo_overflows': 0, 'ring_dropped': 0, 'resyncs': 0}
+
+        # smbus2 는 i2c_rdwr 로 FIFO 전체를 한 트랜잭션에 읽을 수 있음. smbus 는 32바이트 block 단위
+        self.i2c_msg = None
+        if hasattr(bus, 'i2c_rdwr'):
+            try:
+                from smbus2 import i2c_msg
+                self.i2c_msg = i2c_msg
+            except ImportError:
+                pass
+
+    def configure(self) -> None:
+        """샘플링 주기, FIFO, 인터럽트 설정. 가속도/자이로 측정 범위는 변경하지 않음"""
+        def write(register, value):
+            self.bus.write_byte_data(self.address, register, value)
+
+        write(PWR_MGMT_1, 1)
+        write(CONFIG, 1)                      # DLPF 188Hz, 기준 1kHz
+        write(SMPLRT_DIV, self.divider)
+        write(FIFO_EN, 0)
+        write(USER_CTRL, USER_CTRL_FIFO_RESET)
+        write(FIFO_EN, FIFO_SOURCES)
+        write(USER_CTRL, USER_CTRL_FIFO_EN)
+        write(INT_PIN_CFG, 0x00)              # active high, push-pull, 50us 펄스
+        write(INT_ENABLE, INT_DATA_RDY | INT_FIFO_OFLOW)
+        self.next_timestamp = None
+
+        if self.int_pin is not None:
+            if self.gpio is None:
+                import RPi.GPIO as GPIO
+                self.gpio = GPIO
+            self.gpio.setmode(self.gpio.BCM)
+            self.gpio.setup(self.int_pin, self.gpio.IN, pull_up_down=self.gpio.PUD_DOWN)
+
+        logger.info(f"MPU6050 FIFO acquisition at {self.rate_hz:.0f}Hz "
+                    f"(batch {self.batch_interval * 1000:.0f}ms, int_pin={self.int_pin})")
+
+    def start(self) -> None:
+        self.configure()
+        self.thread = Thread(target=self._run, name='imu-fifo', daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+        try:
+            self.bus.write_byte_data(self.address, USER_CTRL, 0)
+            self.bus.write_byte_data(self.address, INT_ENABLE, 0)
+        except OSError as e:
+            logger.warning(f"Failed to disable MPU6050 FIFO: {e}")
+        logger.info(f"IMU acquisition stats: {self.stats}")
+
+    def read_new(self, timeout: Optional[float] = None) -> List[Tuple[float, RawSample]]:
+        """지난 호출 이후 새로 들어온 (timestamp, RawSample) 목록. timeout 동안 새 샘플을 기다림"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.total > self.consumed or self.stop_event.is_set(),
+                                    timeout=timeout)
+            available = self.total - self.consumed
+            if available == 0 and self.end_of_input is not None:
+                raise self.end_of_input
+            if available > len(self.ring):
+                # 읽는 쪽이 늦어 ring 에서 밀려난 샘플
+                self.stats['ring_dropped'] += available - len(self.ring)
+                available = len(self.ring)
+            self.consumed = self.total
+            return list(islice(self.ring, len(self.ring) - available, None))
+
+    def _fifo_count(self) -> int:
+        high, low = self.bus.read_i2c_block_data(self.address, FIFO_COUNTH, 2)
+        return (high << 8) | low
+
+    def _read_fifo(self, length: int) -> bytes:
+        if self.i2c_msg is not None:
+            write = self.i2c_msg.write(self.address, [FIFO_R_W])
+            read = self.i2c_msg.read(self.address, length)
+            self.bus.i2c_rdwr(write, read)
+            return bytes(read)
+        # 32바이트 제한 안에서 샘플 경계 (28바이트) 단위로 읽음
+        chunk = (SMBUS_BLOCK_MAX // SAMPLE_LENGTH) * SAMPLE_LENGTH
+        data = bytearray()
+        while len(data) < length:
+            data += bytes(self.bus.read_i2c_block_data(self.address, FIFO_R_W, min(chunk, length - len(data))))
+        return bytes(data)
+
+    def _reset_fifo(self) -> None:
+        self.bus.write_byte_data(self.address, USER_CTRL, USER_CTRL_FIFO_RESET)
+        self.bus.write_byte_data(self.address, USER_CTRL, USER_CTRL_FIFO_EN)
+        self.next_timestamp = None
+
+    def _drain(self) -> int:
+        """FIFO 에 쌓인 샘플을 모두 읽어 ring 에 넣고 샘플 수를 반환"""
+        if self.bus.read_byte_data(self.address, INT_STATUS) & INT_FIFO_OFLOW:
+            # 넘친 FIFO 는 샘플 경계가 어긋나 있으므로 비우고 다시 시작
+            self.stats['fifo_overflows'] += 1
+            logger.warning("MPU6050 FIFO overflow, resetting")
+            self._reset_fifo()
+            return 0
+
+        count = self._fifo_count() // SAMPLE_LENGTH
+        if count == 0:
+            return 0
+        data = self._read_fifo(count * SAMPLE_LENGTH)
+        read_time = self.clock.time() if self.clock else time.time()
+        self.stats['reads'] += 1
+
+        # 마지막 샘플이 읽은 시각에 측정되었다고 보고 역산한 시각과, 이전 샘플에서 이어 붙인 시각 비교
+        first = read_time - (count - 1) * self.period
+        if self.next_timestamp is None or abs(self.next_timestamp - first) > self.batch_interval + self.period:
+            if self.next_timestamp is not None:
+                self.stats['resyncs'] += 1
+            self.next_timestamp = first
+
+        samples = []
+        timestamp = self.next_timestamp
+        for values in SAMPLE_STRUCT.iter_unpack(data):
+            samples.append((timestamp, RawSample._make(values)))
+            timestamp += self.period
+        self.next_timestamp = timestamp
+
+        with self.condition:
+            self.ring.extend(samples)
+            self.total += count
+            self.stats['samples'] += count
+            self.condition.notify_all()
+        return count
+
+    def _run(self) -> None:
+        while not self.stop_event.is_set():
+            try:
+                count = self._drain()
+            except OSError as e:
+                logger.error(f"IMU FIFO read failed: {e}")
+                self.stop_event.wait(0.5)
+                continue
+            except EOFError as e:
+                # 재생 중인 기록이 끝남 (sensorTrace). read_new 가 같은 예외를 전달
+                self.end_of_input = e
+                break
+            if count == 0 and self.int_pin is not None:
+                # FIFO 가 비어 있으면 다음 data-ready 인터럽트까지 대기 (CPU 사용 없음)
+                self.gpio.wait_for_edge(self.int_pin, self.gpio.RISING, timeout=1000)
+            self.stop_event.wait(self.batch_interval / (self.clock.speed if self.clock else 1.0))
+        with self.condition:
+            self.condition.notify_all()
+
+
+def _read_per_register(bus, address: int) -> tuple:
+    """비교용: 기존 방식 (축마다 read_byte_data 두 번)"""
+    values = []
+    for register in (0x3B, 0x3D, 0x3F, 0x43, 0x45, 0x47):
+        high = bus.read_byte_data(address, register)
+        low = bus.read_byte_data(address, register + 1)
+        value = (high << 8) | low
+        values.append(value - 65536 if value >= 32768 else value)
+    return tuple(values)
+
+
+def main():
+    import smbus
+
+    bus = smbus.SMBus(1)
+    reader = MPU6050Reader(bus)
+    bus.write_byte_data(reader.address, 0x6B, 1)  # PWR_MGMT_1: sleep 해제
+
+    for name, read in (('per-register', lambda: _read_per_register(bus, reader.address)),
+                       ('block', reader.read_raw)):
+        count = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < 3.0:
+            read()
+            count += 1
+        print(f"{name:<14}{count / (time.perf_counter() - started):>10.0f} samples/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -27,6 +27,7 @@ class TCPClient:
         self.reconnect_attempts = reconnect_attempts
         self.reconnect_delay = reconnect_delay
         self.connection_timeout = 10.0  # 연결 타임아웃 설정
+        self.last_reconnect = 0.0  # send_bytes 가 마지막으로 재연결을 시도한 시각 (time.monotonic)
 
         logger.info(f"Initializing client for {server_host}:{server_port}")
 
@@ -208,6 +209,29 @@ class TCPClient:
         except Exception as e:
             logger.error(f"Unexpected error while sending message: {e}")
 
+    def send_bytes(self, payload: bytes) -> bool:
+        """
+        이미 인코딩된 데이터를 그대로 전송합니다 (sendall).
+        전송 실패 시 재연결을 시도하고 False 를 반환합니다.
+        재연결이 모두 실패해 끊긴 상태면 reconnect_delay 마다 한 번씩 다시 재연결한 뒤 전송합니다.
+        """
+        if not self.is_connected:
+            if time.monotonic() - self.last_reconnect < self.reconnect_delay:
+                return False
+            self.reconnect()
+            self.last_reconnect = time.monotonic()
+            if not self.is_connected:
+                return False
+
+        try:
+            with self._lock:
+                self.client_socket.sendall(payload)
+            return True
+        except (socket.error, ConnectionError) as e:
+            logger.error(f"Socket error while sending payload: {e}")
+            self.reconnect()
+            return False
+
     def reconnect(self):
         """
         [예외처리 보강 9] 재연결 로직 개선
@@ -1,10 +1,25 @@
-from flask import Flask, request, render_template, jsonify
-import RPi.GPIO as GPIO
+from flask import Flask, Response, request, render_template, jsonify
+try:
+    import RPi.GPIO as GPIO
+except ImportError:  # Pi 가 아닌 곳에서 --simulate 로 실행 (서보는 mock PWM)
+    GPIO = None
 import time
-from RPLCD.i2c import CharLCD
-import serial
-from threading import Thread, Event, Lock
+from threading import Event, Lock, Condition
+import _thread
 import socketCommunication
+import picoProtocol
+import sensorStream
+import appServer
+import responseCache
+import lcdFramebuffer
+import dutyTable
+import pwmBackend
+import servoMotion
+import sensorPipeline
+import sensorSnapshot
+import sensorDrivers
+import sensorTrace
+import argparse
 import json
 import logging
 from typing import Optional, Dict, Any
@@ -25,12 +40,21 @@ class ServoSpecs:
     MIN_DUTY: float = 2.5  # 수정된 duty cycle 값
     MAX_DUTY: float = 12.5  # 수정된 duty cycle 값
     FREQUENCY: int = 50
-    STEP_DELAY: float = 0.01  # 점진적 이동을 위한 딜레이
+    DUTY_RESOLUTION: float = 1.0  # 각도 -> duty 조회표 간격(도)
+    CALIBRATION_FILE: Optional[str] = None  # 측정한 (각도, duty) 점 파일. dutyTable.py 로 생성
+    STEP_DELAY: float = 0.02  # 점진적 이동 위치 갱신 주기 (50Hz PWM 한 주기)
+    MAX_SPEED: float = 300.0  # 점진적 이동 최고 속도 (deg/s)
+    ACCELERATION: float = 1500.0  # 가속/감속 (deg/s^2)
 
 class ServoController:
-    def __init__(self, pin: int, specs: Optional[ServoSpecs] = None):
+    def __init__(self, pin: int, specs: Optional[ServoSpecs] = None, pwm_backend: str = 'auto'):
+        """
+        pwm_backend : 'auto' (하드웨어 PWM 핀이면 sysfs, 아니면 RPi.GPIO), 'sysfs', 'software', 'mock'
+        """
         self.pin = pin
+        self.pwm_backend = pwm_backend
         self.specs = specs or ServoSpecs()
+        self.duty_table = dutyTable.DutyTable.from_specs(self.specs)  # 같은 스펙이면 표 공유
         self.current_angle = 90  # 초기 각도
         self.lock = Lock()
         self.initialized = False
@@ -39,14 +63,25 @@ class ServoController:
         
         self._initialize_gpio()
 
+        # 점진적 이동은 별도 스레드의 플래너가 담당. HTTP 요청 스레드는 목표만 넘기고 반환
+        self.planner = servoMotion.MotionPlanner(
+            self._set_duty, self.duty_table, start_angle=self.current_angle,
+            max_speed=self.specs.MAX_SPEED, acceleration=self.specs.ACCELERATION,
+            tick=self.specs.STEP_DELAY, on_error=self._handle_error)
+        self.planner.start()
+
     def _initialize_gpio(self) -> None:
         """GPIO 및 PWM 초기화"""
         try:
-            GPIO.setmode(GPIO.BCM)
-            GPIO.setwarnings(False)
-            GPIO.setup(self.pin, GPIO.OUT)
+            if GPIO is not None:
+                GPIO.setmode(GPIO.BCM)
+                GPIO.setwarnings(False)
+            if getattr(self, 'pwm', None) is not None:
+                self.pwm.close()  # 재초기화: 이전 PWM 채널 반환
             
-            self.pwm = GPIO.PWM(self.pin, self.specs.FREQUENCY)
+            # 하드웨어 PWM 은 펄스 폭이 CPU 부하와 무관해 서보 떨림이 없음
+            self.pwm = pwmBackend.create_pwm(self.pin, self.specs.FREQUENCY,
+                                             backend=self.pwm_backend, gpio=GPIO)
             initial_duty = self._angle_to_duty(90)
             self.pwm.start(initial_duty)
             #time.sleep(0.5)  # 초기화 안정화 대기
@@ -59,159 +94,209 @@ class ServoController:
             raise
 
     def _angle_to_duty(self, angle: float) -> float:
-        """각도를 duty cycle로 변환"""
-        # 각도 범위 제한
-        angle = max(self.specs.MIN_ANGLE, min(self.specs.MAX_ANGLE, angle))
-        
-        # duty cycle 계산
-        duty_range = self.specs.MAX_DUTY - self.specs.MIN_DUTY
-        duty = self.specs.MIN_DUTY + (angle * duty_range / 180.0)
-        return duty
-
-    def _smooth_move(self, target_angle: int) -> bool:
-        """점진적으로 서보 모터 이동"""
-        start_angle = self.current_angle
-        angle_diff = target_angle - start_angle
-        
-        if abs(angle_diff) <= 1:
-            return self._direct_move(target_angle)
+        """각도를 duty cycle로 변환 (미리 계산한 표 조회, 범위 밖 각도는 양 끝으로 제한)"""
+        return self.duty_table.duty(angle)
 
-        steps = abs(angle_diff)
-        angle_increment = 10 #if angle_diff > 0 else -1
+    def _set_duty(self, duty: float) -> None:
+        """플래너 스레드에서 호출. 재초기화 후에도 현재 pwm 객체를 사용"""
+        self.pwm.ChangeDutyCycle(duty)
 
-        try:
-            for step in range(steps):
-                current = start_angle + (step * angle_increment)
-                if not self._direct_move(current):
-                    return False
-                time.sleep(self.specs.STEP_DELAY)
-            
-            # 최종 목표 각도로 이동
-            return self._direct_move(target_angle)
-        
-        except Exception as e:
-            logger.error(f"Smooth move failed: {e}")
-            return False
+    def _handle_error(self, error: Exception) -> None:
+        """이동 실패 처리. 에러가 자주 발생하면 재초기화 시도"""
+        self.error_count += 1
+        current_time = time.time()
 
-    def _direct_move(self, angle: int) -> bool:
-        """직접 서보 모터 제어"""
-        try:
-            duty = self._angle_to_duty(angle)
-            self.pwm.ChangeDutyCycle(duty)
-            time.sleep(0.1)  # 안정화 대기
-            self.pwm.ChangeDutyCycle(0)  # 떨림 방지
-            return True
-        except Exception as e:
-            logger.error(f"Direct move failed: {e}")
-            return False
+        if self.error_count >= 3 and (current_time - self.last_error_time) < 60:
+            logger.warning("Multiple servo errors detected, attempting reinitialization")
+            try:
+                self._initialize_gpio()
+            except Exception:
+                pass  # 실패 원인은 _initialize_gpio 에서 기록, 다음 이동에서 다시 시도
+            self.error_count = 0
 
-    def move_to(self, angle: int) -> bool:
-        """서보 모터를 지정된 각도로 이동"""
+        self.last_error_time = current_time
+
+    def move_to_async(self, angle: int) -> Optional[servoMotion.MotionPlan]:
+        """목표 각도를 플래너에 넘기고 바로 반환. 이동 계획(완료 예정 시각 포함)을 반환"""
         if not self.initialized:
             logger.error("Servo not initialized")
-            return False
+            return None
 
         with self.lock:
             try:
-                logger.info(f"Moving servo from {self.current_angle} to {angle} degrees")
-                
-                if self._smooth_move(angle):
-                    self.current_angle = angle
-                    self.error_count = 0
-                    logger.info(f"Servo successfully moved to {angle} degrees")
-                    return True
-                
-                self.error_count += 1
-                current_time = time.time()
-                
-                # 에러가 자주 발생하면 재초기화 시도
-                if self.error_count >= 3 and (current_time - self.last_error_time) < 60:
-                    logger.warning("Multiple servo errors detected, attempting reinitialization")
-                    self._initialize_gpio()
-                    self.error_count = 0
-                
-                self.last_error_time = current_time
-                return False
-                
+                plan = self.planner.set_target(angle)
+                logger.info(f"Moving servo from {plan.start:.0f} to {plan.target:.0f} degrees "
+                            f"({plan.duration:.2f}s)")
+                self.current_angle = int(plan.target)
+                return plan
             except Exception as e:
                 logger.error(f"Servo control error: {e}")
-                return False
+                return None
+
+    def move_to(self, angle: int) -> bool:
+        """서보 모터를 지정된 각도로 이동하고 완료될 때까지 대기"""
+        plan = self.move_to_async(angle)
+        if plan is None:
+            return False
+        # 기다리는 동안 새 목표가 오면 그 이동이 끝날 때까지 대기
+        if not self.planner.wait(timeout=plan.duration + self.planner.settle_time + 1.0):
+            logger.error(f"Servo did not reach {angle} degrees in time")
+            return False
+        if plan.error is not None:
+            logger.error(f"Servo failed to move to {angle} degrees: {plan.error}")
+            return False
+        self.error_count = 0
+        logger.info(f"Servo successfully moved to {angle} degrees")
+        return True
 
     def get_current_angle(self) -> int:
-        """현재 서보 모터 각도 반환"""
+        """현재 서보 모터 목표 각도 반환 (이동 중이면 이동이 끝났을 때의 각도)"""
         with self.lock:
             return self.current_angle
 
     def cleanup(self) -> None:
         """서보 모터 정리"""
         try:
-            if hasattr(self, 'pwm'):
-                self.pwm.stop()
-            GPIO.cleanup(self.pin)
+            if hasattr(self, 'planner'):
+                self.planner.stop()
+            if getattr(self, 'pwm', None) is not None:
+                self.pwm.close()
             logger.info("Servo cleanup completed")
         except Exception as e:
             logger.error(f"Servo cleanup error: {e}")
 
 class SensorData:
+    """
+    값은 sensorSnapshot 으로 보관. 읽기 (get_data, 속성) 는 lock 없이 현재 snapshot 을 사용하고,
+    쓰기 (센서 store stage, 서보 HTTP 요청) 만 snapshot 저장소 안에서 순서를 맞춤
+    """
     def __init__(self):
-        self.temperature: Optional[float] = None
-        self.humidity: Optional[float] = None
-        self.servo_position: int = 90
+        self.store = sensorSnapshot.SnapshotStore(
+            {'temperature': None, 'humidity': None, 'servo_position': 90}, format=self._format)
         self.lock = Lock()
-        self.last_update = time.time()
+        self.changed = Condition(self.lock)  # 값이 바뀔 때만 알림 (SSE)
+
+    @staticmethod
+    def _format(snapshot: sensorSnapshot.Snapshot) -> Dict[str, Any]:
+        return {
+            'temperature': snapshot.temperature,
+            'humidity': snapshot.humidity,
+            'servo_position': snapshot.servo_position,
+            'last_update': snapshot.timestamp
+        }
+
+    def snapshot(self) -> sensorSnapshot.Snapshot:
+        return self.store.current
+
+    @property
+    def temperature(self) -> Optional[float]:
+        return self.store.current.temperature
+
+    @property
+    def humidity(self) -> Optional[float]:
+        return self.store.current.humidity
+
+    @property
+    def servo_position(self) -> int:
+        return self.store.current.servo_position
+
+    @property
+    def last_update(self) -> float:
+        return self.store.current.timestamp
+
+    @property
+    def revision(self) -> int:
+        """값이 바뀔 때만 증가 (last_update 만 바뀐 경우 제외). 캐시 키는 snapshot.version"""
+        return self.store.current.revision
+
+    def _publish(self, **changes) -> None:
+        if self.store.publish(**changes):
+            with self.changed:
+                self.changed.notify_all()
     
     def update_sensor_data(self, temperature: Optional[float], humidity: Optional[float]) -> None:
-        with self.lock:
-            self.temperature = temperature
-            self.humidity = humidity
-            self.last_update = time.time()
+        self._publish(temperature=temperature, humidity=humidity)
     
     def update_servo_position(self, position: int) -> None:
-        with self.lock:
-            self.servo_position = position
-            self.last_update = time.time()
+        self._publish(servo_position=position)
     
     def get_data(self) -> Dict[str, Any]:
-        with self.lock:
-            return {
-                'temperature': self.temperature,
-                'humidity': self.humidity,
-                'servo_position': self.servo_position,
-                'last_update': self.last_update
-            }
+        return self.store.current.as_dict()
 
 class LCDController:
-    def __init__(self):
+    STATS_INTERVAL = 150  # 갱신 N회마다 I2C 트랜잭션 통계 기록 (2초 주기 기준 약 5분)
+
+    def __init__(self, mode: str = 'diff', bus=None):
+        """
+        mode : 'diff' (바뀐 칸만 block write), 'full' (기존 방식: clear 후 전체 다시 쓰기, 비교 측정용)
+        bus  : 주면 RPLCD 초기화 없이 이 bus 로 framebuffer 만 사용 (sensorDrivers 시뮬레이션 bus, diff 모드만)
+        """
+        if mode not in ('diff', 'full'):
+            raise ValueError(f"Unknown LCD mode: {mode}")
+        if bus is not None and mode == 'full':
+            raise ValueError("LCD mode 'full' requires RPLCD")
         try:
-            self.lcd = CharLCD(i2c_expander='PCF8574', address=0x27, port=1, cols=16, rows=2, dotsize=8)
-            self.lcd.clear()
             self.lock = Lock()
             self.connection_status = False
+            self.mode = mode
+            if bus is None:
+                # RPLCD 는 실제 LCD 를 쓸 때만 필요 (--simulate / --replay 는 RPLCD 없이 실행)
+                from RPLCD.i2c import CharLCD
+                self.lcd = CharLCD(i2c_expander='PCF8574', address=0x27, port=1, cols=16, rows=2, dotsize=8)
+                self.lcd.clear()
+                # 초기화는 RPLCD 가 담당하고, 이후 쓰기는 framebuffer 가 shadow 와 비교해 바뀐 칸만 전송
+                self.bus = lcdFramebuffer.CountingBus(self.lcd.bus)
+                self.lcd.bus = self.bus
+            else:
+                self.lcd = None
+                self.bus = lcdFramebuffer.CountingBus(bus)
+            self.framebuffer = lcdFramebuffer.LCDFramebuffer(
+                lcdFramebuffer.PCF8574Writer(self.bus, address=0x27), cols=16, rows=2)
+            self.updates = 0
+            self.update_transactions = 0
         except Exception as e:
             logger.error(f"Error initializing LCD: {e}")
             raise
     
     def update_display(self, temperature: Optional[float], humidity: Optional[float]):
+        status_str = "Online" if self.connection_status else "Offline"
+        temp_str = f"{temperature}C" if temperature is not None else "N/A"
+        humid_str = f"{humidity}%" if humidity is not None else "N/A"
+        lines = [f"T:{temp_str} H:{humid_str}", status_str]
+
         with self.lock:
             try:
-                self.lcd.clear()
-                status_str = "Online" if self.connection_status else "Offline"
-                self.lcd.cursor_pos = (1,0)
-                self.lcd.write_string(f"{status_str}\n")
-                
-                temp_str = f"{temperature}C" if temperature is not None else "N/A"
-                humid_str = f"{humidity}%" if humidity is not None else "N/A"
-                self.lcd.write_string(f"T:{temp_str} H:{humid_str}")
+                before = self.bus.transactions
+                if self.mode == 'full':
+                    self.lcd.clear()
+                    for row, line in enumerate(lines):
+                        self.lcd.cursor_pos = (row, 0)
+                        self.lcd.write_string(line)
+                else:
+                    self.framebuffer.update(lines)
+                self.updates += 1
+                self.update_transactions += self.bus.transactions - before
+                if self.updates % self.STATS_INTERVAL == 0:
+                    logger.info(f"LCD ({self.mode}): {self.update_transactions / self.updates:.1f} "
+                                f"I2C transactions/update over {self.updates} updates")
             except Exception as e:
                 logger.error(f"Error updating LCD: {e}")
 
 class SensorReader:
-    def __init__(self, serial_port: str = '/dev/serial0', baud_rate: int = 9600):
+    def __init__(self, serial_port: str = '/dev/serial0', baud_rate: int = 9600, profile: Optional[str] = None,
+                 clock: Optional[sensorDrivers.SimClock] = None, trace: Optional[sensorTrace.TraceSession] = None):
+        """
+        profile : sensorDrivers 시뮬레이션 프로파일 ('dht'). 없으면 실제 시리얼 포트
+        trace   : 받은 줄을 기록하거나 포트 대신 기록을 재생 (sensorTrace)
+        """
         try:
-            self.ser = serial.Serial(serial_port, baud_rate, timeout=1)
+            def open_port():
+                return sensorDrivers.open_serial(serial_port, baud_rate, timeout=1, profile=profile, clock=clock)
+            self.ser = trace.serial(open_port) if trace else open_port()
             self.stop_event = Event()
             self.lock = Lock()
             self.serial_port = serial_port
+            self.parser = picoProtocol.LineParser()
         except Exception as e:
             logger.error(f"Error initializing serial port: {e}")
             raise
@@ -219,11 +304,17 @@ class SensorReader:
     def read_data(self) -> tuple[Optional[float], Optional[float]]:
         with self.lock:
             try:
-                if self.ser.in_waiting > 0:
-                    data = self.ser.readline().decode('utf-8').strip()
-                    if data:
-                        temp, humid = data.split(',')
-                        return float(temp), float(humid)
+                # 한 줄이 오거나 timeout(1초) 까지 대기. in_waiting 을 반복 확인하지 않음
+                raw = self.ser.readline()
+                if raw:
+                    # 잘못된 줄은 parser 가 counters / dead_letters 에 기록하고 None 을 반환
+                    message = self.parser.parse(raw)
+                    if isinstance(message, picoProtocol.DHTReading):
+                        return message.temperature, message.humidity
+                    if isinstance(message, picoProtocol.SensorError):
+                        logger.warning("Pico reported a sensor read error")
+            except EOFError:  # 재생 기록 끝 (sensorTrace.TraceEnd) 은 pipeline 이 처리
+                raise
             except Exception as e:
                 logger.error(f"Error reading sensor data: {e}")
             return None, None
@@ -236,29 +327,55 @@ class SensorReader:
                     self.ser.flush()
                     self.ser.close()
                     logger.info(f"Serial port {self.serial_port} closed successfully")
+                logger.info(f"Serial line stats: {self.parser.summary()}")
+                self.parser.close()
         except Exception as e:
             logger.error(f"Error during serial port cleanup : {e}")
 
-def create_app():
+def create_app(servo_pin: int = 17, pwm_backend: str = 'auto', simulate: bool = False, speed: float = 1.0,
+               record: Optional[str] = None, replay: Optional[str] = None):
+    """
+    simulate : Pico (DHT), LCD, 서보 대신 sensorDrivers 시뮬레이션 장치와 mock PWM 사용 (DHT 는 speed 배속)
+    record   : Pico 에서 받은 줄과 TCP 전송 데이터를 sensorTrace 파일로 기록
+    replay   : Pico 대신 sensorTrace 기록을 speed 배속으로 재생 (LCD, 서보는 simulate 와 같이 시뮬레이션)
+    """
     app = Flask(__name__)
     sensor_data = SensorData()
-    servo_controller = ServoController(17)  # GPIO 17 사용
-    lcd_controller = LCDController()
+    offline = simulate or replay is not None
+    # 기본 GPIO 17 (소프트웨어 PWM). 하드웨어 PWM 은 GPIO 18 에 연결하고 servo_pin=18
+    servo_controller = ServoController(servo_pin, pwm_backend='mock' if offline else pwm_backend)
+    if offline:
+        clock = sensorDrivers.SimClock(speed)
+        lcd_controller = LCDController(bus=sensorDrivers.open_i2c_bus(1, devices={0x27: sensorDrivers.I2CSink()}))
+    else:
+        clock = sensorDrivers.SimClock()
+        lcd_controller = LCDController()
+    trace = sensorTrace.TraceSession(record=record, replay=replay, clock=clock)
     global sensor_reader
-    sensor_reader = SensorReader()
+    sensor_reader = SensorReader(profile='dht' if simulate else None, clock=clock, trace=trace)
+    sensor_stream = sensorStream.SensorStream(sensor_data)
+    # 시리얼 읽기 -> SensorData -> LCD 표시를 별도 스레드로 분리 (LCD 가 느려도 읽기는 계속)
+    def replay_finished(error: EOFError) -> None:
+        # 메인 스레드의 서버를 Ctrl+C 와 같은 경로로 종료 (appServer 의 SIGINT handler -> shutdown)
+        logger.info(f"Replay finished: {error}")
+        _thread.interrupt_main()
+
+    sensor_pipeline = sensorPipeline.SensorPipeline(sensor_reader, sensor_data, lcd_controller,
+                                                    display_interval=2.0, on_end=replay_finished)
 
     # TCP 클라이언트 초기화
     tcp_client = socketCommunication.TCPClient('192.168.0.2', 12345)
-    
-    def sensor_thread():
-        while not sensor_reader.stop_event.is_set():
-            try:
-                temp, humid = sensor_reader.read_data()
-                sensor_data.update_sensor_data(temp, humid)     ######
-                lcd_controller.update_display(temp, humid)
-                time.sleep(2)
-            except Exception as e:
-                logger.error(f"Error in sensor thread: {e}")
+
+    # 같은 값이면 템플릿 렌더링/JSON 직렬화 없이 저장된 응답 사용
+    page_cache = responseCache.ResponseCache()
+    data_cache = responseCache.ResponseCache(max_entries=4)
+
+    def render_page(conditional: bool = False, **context):
+        """remote_monitor.html 을 변수 조합별로 한 번만 렌더링"""
+        return page_cache.respond(
+            responseCache.template_key('remote_monitor.html', **context),
+            lambda: render_template('remote_monitor.html', **context).encode('utf-8'),
+            'text/html', conditional=conditional)
     
     @app.route('/sg90_control')
     def sg90_control():
@@ -268,7 +385,7 @@ def create_app():
             if not success:
                 logger.error("Failed to control servo")
                 return jsonify({'error': 'Servo control failed'}), 500
-            return render_template('remote_monitor.html', degree=current_pos)
+            return render_page(degree=current_pos)
         except Exception as e:
             logger.error(f"Error in sg90_control: {e}")
             return jsonify({'error': str(e)}), 500
@@ -289,10 +406,14 @@ def create_app():
 
                 logger.info(f"Attempting to move servo from {current_pos} to {new_pos}")
                 
-                if servo_controller.move_to(new_pos):
+                # 이동 완료를 기다리지 않고 응답. 완료 예정 시각은 헤더로 전달
+                plan = servo_controller.move_to_async(new_pos)
+                if plan is not None:
                     sensor_data.update_servo_position(new_pos)
-                    logger.info(f"Servo successfully moved to {new_pos}")
-                    return render_template('remote_monitor.html', degree=new_pos)
+                    response = render_page(degree=new_pos)
+                    response.headers['X-Servo-Duration'] = f"{plan.duration:.3f}"
+                    response.headers['X-Servo-Complete-At'] = f"{plan.completes_at:.3f}"
+                    return response
                 else:
                     logger.error("Servo movement failed")
                     return jsonify({'error': 'Servo movement failed'}), 500
@@ -304,32 +425,73 @@ def create_app():
     @app.route('/monitor')
     def monitor():
         data = sensor_data.get_data()
-        return render_template('remote_monitor.html', 
-                             temperature=data['temperature'], 
-                             humidity=data['humidity'])
+        return render_page(conditional=True,
+                           temperature=data['temperature'],
+                           humidity=data['humidity'])
     
     @app.route('/get_data', methods=['GET'])
     def get_data():
-        return jsonify(sensor_data.get_data())
+        # snapshot 이 바뀔 때만 다시 직렬화 (JSON 은 snapshot 에 캐시). If-None-Match 가 일치하면 304
+        snapshot = sensor_data.snapshot()
+        return data_cache.respond(
+            snapshot.version,
+            lambda: (snapshot.json() + "\n").encode('utf-8'),
+            'application/json', conditional=True)
+
+    @app.route('/stream')
+    def stream():
+        """센서 값이 바뀔 때마다 push 하는 Server-Sent Events 스트림"""
+        return Response(sensor_stream.events(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
     
-    # 센서 데이터 읽기 쓰레드 시작
-    sensor_thread = Thread(target=sensor_thread, daemon=True)
-    sensor_thread.start()
+    # 센서 읽기 / 저장 / LCD 표시 쓰레드 시작
+    sensor_pipeline.start()
+    sensor_stream.start()
     
     # TCP 클라이언트 시작
     if tcp_client.start():
-        tcp_client.start_periodic_send(sensor_data.get_data, 2.0)
+        tcp_client.start_periodic_send(trace.tcp_callback(sensor_data.get_data), 2.0)
+
+    def shutdown():
+        """센서 스레드, SSE 연결, TCP, 시리얼, 서보 정리"""
+        sensor_reader.stop_event.set()
+        sensor_pipeline.stop()
+        sensor_stream.stop()
+        tcp_client.close()
+        sensor_reader.cleanup()
+        trace.close()
+        servo_controller.cleanup()
+
+    app.sensor_stream = sensor_stream
+    app.shutdown = shutdown
     
     return app
 
 if __name__ == '__main__':
-    app = create_app()
+    parser = argparse.ArgumentParser(description="Scenario 3 Raspberry Pi 4 web server")
+    parser.add_argument('--host', default='192.168.0.4')
+    parser.add_argument('--port', type=int, default=10002)
+    parser.add_argument('--server', choices=appServer.SERVERS, default='auto',
+                        help="waitress: 운영용 WSGI 서버, dev: Flask 개발 서버, auto: 설치되어 있으면 waitress")
+    parser.add_argument('--threads', type=int, default=16, help="동시 처리 요청 수 (SSE 시청자 수보다 크게)")
+    parser.add_argument('--servo-pin', type=int, default=17, help="서보 신호선 BCM 번호 (하드웨어 PWM: 12, 13, 18, 19)")
+    parser.add_argument('--pwm', choices=pwmBackend.BACKENDS, default='auto',
+                        help="auto: 하드웨어 PWM 핀이면 sysfs, 아니면 RPi.GPIO 소프트웨어 PWM")
+    parser.add_argument('--simulate', action='store_true', help="Pico, LCD, 서보 없이 시뮬레이션 장치로 실행")
+    parser.add_argument('--speed', type=float, default=1.0, help="시뮬레이션/재생 배속 (--simulate, --replay 일 때)")
+    parser.add_argument('--record', default=None, help="Pico 입력과 TCP 전송 데이터를 기록할 파일")
+    parser.add_argument('--replay', default=None, help="Pico 대신 재생할 기록 파일")
+    args = parser.parse_args()
+
+    app = create_app(servo_pin=args.servo_pin, pwm_backend=args.pwm, simulate=args.simulate, speed=args.speed,
+                     record=args.record, replay=args.replay)
     try:
-        app.run(debug=False, port=10002, host='192.168.0.4')  # debug=False로 설정하여 reloader 비활성화
+        appServer.serve(app, args.host, args.port, server=args.server, threads=args.threads,
+                        on_stop=app.sensor_stream.stop)
     except KeyboardInterrupt:
         logger.info("Application shutting down...")
     finally:
         logger.info("Cleaning up resources...")
-        if 'sensor_reader' in globals():
-            sensor_reader.cleanup()
-        GPIO.cleanup()
\ No newline at end of file
+        app.shutdown()
+        if GPIO is not None:
+            GPIO.cleanup()
\ No newline at end of file
@@ -0,0 +1,63 @@
+import logging
+import signal
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+SERVERS = ('auto', 'waitress', 'dev')
+
+
+def serve(app, host: str, port: int, server: str = 'auto', threads: int = 16,
+          connection_limit: int = 100, channel_timeout: int = 120,
+          on_stop: Optional[Callable[[], None]] = None) -> None:
+    """
+    Flask 앱을 한 프로세스 안에서 멀티스레드로 서비스합니다.
+    GPIO/시리얼은 프로세스당 하나만 열 수 있으므로 멀티 프로세스 worker 는 사용하지 않습니다.
+
+    server   : 'waitress' (운영용 WSGI 서버), 'dev' (werkzeug threaded), 'auto' (waitress 가 있으면 waitress)
+    threads  : 동시 처리 요청 수. SSE(/stream) 연결 하나가 스레드 하나를 점유하므로 시청자 수보다 크게 설정
+    on_stop  : 서버를 닫기 전에 호출, 여러 번 호출될 수 있음 (예: SSE 스트림 종료로 worker 스레드 반환)
+    """
+    if server not in SERVERS:
+        raise ValueError(f"Unknown server: {server}")
+
+    def handle_signal(signum, frame):
+        # waitress 는 종료 시 worker 스레드를 기다리므로 SSE 스트림을 먼저 끝냄
+        if on_stop:
+            on_stop()
+        # systemd / pkill 의 SIGTERM 도 Ctrl+C 와 같은 정리 경로를 타도록 함
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    if server in ('auto', 'waitress'):
+        try:
+            from waitress import create_server
+            server = 'waitress'
+        except ImportError:
+            if server == 'waitress':
+                raise
+            logger.warning("waitress is not installed, falling back to the threaded development server")
+            server = 'dev'
+
+    if server == 'waitress':
+        # HTTP/1.1 keep-alive 는 waitress 기본 동작
+        httpd = create_server(app, host=host, port=port, threads=threads,
+                              connection_limit=connection_limit,
+                              channel_timeout=channel_timeout, ident='sn3')
+        run, close = httpd.run, httpd.close
+    else:
+        from werkzeug.serving import make_server, WSGIRequestHandler
+        WSGIRequestHandler.protocol_version = "HTTP/1.1"  # keep-alive 허용
+        httpd = make_server(host, port, app, threaded=True)
+        run, close = httpd.serve_forever, httpd.server_close
+
+    logger.info(f"Serving on http://{host}:{port} with {server} ({threads} threads)")
+    try:
+        run()
+    finally:
+        logger.info("Stopping web server...")
+        if on_stop:
+            on_stop()
+        close()
@@ -0,0 +1,98 @@
+## 서보 각도 -> PWM duty cycle 조회표
+##
+## 각도 범위를 resolution 간격으로 미리 계산해 두고 이동할 때는 표에서 꺼내 씁니다.
+## 기본값은 ServoSpecs 의 MIN_DUTY ~ MAX_DUTY 직선이며,
+## 서보마다 실제 끝점이 다르면 측정한 (각도, duty) 점으로 보정표를 만들 수 있습니다.
+##
+##   python dutyTable.py --point 0 2.7 --point 90 7.3 --point 180 12.1 -o servo_calibration.json
+
+import argparse
+import bisect
+import json
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+Point = Tuple[float, float]  # (각도, duty)
+
+
+class DutyTable:
+    def __init__(self, points: Sequence[Point], min_angle: float = 0, max_angle: float = 180,
+                 resolution: float = 1.0):
+        """
+        points     : 보정 점 (각도, duty). 점 사이는 직선 보간, 범위 밖은 양 끝 두 점으로 연장
+        resolution : 표 간격(도). 0.5 이면 0.5도 단위로 조회
+        """
+        points = sorted((float(angle), float(duty)) for angle, duty in points)
+        if len(points) < 2 or len({angle for angle, _ in points}) != len(points):
+            raise ValueError("At least two calibration points with distinct angles are required")
+        if resolution <= 0 or max_angle <= min_angle:
+            raise ValueError("Invalid angle range or resolution")
+
+        self.points = points
+        self.min_angle = min_angle
+        self.max_angle = max_angle
+        self.resolution = resolution
+        self.scale = 1.0 / resolution
+        count = int(round((max_angle - min_angle) / resolution)) + 1
+        self.table: List[float] = [self._interpolate(min(max_angle, min_angle + i * resolution))
+                                   for i in range(count)]
+
+    def _interpolate(self, angle: float) -> float:
+        angles = [a for a, _ in self.points]
+        i = min(max(bisect.bisect_right(angles, angle), 1), len(self.points) - 1)
+        (a0, d0), (a1, d1) = self.points[i - 1], self.points[i]
+        return d0 + (angle - a0) * (d1 - d0) / (a1 - a0)
+
+    def index(self, angle: float) -> int:
+        """각도에 해당하는 표 위치 (범위 밖 각도는 양 끝으로 제한)"""
+        i = int((angle - self.min_angle) * self.scale + 0.5)
+        return 0 if i < 0 else min(i, len(self.table) - 1)
+
+    def duty(self, angle: float) -> float:
+        i = int((angle - self.min_angle) * self.scale + 0.5)
+        return self.table[0 if i < 0 else min(i, len(self.table) - 1)]
+
+    def angle(self, index: int) -> float:
+        return min(self.max_angle, self.min_angle + index * self.resolution)
+
+    @classmethod
+    def from_specs(cls, specs, resolution: Optional[float] = None) -> "DutyTable":
+        """ServoSpecs 로 표 생성. CALIBRATION_FILE 이 있으면 그 점을, 없으면 0~180도 = MIN~MAX_DUTY 직선을 사용"""
+        return _cached_table(specs.MIN_ANGLE, specs.MAX_ANGLE, specs.MIN_DUTY, specs.MAX_DUTY,
+                             resolution or specs.DUTY_RESOLUTION, specs.CALIBRATION_FILE)
+
+
+@lru_cache(maxsize=None)
+def _cached_table(min_angle, max_angle, min_duty, max_duty, resolution, calibration_file) -> DutyTable:
+    # 같은 스펙의 서보는 표를 공유
+    points = load_calibration(calibration_file) if calibration_file else [(0, min_duty), (180, max_duty)]
+    return DutyTable(points, min_angle, max_angle, resolution)
+
+
+def load_calibration(path: str) -> List[Point]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return [(angle, duty) for angle, duty in json.load(f)['points']]
+
+
+def save_calibration(path: str, points: Sequence[Point]) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'points': sorted([angle, duty] for angle, duty in points)}, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a servo calibration file from measured points")
+    parser.add_argument('--point', nargs=2, type=float, action='append', required=True,
+                        metavar=('ANGLE', 'DUTY'), help="측정한 각도와 그때의 duty cycle (2개 이상)")
+    parser.add_argument('-o', '--output', default='servo_calibration.json')
+    parser.add_argument('--resolution', type=float, default=1.0)
+    args = parser.parse_args()
+
+    table = DutyTable(args.point, resolution=args.resolution)
+    save_calibration(args.output, table.points)
+    print(f"Saved {len(table.points)} points to {args.output}")
+    for angle in (0, 45, 90, 135, 180):
+        print(f"  {angle:>3} deg -> {table.duty(angle):.3f}%")
+
+
+if __name__ == "__main__":
+    main()
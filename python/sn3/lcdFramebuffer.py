@@ -0,0 +1,128 @@
+## 16x2 문자 LCD (HD44780 + PCF8574 I2C 확장 보드) 를 위한 framebuffer 드라이버입니다.
+##
+## RPLCD 는 한 글자마다 니블 2개 x write_byte 4번 = I2C 트랜잭션 8번을 사용하고,
+## LCDController 는 2초마다 clear() 후 두 줄을 모두 다시 써서 한 번 갱신에 약 190 트랜잭션이 필요했습니다.
+## 여기서는 화면 내용을 shadow 로 보관하고 바뀐 칸만 쓰며,
+## PCF8574 가 한 트랜잭션 안의 연속 바이트를 순서대로 출력하는 점을 이용해 여러 글자를 한 번에 보냅니다.
+## (초기화는 기존처럼 RPLCD 가 수행하고, 이후 쓰기만 이 모듈이 담당)
+
+from typing import List, Optional, Sequence
+
+# PCF8574 핀 배치: D7 D6 D5 D4 BL E RW RS
+PCF8574_BACKLIGHT = 0x08
+PCF8574_E = 0x04
+RS_INSTRUCTION = 0x00
+RS_DATA = 0x01
+
+LCD_SETDDRAMADDR = 0x80
+ROW_OFFSETS = (0x00, 0x40, 0x14, 0x54)
+
+I2C_BLOCK_MAX = 32  # SMBus block write 데이터 최대 길이 (첫 바이트 제외)
+
+
+class CountingBus:
+    """SMBus 프록시. 쓰기 트랜잭션 수와 바이트 수를 셉니다."""
+
+    def __init__(self, bus):
+        self.bus = bus
+        self.transactions = 0
+        self.bytes = 0
+
+    def write_byte(self, address, value):
+        self.transactions += 1
+        self.bytes += 1
+        return self.bus.write_byte(address, value)
+
+    def write_byte_data(self, address, register, value):
+        self.transactions += 1
+        self.bytes += 2
+        return self.bus.write_byte_data(address, register, value)
+
+    def write_i2c_block_data(self, address, register, data):
+        self.transactions += 1
+        self.bytes += 1 + len(data)
+        return self.bus.write_i2c_block_data(address, register, data)
+
+    def __getattr__(self, name):
+        return getattr(self.bus, name)
+
+
+class PCF8574Writer:
+    """HD44780 명령/문자를 니블 단위 바이트열로 만들어 block write 로 묶어 전송"""
+
+    def __init__(self, bus, address: int = 0x27, backlight: bool = True):
+        self.bus = bus
+        self.address = address
+        self.backlight = PCF8574_BACKLIGHT if backlight else 0x00
+
+    def _encode(self, value: int, rs: int, out: bytearray) -> None:
+        for nibble in (value & 0xF0, (value << 4) & 0xF0):
+            base = nibble | rs | self.backlight
+            # 데이터 설정 -> E high -> E low (하강 에지에서 LCD 가 값을 읽음)
+            out += bytes((base, base | PCF8574_E, base))
+
+    def _send(self, stream: bytearray) -> None:
+        for start in range(0, len(stream), I2C_BLOCK_MAX + 1):
+            chunk = stream[start:start + I2C_BLOCK_MAX + 1]
+            if len(chunk) == 1:
+                self.bus.write_byte(self.address, chunk[0])
+            else:
+                self.bus.write_i2c_block_data(self.address, chunk[0], list(chunk[1:]))
+
+    def write_runs(self, runs: Sequence[tuple]) -> None:
+        """(row, col, text) 목록을 커서 이동 명령과 함께 하나의 바이트열로 전송"""
+        stream = bytearray()
+        for row, col, text in runs:
+            self._encode(LCD_SETDDRAMADDR | (ROW_OFFSETS[row] + col), RS_INSTRUCTION, stream)
+            for char in text:
+                code = ord(char)
+                self._encode(code if code < 0x80 else ord('?'), RS_DATA, stream)
+        if stream:
+            self._send(stream)
+
+
+class LCDFramebuffer:
+    """
+    화면 shadow 와 비교해 바뀐 칸만 LCD 에 씁니다.
+    바뀌지 않은 칸이 merge_gap 개 이하로 끼어 있으면 커서 이동 명령 대신 그대로 다시 씁니다.
+    (커서 이동도 한 바이트이므로 1칸 이하 간격은 이어 쓰는 편이 같거나 적은 비용)
+    """
+
+    def __init__(self, writer: PCF8574Writer, cols: int = 16, rows: int = 2, merge_gap: int = 1):
+        self.writer = writer
+        self.cols = cols
+        self.rows = rows
+        self.merge_gap = merge_gap
+        self.shadow: List[List[Optional[str]]] = []
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """LCD 상태를 알 수 없을 때 (초기화, 오류 후) 다음 갱신에서 전체를 다시 쓰도록 함"""
+        self.shadow = [[None] * self.cols for _ in range(self.rows)]
+
+    def _runs(self, row: int, text: str) -> List[tuple]:
+        shadow = self.shadow[row]
+        changed = [col for col in range(self.cols) if shadow[col] != text[col]]
+        runs = []
+        for col in changed:
+            if runs and col - runs[-1][1] <= self.merge_gap + 1:
+                runs[-1][1] = col
+            else:
+                runs.append([col, col])
+        return [(row, start, text[start:end + 1]) for start, end in runs]
+
+    def update(self, lines: Sequence[str]) -> int:
+        """lines 를 화면에 반영하고 실제로 쓴 칸 수를 반환"""
+        texts = [(lines[row] if row < len(lines) else "").ljust(self.cols)[:self.cols]
+                 for row in range(self.rows)]
+        runs = [run for row, text in enumerate(texts) for run in self._runs(row, text)]
+        if not runs:
+            return 0
+        try:
+            self.writer.write_runs(runs)
+        except Exception:
+            self.invalidate()
+            raise
+        for row, start, text in runs:
+            self.shadow[row][start:start + len(text)] = list(text)
+        return sum(len(text) for _, _, text in runs)
@@ -0,0 +1,103 @@
+## sn3 웹 서버 부하 테스트. 여러 클라이언트가 keep-alive 연결로 요청을 반복하고 requests/s 와 지연을 출력합니다.
+##
+##   python loadTest.py --url http://192.168.0.4:10002 --clients 8 --duration 10
+##   python loadTest.py --endpoints get_data --clients 32
+##
+## sg90_control_act 는 실제로 서보를 움직이므로 L/R 을 번갈아 요청합니다.
+
+import argparse
+import http.client
+import statistics
+import threading
+import time
+from typing import Dict, List
+from urllib.parse import urlparse
+
+ENDPOINTS = {
+    'get_data': lambda i: '/get_data',
+    'sg90_control_act': lambda i: '/sg90_control_act?servo=' + ('L' if i % 2 else 'R'),
+}
+
+
+def _worker(host, port, endpoint, stop_event, latencies: List[float], errors: Dict[str, int]):
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    path_for = ENDPOINTS[endpoint]
+    i = 0
+    while not stop_event.is_set():
+        started = time.perf_counter()
+        try:
+            conn.request('GET', path_for(i))
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors[f"http_{response.status}"] = errors.get(f"http_{response.status}", 0) + 1
+            else:
+                latencies.append(time.perf_counter() - started)
+        except (OSError, http.client.HTTPException) as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=10)
+        i += 1
+    conn.close()
+
+
+def run(url: str, endpoint: str, clients: int, duration: float) -> Dict:
+    parsed = urlparse(url)
+    stop_event = threading.Event()
+    latencies: List[List[float]] = [[] for _ in range(clients)]
+    errors: List[Dict[str, int]] = [{} for _ in range(clients)]
+    threads = [
+        threading.Thread(target=_worker,
+                         args=(parsed.hostname, parsed.port or 80, endpoint, stop_event, latencies[n], errors[n]),
+                         daemon=True)
+        for n in range(clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop_event.set()
+    for thread in threads:
+        thread.join(timeout=15.0)
+    elapsed = time.perf_counter() - started
+
+    merged = sorted(value * 1000 for values in latencies for value in values)
+    error_total: Dict[str, int] = {}
+    for per_client in errors:
+        for name, count in per_client.items():
+            error_total[name] = error_total.get(name, 0) + count
+
+    def pct(p):
+        return round(merged[min(len(merged) - 1, int(p / 100 * len(merged)))], 2) if merged else None
+
+    return {
+        'endpoint': endpoint,
+        'clients': clients,
+        'requests': len(merged),
+        'requests_per_s': round(len(merged) / elapsed, 1),
+        'p50_ms': pct(50),
+        'p95_ms': pct(95),
+        'p99_ms': pct(99),
+        'mean_ms': round(statistics.fmean(merged), 2) if merged else None,
+        'errors': error_total,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sn3 web server load test")
+    parser.add_argument('--url', default='http://192.168.0.4:10002')
+    parser.add_argument('--endpoints', nargs='+', choices=sorted(ENDPOINTS), default=sorted(ENDPOINTS))
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--duration', type=float, default=10.0, help="케이스당 측정 시간(초)")
+    args = parser.parse_args()
+
+    print(f"{'endpoint':<18}{'clients':>8}{'requests':>10}{'req/s':>9}{'p50ms':>9}{'p95ms':>9}{'p99ms':>9}  errors")
+    for endpoint in args.endpoints:
+        for clients in args.clients:
+            r = run(args.url, endpoint, clients, args.duration)
+            print(f"{r['endpoint']:<18}{r['clients']:>8}{r['requests']:>10}{r['requests_per_s']:>9}"
+                  f"{str(r['p50_ms']):>9}{str(r['p95_ms']):>9}{str(r['p99_ms']):>9}  {r['errors'] or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+## Pico 가 UART 로 보내는 줄을 타입이 있는 메시지로 변환하는 파서입니다.
+## sn3 (DHT "23.5,45.0" / "ERROR,ERROR"), sn2 (ADC "12345"), sn1 ("TEST MESSAGE" + JSON 상태) 형식을 처리합니다.
+##
+## - 줄의 첫 글자로 디코더를 고르는 디스패치 테이블을 생성 시 한 번만 만듭니다.
+## - 고정 문자열 줄은 dict 조회 한 번으로 처리합니다.
+## - 잘못된 줄은 예외를 밖으로 던지지 않고 카운터와 dead-letter 목록에 남긴 뒤 None 을 반환합니다.
+## - 최대 길이를 넘는 줄은 디코딩 전에 버리므로 잘못된 줄 하나의 처리 비용이 일정합니다.
+
+import json
+import logging
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DHTReading:
+    """sn3 Pico: 온도, 습도"""
+    temperature: float
+    humidity: float
+
+
+@dataclass(frozen=True)
+class ADCReading:
+    """sn2 Pico: 가변저항 ADC 값 (read_u16)"""
+    value: int
+
+
+@dataclass(frozen=True)
+class PicoStatus:
+    """sn1 Pico: JSON 상태 메시지"""
+    pwm_duty: int
+    pwm_percent: float
+    button_status: str
+    bluetooth_data: str
+
+
+@dataclass(frozen=True)
+class SensorError:
+    """Pico 가 센서 읽기 실패를 알림 (예: 'ERROR,ERROR')"""
+    line: str
+
+
+@dataclass(frozen=True)
+class Notice:
+    """데이터가 아닌 고정 문자열 줄 (예: 'TEST MESSAGE', 'PICO INITIALIZED')"""
+    text: str
+
+
+Message = Union[DHTReading, ADCReading, PicoStatus, SensorError, Notice]
+
+NOTICES = {
+    "TEST MESSAGE": Notice("TEST MESSAGE"),
+    "PICO INITIALIZED": Notice("PICO INITIALIZED"),
+    "Alert mode activated": Notice("Alert mode activated"),
+    "ERROR,ERROR": SensorError("ERROR,ERROR"),
+}
+
+
+def decode_numeric(line: str) -> Optional[Message]:
+    """'23.5,45.0' -> DHTReading, '12345' -> ADCReading"""
+    comma = line.find(',')
+    try:
+        if comma < 0:
+            return ADCReading(int(line))
+        if line.find(',', comma + 1) >= 0:
+            return None
+        return DHTReading(float(line[:comma]), float(line[comma + 1:]))
+    except ValueError:
+        return None
+
+
+def decode_status(line: str) -> Optional[Message]:
+    """sn1 JSON 상태 줄"""
+    try:
+        data = json.loads(line)
+        return PicoStatus(
+            pwm_duty=int(data['pwm_duty']),
+            pwm_percent=float(data['pwm_percent']),
+            button_status=str(data['button_status']),
+            bluetooth_data=str(data['bluetooth_data']),
+        )
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+DECODERS: Dict[str, Callable[[str], Optional[Message]]] = {
+    **{digit: decode_numeric for digit in "0123456789-"},
+    '{': decode_status,
+}
+
+
+class LineParser:
+    """
+    Pico 한 줄 -> Message. 잘못된 줄은 None 을 반환하고 counters / dead_letters 에 기록합니다.
+    여러 스레드에서 공유하지 말고 읽기 스레드마다 하나씩 사용합니다.
+    """
+
+    def __init__(self, decoders: Optional[Dict[str, Callable[[str], Optional[Message]]]] = None,
+                 notices: Optional[Dict[str, Message]] = None,
+                 max_line_length: int = 256, dead_letter_size: int = 100,
+                 dead_letter_path: Optional[str] = None):
+        self.decoders = dict(DECODERS if decoders is None else decoders)
+        self.notices = dict(NOTICES if notices is None else notices)
+        self.max_line_length = max_line_length
+        self.counters: Counter = Counter()
+        self.dead_letters: deque = deque(maxlen=dead_letter_size)
+        self.dead_letter_file = open(dead_letter_path, 'a', buffering=1) if dead_letter_path else None
+
+    def _reject(self, reason: str, line) -> None:
+        self.counters[reason] += 1
+        self.dead_letters.append((reason, line))
+        logger.debug(f"Dead letter ({reason}): {line!r}")
+        if self.dead_letter_file:
+            try:
+                self.dead_letter_file.write(f"{reason}\t{line!r}\n")
+            except OSError as e:
+                logger.error(f"Error writing dead letter log: {e}")
+
+    def close(self) -> None:
+        if self.dead_letter_file:
+            self.dead_letter_file.close()
+            self.dead_letter_file = None
+
+    def parse(self, raw: Union[bytes, str]) -> Optional[Message]:
+        if len(raw) > self.max_line_length:
+            self._reject('too_long', raw[:32])
+            return None
+
+        if isinstance(raw, bytes):
+            try:
+                line = raw.decode('utf-8').strip()
+            except UnicodeDecodeError:
+                self._reject('decode_error', raw)
+                return None
+        else:
+            line = raw.strip()
+
+        if not line:
+            self.counters['empty'] += 1
+            return None
+
+        message = self.notices.get(line)
+        if message is None:
+            decoder = self.decoders.get(line[0])
+            if decoder is None:
+                self._reject('unknown', line)
+                return None
+            message = decoder(line)
+            if message is None:
+                self._reject('malformed', line)
+                return None
+
+        self.counters[type(message).__name__] += 1
+        return message
+
+    def summary(self) -> str:
+        return ", ".join(f"{name}={count}" for name, count in sorted(self.counters.items()))
@@ -0,0 +1,190 @@
+## PWM 출력 backend
+##
+## RPi.GPIO / ASUS.GPIO 의 PWM 은 소프트웨어 타이밍이라 Flask, 센서 스레드 부하에 따라 펄스 폭이 흔들리고
+## 서보가 떨립니다. 하드웨어 PWM 핀은 /sys/class/pwm 으로 제어하면 펄스를 칩이 만들어 CPU 부하와 무관합니다.
+##
+##   sysfs    : 하드웨어 PWM. Raspberry Pi 4 는 /boot/config.txt 에 dtoverlay=pwm (또는 pwm-2chan) 필요
+##              BCM 12/18 -> pwmchip0/pwm0, BCM 13/19 -> pwmchip0/pwm1
+##   software : GPIO 모듈의 PWM (기존 방식)
+##   mock     : 출력 없이 duty 기록 (테스트용)
+##
+## 모든 backend 는 GPIO.PWM 과 같은 start / ChangeDutyCycle / ChangeFrequency / stop 을 제공하고,
+## close() 로 핀을 반환합니다.
+
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('auto', 'sysfs', 'software', 'mock')
+
+SYSFS_PWM_ROOT = '/sys/class/pwm'
+# BCM 핀 -> (pwmchip, channel). Raspberry Pi 4 + dtoverlay=pwm / pwm-2chan 기준
+RPI_HARDWARE_PWM: Dict[int, Tuple[int, int]] = {12: (0, 0), 18: (0, 0), 13: (0, 1), 19: (0, 1)}
+
+
+class SysfsPWM:
+    """/sys/class/pwm 하드웨어 PWM. duty_cycle 파일은 열어 두고 값이 바뀔 때만 씀"""
+
+    EXPORT_TIMEOUT = 1.0  # export 후 udev 가 권한을 바꿀 때까지 대기
+
+    def __init__(self, chip: int, channel: int, frequency: float):
+        self.chip_path = os.path.join(SYSFS_PWM_ROOT, f"pwmchip{chip}")
+        self.channel = channel
+        self.path = os.path.join(self.chip_path, f"pwm{channel}")
+        self.exported = False
+        if not os.path.isdir(self.path):
+            self._write(os.path.join(self.chip_path, 'export'), channel)
+            self.exported = True
+        try:
+            self._wait_writable(os.path.join(self.path, 'duty_cycle'))
+            self.duty_fd = os.open(os.path.join(self.path, 'duty_cycle'), os.O_WRONLY)
+        except OSError:
+            if self.exported:
+                self._write(os.path.join(self.chip_path, 'unexport'), channel)
+            raise
+        self.period_ns = 0
+        self.duty_ns = -1
+        self.duty = 0.0
+        self.ChangeFrequency(frequency)
+
+    @staticmethod
+    def _write(path: str, value) -> None:
+        with open(path, 'w') as f:
+            f.write(str(value))
+
+    def _wait_writable(self, path: str) -> None:
+        deadline = time.monotonic() + self.EXPORT_TIMEOUT
+        while not os.access(path, os.W_OK):
+            if time.monotonic() > deadline:
+                raise PermissionError(f"{path} is not writable")
+            time.sleep(0.02)
+
+    def _write_duty_ns(self, duty_ns: int) -> None:
+        if duty_ns != self.duty_ns:
+            os.pwrite(self.duty_fd, str(duty_ns).encode(), 0)
+            self.duty_ns = duty_ns
+
+    def start(self, duty: float) -> None:
+        self.ChangeDutyCycle(duty)
+        self._write(os.path.join(self.path, 'enable'), 1)
+
+    def ChangeDutyCycle(self, duty: float) -> None:
+        self.duty = max(0.0, min(100.0, duty))
+        self._write_duty_ns(int(self.period_ns * self.duty / 100.0))
+
+    def ChangeFrequency(self, frequency: float) -> None:
+        # duty_cycle 이 period 보다 크면 커널이 거부하므로 duty 를 먼저 0 으로
+        self._write_duty_ns(0)
+        self.period_ns = int(1e9 / frequency)
+        self._write(os.path.join(self.path, 'period'), self.period_ns)
+        self.ChangeDutyCycle(self.duty)
+
+    def stop(self) -> None:
+        self._write(os.path.join(self.path, 'enable'), 0)
+
+    def close(self) -> None:
+        if self.duty_fd is None:
+            return
+        try:
+            self.stop()
+        finally:
+            os.close(self.duty_fd)
+            self.duty_fd = None
+            if self.exported:
+                self._write(os.path.join(self.chip_path, 'unexport'), self.channel)
+
+
+class SoftwarePWM:
+    """GPIO 모듈 (RPi.GPIO, ASUS.GPIO) 의 소프트웨어 PWM. setmode 는 호출하는 쪽에서 수행"""
+
+    def __init__(self, gpio, pin: int, frequency: float):
+        self.gpio = gpio
+        self.pin = pin
+        gpio.setup(pin, gpio.OUT)
+        self.pwm = gpio.PWM(pin, frequency)
+
+    def start(self, duty: float) -> None:
+        self.pwm.start(duty)
+
+    def ChangeDutyCycle(self, duty: float) -> None:
+        self.pwm.ChangeDutyCycle(duty)
+
+    def ChangeFrequency(self, frequency: float) -> None:
+        self.pwm.ChangeFrequency(frequency)
+
+    def stop(self) -> None:
+        self.pwm.stop()
+
+    def close(self) -> None:
+        if self.pwm is None:
+            return
+        self.pwm.stop()
+        self.pwm = None
+        self.gpio.cleanup(self.pin)
+
+
+class MockPWM:
+    """하드웨어 없이 동작. history 에 (monotonic 시각, duty) 를 기록"""
+
+    def __init__(self, pin: int, frequency: float):
+        self.pin = pin
+        self.frequency = frequency
+        self.duty = 0.0
+        self.running = False
+        self.history: List[Tuple[float, float]] = []
+
+    def start(self, duty: float) -> None:
+        self.running = True
+        self.ChangeDutyCycle(duty)
+
+    def ChangeDutyCycle(self, duty: float) -> None:
+        self.duty = duty
+        self.history.append((time.monotonic(), duty))
+
+    def ChangeFrequency(self, frequency: float) -> None:
+        self.frequency = frequency
+
+    def stop(self) -> None:
+        self.running = False
+
+    def close(self) -> None:
+        self.stop()
+
+
+def create_pwm(pin: int, frequency: float, backend: str = 'auto', gpio=None,
+               hardware_pins: Optional[Dict[int, Tuple[int, int]]] = None):
+    """
+    pin 에 맞는 PWM backend 생성.
+
+    backend       : 'auto' 는 pin 이 하드웨어 PWM 채널에 연결되어 있고 sysfs 가 열리면 sysfs, 아니면 software
+    gpio          : software backend 에 사용할 GPIO 모듈 (RPi.GPIO, ASUS.GPIO)
+    hardware_pins : pin -> (pwmchip, channel). 기본값은 Raspberry Pi 4 BCM 번호 기준
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown PWM backend: {backend}")
+    if backend == 'mock':
+        return MockPWM(pin, frequency)
+
+    if backend in ('auto', 'sysfs'):
+        mapping = RPI_HARDWARE_PWM if hardware_pins is None else hardware_pins
+        channel = mapping.get(pin)
+        if channel is None:
+            if backend == 'sysfs':
+                raise ValueError(f"Pin {pin} has no hardware PWM channel")
+            logger.info(f"Pin {pin} has no hardware PWM channel, using software PWM")
+        else:
+            try:
+                pwm = SysfsPWM(channel[0], channel[1], frequency)
+                logger.info(f"Using hardware PWM pwmchip{channel[0]}/pwm{channel[1]} for pin {pin}")
+                return pwm
+            except OSError as e:
+                if backend == 'sysfs':
+                    raise
+                logger.warning(f"Hardware PWM unavailable for pin {pin} ({e}), using software PWM")
+
+    if gpio is None:
+        raise ValueError("Software PWM requires a GPIO module")
+    return SoftwarePWM(gpio, pin, frequency)
@@ -0,0 +1,56 @@
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable, Tuple
+
+from flask import Response, request
+
+
+class ResponseCache:
+    """
+    응답 본문(bytes)과 ETag 를 키별로 보관합니다.
+    키는 응답을 결정하는 값(예: SensorData.last_update, 템플릿 변수)으로 정하며,
+    같은 키로 다시 요청되면 템플릿 렌더링/JSON 직렬화 없이 저장된 bytes 를 돌려줍니다.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Hashable, Tuple[bytes, str]]" = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, build: Callable[[], bytes]) -> Tuple[bytes, str]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        # 렌더링은 lock 밖에서 수행. 동시에 같은 키를 만들면 마지막 결과가 남음
+        body = build()
+        entry = (body, hashlib.sha1(body).hexdigest())
+        with self.lock:
+            self.misses += 1
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+
+    def respond(self, key: Hashable, build: Callable[[], bytes], mimetype: str,
+                conditional: bool = True) -> Response:
+        """캐시된 본문으로 응답. conditional 이면 If-None-Match 가 일치할 때 304 반환"""
+        body, etag = self.get(key, build)
+        response = Response(body, mimetype=mimetype)
+        response.set_etag(etag)
+        if conditional:
+            response.headers['Cache-Control'] = 'no-cache'  # 매번 재검증 (304 로 응답)
+            return response.make_conditional(request)
+        return response
+
+
+def template_key(name: str, **context: Any) -> Hashable:
+    """템플릿 이름과 변수로 캐시 키 생성"""
+    return (name,) + tuple(sorted(context.items()))
@@ -0,0 +1,787 @@
+## 센서 driver 계층 - 실제 장치와 시뮬레이션 장치를 같은 인터페이스로 제공
+##
+## 시나리오 코드는 장치 라이브러리 객체의 메소드만 사용합니다.
+##   i2c    : smbus.SMBus             write_byte_data / read_byte_data / read_i2c_block_data
+##   serial : serial.Serial           readline / read / write / in_waiting / flush / close
+##   spi    : spidev.SpiDev + MCP3208 xfer2 / analogRead / read_burst
+##   camera : Picamera2, cv2.VideoCapture  capture_array / read / start / stop / release
+## 같은 메소드를 가진 시뮬레이션 객체로 바꾸면 파이프라인 코드를 그대로 두고 Linux 워크스테이션에서 실행/프로파일링 할 수 있습니다.
+##
+##   실제                 시뮬레이션
+##   smbus.SMBus          SimulatedI2CBus + SimulatedMPU6050 (레지스터, FIFO) / I2CSink (LCD)
+##   serial.Serial        SimulatedSerial (dht / adc / bluetooth 프로파일)
+##   spidev.SpiDev        SimulatedSPI (MCP3208 프로토콜)
+##   Picamera2, cv2       SimulatedCamera (움직이는 사각형), VideoFileCamera (녹화 영상)
+##
+## 시뮬레이션 값은 시각 t(초) 의 함수 (signal) 이므로 seed 가 같으면 언제 실행해도 같은 파형이 나옵니다.
+## trace_signal 은 기록해 둔 CSV (t,v1,v2,...) 를 같은 방식으로 재생합니다.
+## SimClock(speed) 는 가상 시간을 speed 배로 흘려 데이터가 speed 배 빠르게 생성됩니다 (실제 장치는 speed=1).
+##
+##   python Senario_2_Pi4.py --simulate --speed 10 --tcp-host 127.0.0.1
+##   python Senario_3_Pi4.py --simulate --host 127.0.0.1
+##   python Scenario_7_ASUS.py --simulate --speed 5 --tcp-host 127.0.0.1
+##   python senario_6_Pi4.py --simulate --host 127.0.0.1
+
+import bisect
+import ctypes
+import math
+import struct
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+Signal = Callable[[float], Tuple[float, ...]]
+
+
+class SimClock:
+    """speed 배로 흐르는 가상 시계. now() 는 시작 후 가상 경과 초, time() 은 time.time() 과 같은 epoch 기준"""
+
+    def __init__(self, speed: float = 1.0):
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.speed = speed
+        self.origin = time.monotonic()
+        self.epoch = time.time()
+
+    def now(self) -> float:
+        return (time.monotonic() - self.origin) * self.speed
+
+    def time(self) -> float:
+        return self.epoch + self.now()
+
+    def real_delay(self, t: float) -> float:
+        """가상 시각 t 까지 남은 실제 초"""
+        return max(0.0, (t - self.now()) / self.speed)
+
+    def sleep(self, seconds: float) -> None:
+        """가상 시간 seconds 초 대기"""
+        if seconds > 0:
+            time.sleep(seconds / self.speed)
+
+
+# ---------------------------------------------------------------- signal
+
+def _unit_noise(seed: int, index: int) -> float:
+    """(seed, index) 로 정해지는 -1~1 값. random 모듈과 달리 호출 순서와 무관하게 항상 같은 값"""
+    x = (index * 0x9E3779B1 + seed * 0x85EBCA77 + 0x165667B1) & 0xFFFFFFFF
+    x = ((x ^ (x >> 15)) * 0x2C1B3C6D) & 0xFFFFFFFF
+    x = ((x ^ (x >> 12)) * 0x297A2D39) & 0xFFFFFFFF
+    x ^= x >> 15
+    return x / 0x7FFFFFFF - 1.0
+
+
+def sine(amplitude: float, period: float, offset: float = 0.0, phase: float = 0.0) -> Callable[[float], float]:
+    return lambda t: offset + amplitude * math.sin(2 * math.pi * t / period + phase)
+
+
+def noise(amplitude: float, seed: int = 0, resolution: float = 0.001) -> Callable[[float], float]:
+    """resolution 초 단위로 값이 바뀌는 잡음"""
+    return lambda t: amplitude * _unit_noise(seed, int(t / resolution))
+
+
+def channel(*parts: Callable[[float], float]) -> Callable[[float], float]:
+    """여러 파형의 합"""
+    return lambda t: sum(part(t) for part in parts)
+
+
+def combine(*channels: Callable[[float], float]) -> Signal:
+    """채널별 파형을 묶어 tuple 을 반환하는 signal"""
+    return lambda t: tuple(ch(t) for ch in channels)
+
+
+def trace_signal(path: str, loop: bool = True) -> Signal:
+    """
+    기록한 CSV 재생. 한 줄에 't,v1,v2,...' (t 는 초), '#' 로 시작하는 줄은 무시.
+    다음 기록 시각까지 값을 유지하고, loop 이면 끝난 뒤 처음부터 반복
+    """
+    times: List[float] = []
+    rows: List[Tuple[float, ...]] = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            t, *values = (float(v) for v in line.split(','))
+            times.append(t)
+            rows.append(tuple(values))
+    if not rows:
+        raise ValueError(f"Empty trace: {path}")
+    start, span = times[0], times[-1] - times[0]
+
+    def signal(t: float) -> Tuple[float, ...]:
+        t += start
+        if loop and span > 0:
+            t = start + (t - start) % span
+        return rows[max(bisect.bisect_right(times, t) - 1, 0)]
+    return signal
+
+
+def imu_signal(first_drop: float = 5.0, drop_every: float = 15.0, fall_s: float = 0.25, seed: int = 0) -> Signal:
+    """
+    sn2 IMU: (acc_x, acc_y, acc_z [g], temp [C], gyro_x, gyro_y, gyro_z [deg/s])
+    정지 상태 (Z 축 1g + 작은 흔들림) 에서 first_drop 초부터 drop_every 초마다 fall_s 초 자유 낙하 후 충돌
+    """
+    sway = sine(0.02, 3.0)
+    jitter = [noise(0.01, seed + i) for i in range(6)]
+
+    def signal(t: float) -> Tuple[float, ...]:
+        ax, ay, az = sway(t) + jitter[0](t), jitter[1](t), 1.0 + jitter[2](t)
+        gx, gy, gz = 25.0 * sway(t) + 50.0 * jitter[3](t), 50.0 * jitter[4](t), 50.0 * jitter[5](t)
+        phase = (t - first_drop) % drop_every if t >= first_drop else -1.0
+        if 0 <= phase < fall_s:
+            ax, ay, az = 0.03 + jitter[0](t), 0.02, 0.05 + jitter[2](t)
+            gx, gy = 150.0, -90.0
+        elif fall_s <= phase < fall_s + 0.15:
+            # 충돌 직후 감쇠 진동 (+-2g 범위를 넘는 값은 레지스터에서 포화)
+            after = phase - fall_s
+            az = 1.0 + 2.5 * math.exp(-after / 0.03) * math.cos(2 * math.pi * 40 * after)
+            gx = 300.0 * math.exp(-after / 0.03)
+        return ax, ay, az, 25.0 + 0.5 * math.sin(t / 300.0), gx, gy, gz
+    return signal
+
+
+def dht_signal(seed: int = 0) -> Signal:
+    """sn3 DHT: (온도 C, 습도 %) 10분 주기 변화 + 작은 잡음"""
+    return combine(channel(sine(2.0, 600.0, 23.0), noise(0.1, seed, 1.0)),
+                   channel(sine(5.0, 900.0, 45.0, phase=1.0), noise(0.5, seed + 1, 1.0)))
+
+
+def light_signal(channels: int = 8, period: float = 60.0, seed: int = 0) -> Signal:
+    """sn7 조도 센서 등: 채널별 0~1 값. 채널마다 위상이 다른 sine + 잡음 (변환마다 다른 값이 되도록 10us 단위)"""
+    return combine(*(channel(sine(0.4, period, 0.5, phase=i), noise(0.02, seed + i, 1e-5))
+                     for i in range(channels)))
+
+
+# ---------------------------------------------------------------- I2C
+
+class SimulatedI2CBus:
+    """smbus.SMBus 대용. 주소별 장치 객체 (write(register, data) / read(register, length)) 로 전달"""
+
+    def __init__(self, devices: Dict[int, object]):
+        self.devices = devices
+        self.transactions = 0
+
+    def _device(self, address: int):
+        self.transactions += 1
+        try:
+            return self.devices[address]
+        except KeyError:
+            raise OSError(121, f"Remote I/O error (no device at 0x{address:02x})") from None
+
+    def write_byte(self, address: int, value: int) -> None:
+        self._device(address).write(None, [value])
+
+    def write_byte_data(self, address: int, register: int, value: int) -> None:
+        self._device(address).write(register, [value])
+
+    def write_i2c_block_data(self, address: int, register: int, data: Sequence[int]) -> None:
+        self._device(address).write(register, list(data))
+
+    def read_byte(self, address: int) -> int:
+        return self._device(address).read(None, 1)[0]
+
+    def read_byte_data(self, address: int, register: int) -> int:
+        return self._device(address).read(register, 1)[0]
+
+    def read_i2c_block_data(self, address: int, register: int, length: int) -> List[int]:
+        return self._device(address).read(register, length)
+
+    def close(self) -> None:
+        pass
+
+
+class I2CSink:
+    """쓰기만 받는 장치 (PCF8574 LCD 등). 받은 바이트 수만 기록"""
+
+    def __init__(self):
+        self.bytes_written = 0
+
+    def write(self, register: Optional[int], data: List[int]) -> None:
+        self.bytes_written += len(data) + (register is not None)
+
+    def read(self, register: Optional[int], length: int) -> List[int]:
+        return [0] * length
+
+
+MPU_SAMPLE_STRUCT = struct.Struct('>7h')
+
+
+class SimulatedMPU6050:
+    """
+    MPU6050 레지스터 모델. signal(t) 로 가속도/온도/자이로를 만들고
+    SMPLRT_DIV, CONFIG, ACCEL_CONFIG, GYRO_CONFIG, FIFO (USER_CTRL, FIFO_EN, FIFO_COUNT, FIFO_R_W, INT_STATUS) 를 흉내 냄.
+    FIFO 는 가상 시간 기준 샘플 주기마다 14바이트 샘플을 쌓으므로 speed 배 빨리 차오릅니다.
+    fifo_size 기본값은 1024 x speed 바이트라서 실제 장치와 같은 읽기 주기로도 넘치지 않습니다.
+    """
+    SMPLRT_DIV, CONFIG, GYRO_CONFIG, ACCEL_CONFIG = 0x19, 0x1A, 0x1B, 0x1C
+    FIFO_EN, INT_STATUS, ACCEL_XOUT_H = 0x23, 0x3A, 0x3B
+    USER_CTRL, PWR_MGMT_1, FIFO_COUNTH, FIFO_COUNTL, FIFO_R_W, WHO_AM_I = 0x6A, 0x6B, 0x72, 0x73, 0x74, 0x75
+    FIFO_ALL = 0xF8
+
+    def __init__(self, signal: Optional[Signal] = None, clock: Optional[SimClock] = None,
+                 fifo_size: Optional[int] = None, seed: int = 0):
+        self.signal = signal or imu_signal(seed=seed)
+        self.clock = clock or SimClock()
+        self.fifo_size = fifo_size or 1024 * math.ceil(self.clock.speed)
+        self.registers = {self.PWR_MGMT_1: 0x40, self.WHO_AM_I: 0x68}
+        self.fifo = bytearray()
+        self.fifo_time = 0.0   # FIFO 에 마지막으로 넣은 샘플의 가상 시각
+        self.overflow = False
+        self.lock = threading.Lock()
+
+    def _period(self) -> float:
+        base = 1000.0 if 1 <= (self.registers.get(self.CONFIG, 0) & 0x07) <= 6 else 8000.0
+        return (self.registers.get(self.SMPLRT_DIV, 0) + 1) / base
+
+    def _fifo_active(self) -> bool:
+        return bool(self.registers.get(self.USER_CTRL, 0) & 0x40) and \
+            self.registers.get(self.FIFO_EN, 0) == self.FIFO_ALL
+
+    def encode(self, t: float) -> bytes:
+        """시각 t 의 레지스터 0x3B~0x48 (14바이트)"""
+        ax, ay, az, temp, gx, gy, gz = self.signal(t)
+        acc_lsb = 16384.0 / (1 << ((self.registers.get(self.ACCEL_CONFIG, 0) >> 3) & 3))
+        gyro_lsb = 131.0 / (1 << ((self.registers.get(self.GYRO_CONFIG, 0) >> 3) & 3))
+        raw = (ax * acc_lsb, ay * acc_lsb, az * acc_lsb, (temp - 36.53) * 340.0,
+               gx * gyro_lsb, gy * gyro_lsb, gz * gyro_lsb)
+        return MPU_SAMPLE_STRUCT.pack(*(max(-32768, min(32767, int(v))) for v in raw))
+
+    def _fill_fifo(self) -> None:
+        now = self.clock.now()
+        if not self._fifo_active():
+            self.fifo_time = now
+            return
+        period = self._period()
+        count = int((now - self.fifo_time) / period)
+        if count <= 0:
+            return
+        free = (self.fifo_size - len(self.fifo)) // MPU_SAMPLE_STRUCT.size
+        if count > free:
+            self.overflow = True
+        for i in range(1, min(count, free) + 1):
+            self.fifo += self.encode(self.fifo_time + i * period)
+        self.fifo_time += count * period
+
+    def write(self, register: Optional[int], data: List[int]) -> None:
+        with self.lock:
+            self._fill_fifo()  # 설정이 바뀌기 전까지의 샘플은 이전 설정으로
+            for value in data:
+                if register == self.USER_CTRL:
+                    if value & 0x04:  # FIFO_RESET
+                        self.fifo.clear()
+                        self.overflow = False
+                    value &= ~0x04
+                self.registers[register] = value & 0xFF
+                if register == self.USER_CTRL or register == self.FIFO_EN:
+                    self.fifo_time = self.clock.now()
+                if register is not None:
+                    register += 1
+
+    def read(self, register: Optional[int], length: int) -> List[int]:
+        with self.lock:
+            self._fill_fifo()
+            if register == self.FIFO_R_W:
+                data = bytes(self.fifo[:length])
+                del self.fifo[:length]
+                return list(data) + [0] * (length - len(data))
+            sample = None
+            result = []
+            for reg in range(register, register + length):
+                if self.ACCEL_XOUT_H <= reg < self.ACCEL_XOUT_H + MPU_SAMPLE_STRUCT.size:
+                    sample = sample or self.encode(self.clock.now())
+                    result.append(sample[reg - self.ACCEL_XOUT_H])
+                elif reg == self.INT_STATUS:
+                    result.append(0x01 | (0x10 if self.overflow else 0))
+                    self.overflow = False  # 읽으면 해제
+                elif reg == self.FIFO_COUNTH:
+                    result.append(len(self.fifo) >> 8)
+                elif reg == self.FIFO_COUNTL:
+                    result.append(len(self.fifo) & 0xFF)
+                else:
+                    result.append(self.registers.get(reg, 0))
+            return result
+
+
+def open_i2c_bus(port: int = 1, devices: Optional[Dict[int, object]] = None):
+    """devices 가 없으면 실제 smbus.SMBus(port), 있으면 그 장치들을 연결한 SimulatedI2CBus"""
+    if devices is None:
+        import smbus
+        return smbus.SMBus(port)
+    return SimulatedI2CBus(devices)
+
+
+# ---------------------------------------------------------------- serial
+
+class SimulatedSerial:
+    """
+    serial.Serial 대용.
+    line(seq, t) 가 만든 줄을 interval (가상 초) 마다 수신 버퍼에 넣고 (None 이면 그 주기는 건너뜀),
+    write 한 명령은 줄 단위로 respond(command) 에 넘겨 반환한 줄을 바로 수신 버퍼에 넣습니다.
+    Pico 펌웨어처럼 줄바꿈 없이 보낸 명령도 write 한 번을 한 명령으로 처리합니다.
+    """
+
+    def __init__(self, line: Optional[Callable[[int, float], Optional[str]]] = None, interval: float = 1.0,
+                 respond: Optional[Callable[[str], Optional[str]]] = None, clock: Optional[SimClock] = None,
+                 timeout: Optional[float] = 1.0, port: str = 'sim', buffer_size: int = 4096):
+        self.line = line
+        self.interval = interval
+        self.respond = respond
+        self.clock = clock or SimClock()
+        self.timeout = timeout
+        self.port = port
+        self.buffer_size = buffer_size
+        self.is_open = True
+        self.rx = bytearray()
+        self.seq = 0
+        self.next_time = self.clock.now() + interval
+        self.condition = threading.Condition()
+        self.stats = {'lines': 0, 'written': 0, 'overruns': 0}
+
+    def _push(self, text: str) -> None:
+        data = (text + '\n').encode('utf-8')
+        if len(self.rx) + len(data) > self.buffer_size:
+            self.stats['overruns'] += 1  # 실제 UART 처럼 버퍼가 차면 새 데이터를 버림
+            return
+        self.rx += data
+        self.stats['lines'] += 1
+
+    def _pump(self) -> None:
+        if self.line is None:
+            return
+        now = self.clock.now()
+        if now - self.next_time > 1000 * self.interval:
+            # 오래 읽지 않았으면 버퍼가 어차피 넘치므로 건너뜀
+            skipped = int((now - self.next_time) / self.interval)
+            self.seq += skipped
+            self.next_time += skipped * self.interval
+        while self.next_time <= now:
+            text = self.line(self.seq, self.next_time)
+            if text is not None:
+                self._push(text)
+            self.seq += 1
+            self.next_time += self.interval
+
+    def _next_due(self) -> Optional[float]:
+        """다음 줄이 들어올 가상 시각 (없으면 None)"""
+        return self.next_time if self.line else None
+
+    def _wait(self, ready: Callable[[], bool], timeout: Optional[float]) -> None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            while True:
+                self._pump()
+                if ready() or not self.is_open:
+                    return
+                due = self._next_due()
+                delay = None if due is None else self.clock.real_delay(due)
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return
+                    delay = remaining if delay is None else min(delay, remaining)
+                self.condition.wait(delay)
+
+    @property
+    def in_waiting(self) -> int:
+        with self.condition:
+            self._pump()
+            return len(self.rx)
+
+    def readline(self, size: int = -1) -> bytes:
+        """한 줄 또는 timeout 까지 받은 데이터"""
+        self._wait(lambda: b'\n' in self.rx, self.timeout)
+        with self.condition:
+            end = self.rx.find(b'\n') + 1 or len(self.rx)
+            if size >= 0:
+                end = min(end, size)
+            data = bytes(self.rx[:end])
+            del self.rx[:end]
+            return data
+
+    def read(self, size: int = 1) -> bytes:
+        self._wait(lambda: len(self.rx) >= size, self.timeout)
+        with self.condition:
+            data = bytes(self.rx[:size])
+            del self.rx[:size]
+            return data
+
+    def write(self, data: bytes) -> int:
+        if not self.is_open:
+            raise OSError("Attempting to use a port that is not open")
+        self.stats['written'] += len(data)
+        if self.respond is not None:
+            with self.condition:
+                for command in data.decode('utf-8', errors='replace').splitlines():
+                    if command.strip():
+                        reply = self.respond(command.strip())
+                        if reply is not None:
+                            self._push(reply)
+                self.condition.notify_all()
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def reset_input_buffer(self) -> None:
+        with self.condition:
+            self.rx.clear()
+
+    def close(self) -> None:
+        with self.condition:
+            self.is_open = False
+            self.condition.notify_all()
+
+
+def dht_serial(clock: Optional[SimClock] = None, interval: float = 2.0, signal: Optional[Signal] = None,
+               error_rate: float = 0.0, seed: int = 0, **options) -> SimulatedSerial:
+    """sn3 Pico: interval 초마다 '23.5,45.0', error_rate 비율로 'ERROR,ERROR'"""
+    signal = signal or dht_signal(seed)
+
+    def line(seq, t):
+        if error_rate and (_unit_noise(seed + 7, seq) + 1) / 2 < error_rate:
+            return "ERROR,ERROR"
+        temperature, humidity = signal(t)
+        return f"{temperature:.1f},{humidity:.1f}"
+    return SimulatedSerial(line, interval, clock=clock, **options)
+
+
+def pico_adc_serial(clock: Optional[SimClock] = None, interval: float = 0.1, signal: Optional[Signal] = None,
+                    **options) -> SimulatedSerial:
+    """sn2 Pico: 가변저항 ADC 값 (0~65535) 전송, 'alert' 를 받으면 'Alert mode activated' 후 전송 중단"""
+    signal = signal or light_signal(channels=1, period=20.0)
+    alert = []
+
+    def line(seq, t):
+        return None if alert else str(max(0, min(65535, int(signal(t)[0] * 65535))))
+
+    def respond(command):
+        if command == "alert":
+            alert.append(True)
+            return "Alert mode activated"
+        return None
+    return SimulatedSerial(line, interval, respond, clock=clock, **options)
+
+
+def bluetooth_serial(clock: Optional[SimClock] = None, interval: float = 5.0,
+                     commands: Sequence[str] = ('light',), **options) -> SimulatedSerial:
+    """sn7 휴대폰 Bluetooth: interval 초마다 commands 를 차례로 보냄"""
+    return SimulatedSerial(lambda seq, t: commands[seq % len(commands)] if commands else None,
+                           interval, clock=clock, **options)
+
+
+SERIAL_PROFILES = {'dht': dht_serial, 'adc': pico_adc_serial, 'bluetooth': bluetooth_serial}
+
+
+def open_serial(port: str, baudrate: int = 9600, timeout: Optional[float] = 1.0, profile: Optional[str] = None,
+                clock: Optional[SimClock] = None, **options):
+    """profile 이 없으면 실제 serial.Serial, 있으면 SERIAL_PROFILES 의 시뮬레이션 장치"""
+    if profile is None:
+        import serial
+        return serial.Serial(port, baudrate, timeout=timeout)
+    return SERIAL_PROFILES[profile](clock=clock, timeout=timeout, port=f"sim:{profile}", **options)
+
+
+# ---------------------------------------------------------------- SPI ADC
+
+class SpiMessage:
+    """
+    Linux spidev 의 SPI_IOC_MESSAGE(n) ioctl. 같은 길이의 frame n 개를 시스템 호출 한 번으로 전송하고
+    frame 사이마다 chip select 를 올렸다 내림 (cs_change). MCP3208 은 CS 한 번에 변환 한 번이라
+    xfer2 하나에 명령을 이어 붙일 수 없으므로 burst 는 이 방식으로 묶습니다.
+    같은 frame 묶음을 반복해서 보내면 tx/rx/transfer 구조체 버퍼를 다시 만들지 않습니다.
+    """
+    # struct spi_ioc_transfer: tx_buf, rx_buf, len, speed_hz, delay_usecs, bits_per_word, cs_change,
+    #                          tx_nbits, rx_nbits, word_delay_usecs, pad (32 bytes)
+    TRANSFER = struct.Struct('<QQIIHBBBBBx')
+    MAX_FRAMES = 511  # ioctl 크기 필드 14bit (16KB) / 32 bytes
+
+    def __init__(self, fd: int, speed_hz: int):
+        import fcntl
+        self.ioctl = fcntl.ioctl
+        self.fd = fd
+        self.speed_hz = speed_hz
+        self._prepared: Dict[Tuple[Tuple[int, ...], ...], list] = {}
+
+    @classmethod
+    def open(cls, spi) -> Optional['SpiMessage']:
+        """spidev.SpiDev 의 파일 디스크립터로 생성. fileno 가 없는 (Linux spidev 가 아닌) 객체면 None"""
+        fileno = getattr(spi, 'fileno', None)
+        if fileno is None:
+            return None
+        try:
+            return cls(fileno(), int(getattr(spi, 'max_speed_hz', 0)))
+        except (OSError, ImportError, ValueError):
+            return None
+
+    @staticmethod
+    def request(count: int) -> int:
+        """_IOW('k', 0, char[count * 32])"""
+        return (1 << 30) | ((count * 32) << 16) | (ord('k') << 8)
+
+    def _prepare(self, frames: Tuple[Tuple[int, ...], ...]) -> list:
+        length = len(frames[0])
+        if any(len(frame) != length for frame in frames):
+            raise ValueError("All frames in a burst must have the same length")
+        chunks = []
+        for start in range(0, len(frames), self.MAX_FRAMES):
+            part = frames[start:start + self.MAX_FRAMES]
+            tx = (ctypes.c_uint8 * (len(part) * length)).from_buffer_copy(bytes(b for frame in part for b in frame))
+            rx = (ctypes.c_uint8 * (len(part) * length))()
+            message = bytearray(self.TRANSFER.size * len(part))
+            for i in range(len(part)):
+                self.TRANSFER.pack_into(message, i * self.TRANSFER.size,
+                                        ctypes.addressof(tx) + i * length, ctypes.addressof(rx) + i * length,
+                                        length, self.speed_hz, 0, 8, int(i < len(part) - 1), 0, 0, 0)
+            chunks.append((self.request(len(part)), message, tx, rx))  # tx 는 버퍼 수명 유지용
+        return chunks
+
+    def transfer(self, frames: Sequence[Sequence[int]]) -> List[bytes]:
+        key = tuple(tuple(frame) for frame in frames)
+        chunks = self._prepared.get(key)
+        if chunks is None:
+            chunks = self._prepared[key] = self._prepare(key)
+        length = len(key[0])
+        replies: List[bytes] = []
+        for request, message, _tx, rx in chunks:
+            self.ioctl(self.fd, request, message)
+            data = bytes(rx)
+            replies.extend(data[i:i + length] for i in range(0, len(data), length))
+        return replies
+
+
+class MCP3208:
+    """MCP3208 12bit ADC. mcp3208.ADC 와 같은 analogRead 제공. spi 는 spidev.SpiDev 또는 SimulatedSPI"""
+
+    def __init__(self, spi):
+        self.spi = spi
+        self.transfers = 0  # read_burst 가 사용한 SPI 호출 (시스템 호출) 수
+        self._message: Optional[SpiMessage] = None
+        self._message_checked = False
+
+    @staticmethod
+    def command(channel: int) -> List[int]:
+        """single-ended 변환 명령 3바이트 (start, SGL, D2 | D1 D0)"""
+        return [0x06 | (channel >> 2), (channel & 0x03) << 6, 0x00]
+
+    @staticmethod
+    def decode(reply: Sequence[int]) -> int:
+        return ((reply[1] & 0x0F) << 8) | reply[2]
+
+    def analogRead(self, channel: int) -> int:
+        return self.decode(self.spi.xfer2(self.command(channel)))
+
+    def _transfer(self, frames: List[List[int]]) -> List[Sequence[int]]:
+        if hasattr(self.spi, 'transfer_frames'):  # SimulatedSPI
+            self.transfers += 1
+            return self.spi.transfer_frames(frames)
+        if not self._message_checked:
+            self._message_checked = True
+            self._message = SpiMessage.open(self.spi)
+        if self._message is not None:
+            self.transfers += -(-len(frames) // SpiMessage.MAX_FRAMES)
+            return self._message.transfer(frames)
+        # ioctl 을 쓸 수 없으면 변환마다 xfer2
+        self.transfers += len(frames)
+        return [self.spi.xfer2(frame) for frame in frames]
+
+    def read_burst(self, channels: Sequence[int], samples: int) -> Dict[int, List[int]]:
+        """
+        채널마다 samples 번 변환. 채널을 번갈아 변환하므로 (0,1,0,1,...) 채널 간 시각 차이가 작음.
+        반환: {channel: [값, ...]}
+        """
+        frames = [self.command(ch) for _ in range(samples) for ch in channels]
+        result: Dict[int, List[int]] = {ch: [] for ch in channels}
+        for i, reply in enumerate(self._transfer(frames)):
+            result[channels[i % len(channels)]].append(self.decode(reply))
+        return result
+
+    def close(self) -> None:
+        self.spi.close()
+
+
+class SimulatedSPI:
+    """spidev.SpiDev 대용. MCP3208 을 흉내 내어 signal(t) 의 채널별 0~1 값을 12bit 로 변환"""
+
+    def __init__(self, signal: Optional[Signal] = None, clock: Optional[SimClock] = None):
+        self.signal = signal or light_signal()
+        self.clock = clock or SimClock()
+        self.max_speed_hz = 1000000
+        self.mode = 0
+        self.transfers = 0
+
+    def open(self, bus: int, device: int) -> None:
+        pass
+
+    def convert(self, channel: int, t: Optional[float] = None) -> int:
+        return max(0, min(4095, int(self.signal(self.clock.now() if t is None else t)[channel] * 4095)))
+
+    def _reply(self, data: Sequence[int], t: float) -> List[int]:
+        reply = [0] * len(data)
+        if len(data) >= 3 and data[0] & 0x04:
+            value = self.convert(((data[0] & 0x01) << 2) | (data[1] >> 6), t)
+            reply[1], reply[2] = value >> 8, value & 0xFF
+        return reply
+
+    def xfer2(self, data: Sequence[int]) -> List[int]:
+        """chip select 한 번 = 변환 한 번. 첫 3바이트의 명령만 해석"""
+        self.transfers += 1
+        return self._reply(data, self.clock.now())
+
+    def transfer_frames(self, frames: Sequence[Sequence[int]]) -> List[List[int]]:
+        """SpiMessage (SPI_IOC_MESSAGE) 대응: frame 마다 CS 를 올리는 변환 묶음을 호출 한 번으로. frame 마다 전송 시간만큼 시각이 지남"""
+        self.transfers += 1
+        t = self.clock.now()
+        replies = []
+        for frame in frames:
+            replies.append(self._reply(frame, t))
+            t += len(frame) * 8 / self.max_speed_hz
+        return replies
+
+    def close(self) -> None:
+        pass
+
+
+def open_adc(bus: int = 0, device: int = 0, max_speed_hz: int = 1000000, simulate: bool = False,
+             clock: Optional[SimClock] = None, signal: Optional[Signal] = None) -> MCP3208:
+    if simulate:
+        return MCP3208(SimulatedSPI(signal, clock))
+    import spidev
+    spi = spidev.SpiDev()
+    spi.open(bus, device)
+    spi.max_speed_hz = max_speed_hz
+    return MCP3208(spi)
+
+
+# ---------------------------------------------------------------- camera
+
+class _PacedCamera:
+    """Picamera2 (capture_array) 와 cv2.VideoCapture (read) 두 방식 모두 제공. fps 에 맞춰 (가상 시간) 프레임을 냄"""
+
+    def __init__(self, fps: float, clock: Optional[SimClock]):
+        self.fps = fps
+        self.clock = clock or SimClock()
+        self.next_time = self.clock.now()
+        self.frames = 0
+        self.skipped = 0
+        self.opened = True
+
+    def _frame(self, t: float):
+        raise NotImplementedError
+
+    def _next(self):
+        # 실제 카메라처럼 프레임 주기에 맞춰 대기하고, 늦게 읽으면 지나간 프레임은 버림
+        period = 1.0 / self.fps
+        time.sleep(self.clock.real_delay(self.next_time))
+        late = int((self.clock.now() - self.next_time) / period)
+        if late > 0:
+            self.skipped += late
+            self.next_time += late * period
+        frame = self._frame(self.next_time)
+        self.next_time += period
+        self.frames += 1
+        return frame
+
+    # Picamera2
+    def create_video_configuration(self, main: Optional[Dict] = None, **kwargs) -> Dict:
+        return {'main': dict(main or {})}
+
+    def configure(self, config: Dict) -> None:
+        pass
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def capture_array(self, name: str = 'main'):
+        return self._next()
+
+    # cv2.VideoCapture
+    def isOpened(self) -> bool:
+        return self.opened
+
+    def read(self):
+        frame = self._next()
+        return frame is not None, frame
+
+    def release(self) -> None:
+        self.opened = False
+
+    close = release
+
+
+class SimulatedCamera(_PacedCamera):
+    """고정 배경 위로 사각형이 움직이는 BGR 프레임 (움직임 감지 동작 확인용)"""
+
+    def __init__(self, size: Tuple[int, int] = (640, 480), fps: float = 30.0,
+                 clock: Optional[SimClock] = None, seed: int = 0):
+        import numpy as np
+        super().__init__(fps, clock)
+        self.width, self.height = size
+        rng = np.random.default_rng(seed)
+        gradient = np.linspace(40, 160, self.width, dtype=np.float32)[None, :, None]
+        texture = rng.integers(0, 24, (self.height, self.width, 1))
+        self.background = np.clip(gradient + texture, 0, 255).astype(np.uint8).repeat(3, axis=2)
+        self.box = max(self.height // 6, 8)
+
+    def configure(self, config: Dict) -> None:
+        size = config.get('main', {}).get('size')
+        if size and tuple(size) != (self.width, self.height):
+            self.__init__(tuple(size), self.fps, self.clock)
+
+    def _frame(self, t: float):
+        frame = self.background.copy()
+        x = int((self.width - self.box) * (0.5 + 0.5 * math.sin(2 * math.pi * t / 4.0)))
+        y = int((self.height - self.box) * (0.5 + 0.5 * math.cos(2 * math.pi * t / 6.0)))
+        frame[y:y + self.box, x:x + self.box] = (40, 200, 255)
+        return frame
+
+
+class VideoFileCamera(_PacedCamera):
+    """녹화한 영상 파일 재생 (cv2). loop 이면 끝에서 처음으로"""
+
+    def __init__(self, path: str, clock: Optional[SimClock] = None, loop: bool = True, fps: Optional[float] = None):
+        import cv2
+        self.cv2 = cv2
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise OSError(f"Cannot open video file: {path}")
+        super().__init__(fps or self.capture.get(cv2.CAP_PROP_FPS) or 30.0, clock)
+        self.path = path
+        self.loop = loop
+
+    def _frame(self, t: float):
+        ok, frame = self.capture.read()
+        if not ok and self.loop:
+            self.capture.set(self.cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.capture.read()
+        return frame if ok else None
+
+    def release(self) -> None:
+        super().release()
+        self.capture.release()
+
+    close = release
+
+
+def open_camera(kind: str = 'picamera2', index: int = 0, size: Tuple[int, int] = (640, 480),
+                simulate: bool = False, video: Optional[str] = None, clock: Optional[SimClock] = None,
+                fps: float = 30.0):
+    """
+    kind  : 'picamera2' (configure 까지 끝낸 Picamera2) 또는 'opencv' (cv2.VideoCapture(index))
+    video : 녹화 영상 파일을 카메라 대신 재생. simulate 이면 SimulatedCamera
+    """
+    if video is not None:
+        return VideoFileCamera(video, clock)
+    if simulate:
+        return SimulatedCamera(size, fps, clock)
+    if kind == 'picamera2':
+        from picamera2 import Picamera2
+        camera = Picamera2()
+        camera.configure(camera.create_video_configuration(main={"size": size}))
+        return camera
+    if kind == 'opencv':
+        import cv2
+        return cv2.VideoCapture(index)
+    raise ValueError(f"Unknown camera kind: {kind}")
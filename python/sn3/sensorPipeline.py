@@ -0,0 +1,137 @@
+import logging
+import time
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+STOP = object()  # 각 stage 에 종료를 알리는 표시
+
+
+def offer_latest(queue: Queue, item) -> bool:
+    """가득 찬 queue 에서는 가장 오래된 항목을 버리고 넣음. 버린 항목이 있으면 True"""
+    dropped = False
+    while True:
+        try:
+            queue.put_nowait(item)
+            return dropped
+        except Full:
+            try:
+                queue.get_nowait()
+                dropped = True
+            except Empty:
+                pass
+
+
+class SensorPipeline:
+    """
+    센서 읽기와 LCD 표시를 스레드 단계로 분리합니다.
+
+        reader stage  : 시리얼에서 줄을 읽는 즉시 readings queue 에 넣음 (표시를 기다리지 않음)
+        store stage   : readings 를 SensorData 에 반영하고 최신 값을 display queue 로 넘김
+        display stage : display_interval 마다 최대 한 번 LCD 갱신, 밀린 값은 최신 것만 표시.
+                        stale_after 초 넘게 새 값이 없으면 (센서 / 시리얼 끊김) N/A 로 다시 표시
+
+    sensor_reader 가 EOFError (sensorTrace 재생 기록 끝) 를 내면 reader stage 를 끝내고 on_end 를 호출합니다.
+
+    queue 는 모두 크기가 제한되어 있고 가득 차면 오래된 값을 버리므로
+    LCD(I2C) 가 느려져도 시리얼 읽기는 멈추지 않습니다.
+    """
+
+    def __init__(self, sensor_reader, sensor_data, lcd_controller,
+                 display_interval: float = 2.0, queue_size: int = 32, stale_after: float = 10.0,
+                 on_end: Optional[Callable[[EOFError], None]] = None):
+        self.sensor_reader = sensor_reader
+        self.sensor_data = sensor_data
+        self.lcd_controller = lcd_controller
+        self.display_interval = display_interval
+        self.stale_after = stale_after
+        self.on_end = on_end
+        self.end_of_input: Optional[EOFError] = None
+        self.readings: Queue = Queue(maxsize=queue_size)
+        self.display_queue: Queue = Queue(maxsize=1)
+        self.stop_event = Event()
+        self.stats: Dict[str, int] = {'read': 0, 'dropped': 0, 'stored': 0, 'displayed': 0, 'skipped': 0,
+                                      'stale': 0}
+        self.threads = [
+            Thread(target=self._reader_stage, name='sensor-reader', daemon=True),
+            Thread(target=self._store_stage, name='sensor-store', daemon=True),
+            Thread(target=self._display_stage, name='lcd-display', daemon=True),
+        ]
+
+    def start(self) -> None:
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self, timeout: float = 3.0) -> None:
+        """세 단계를 멈추고 기다림. 시리얼 포트를 닫기 전에 호출"""
+        self.stop_event.set()
+        offer_latest(self.readings, STOP)
+        offer_latest(self.display_queue, STOP)
+        for thread in self.threads:
+            thread.join(timeout=timeout)
+        logger.info(f"Sensor pipeline stats: {self.stats}")
+
+    def _reader_stage(self) -> None:
+        while not self.stop_event.is_set():
+            try:
+                # read_data 는 한 줄이 오거나 시리얼 timeout 이 될 때까지 대기
+                temp, humid = self.sensor_reader.read_data()
+                if temp is None and humid is None:
+                    continue
+                self.stats['read'] += 1
+                if offer_latest(self.readings, (temp, humid)):
+                    self.stats['dropped'] += 1
+            except EOFError as e:  # 재생 기록 끝
+                self.end_of_input = e
+                if self.on_end:
+                    self.on_end(e)
+                break
+            except Exception as e:
+                logger.error(f"Error in sensor reader stage: {e}")
+                self.stop_event.wait(1.0)
+
+    def _store_stage(self) -> None:
+        while not self.stop_event.is_set():
+            item = self.readings.get()
+            if item is STOP:
+                break
+            try:
+                self.sensor_data.update_sensor_data(*item)
+                self.stats['stored'] += 1
+                if offer_latest(self.display_queue, item):
+                    self.stats['skipped'] += 1
+            except Exception as e:
+                logger.error(f"Error in sensor store stage: {e}")
+
+    def _display_stage(self) -> None:
+        item = (None, None)  # 첫 값이 오기 전에는 N/A 표시
+        received = None      # 표시 중인 값을 받은 시각
+        while not self.stop_event.is_set():
+            started = time.monotonic()
+            try:
+                self.lcd_controller.update_display(*item)
+                self.stats['displayed'] += 1
+            except Exception as e:
+                logger.error(f"Error in LCD display stage: {e}")
+            # 표시 주기 제한: 남은 시간 동안 대기한 뒤 그 사이 가장 최신 값 하나만 사용
+            if self.stop_event.wait(max(0.0, self.display_interval - (time.monotonic() - started))):
+                break
+            while True:
+                try:
+                    item = self.display_queue.get(timeout=self.display_interval)
+                except Empty:
+                    # 새 값이 없으면 다시 그리지 않음. 마지막 값이 오래되었으면 한 번만 N/A 로 표시
+                    if received is not None and time.monotonic() - received > self.stale_after:
+                        logger.warning(f"No sensor reading for {self.stale_after}s, showing N/A")
+                        self.stats['stale'] += 1
+                        item, received = (None, None), None
+                        break
+                    if self.stop_event.is_set():
+                        return
+                    continue
+                if item is STOP:
+                    return
+                received = time.monotonic()
+                break
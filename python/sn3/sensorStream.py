@@ -0,0 +1,78 @@
+import logging
+from threading import Condition, Event, Thread
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+KEEPALIVE_INTERVAL = 15.0  # 프록시/브라우저가 연결을 끊지 않도록 주석 이벤트 전송
+RETRY_MS = 2000            # 연결이 끊겼을 때 브라우저 재연결 간격
+
+
+class SensorStream:
+    """
+    SensorData 변경을 Server-Sent Events 로 브라우저에 전달합니다.
+    producer 스레드 하나가 변경 시에만 이벤트를 한 번 직렬화하고,
+    각 브라우저 연결(generator)은 같은 bytes 를 받아 전송만 합니다.
+    """
+
+    def __init__(self, sensor_data):
+        self.sensor_data = sensor_data
+        self.condition = Condition()
+        self.version = -1
+        self.payload = b""
+        self.clients = 0
+        self.stop_event = Event()
+        self.thread = Thread(target=self._producer, daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        with self.sensor_data.changed:
+            self.sensor_data.changed.notify_all()
+        with self.condition:
+            self.condition.notify_all()
+
+    def _producer(self) -> None:
+        seen = -1
+        while not self.stop_event.is_set():
+            with self.sensor_data.changed:
+                self.sensor_data.changed.wait_for(
+                    lambda: self.sensor_data.revision != seen or self.stop_event.is_set(),
+                    timeout=KEEPALIVE_INTERVAL)
+                if self.sensor_data.revision == seen:
+                    continue
+
+            # 값 묶음은 snapshot 하나에서 읽고, JSON 은 snapshot 에 캐시된 것을 사용
+            snapshot = self.sensor_data.snapshot()
+            seen = snapshot.revision
+            payload = f"id: {seen}\nevent: sensor\ndata: {snapshot.json()}\n\n".encode()
+            with self.condition:
+                self.version = seen
+                self.payload = payload
+                self.condition.notify_all()
+
+    def events(self) -> Iterator[bytes]:
+        """브라우저 한 연결에 대한 이벤트 generator. 연결 즉시 현재 값을 보냄"""
+        with self.condition:
+            self.clients += 1
+            logger.info(f"SSE client connected ({self.clients} total)")
+        sent = None
+        try:
+            yield f"retry: {RETRY_MS}\n\n".encode()
+            while not self.stop_event.is_set():
+                with self.condition:
+                    self.condition.wait_for(
+                        lambda: self.version != sent or self.stop_event.is_set(),
+                        timeout=KEEPALIVE_INTERVAL)
+                    version, payload = self.version, self.payload
+                if version == sent or not payload:
+                    yield b": keep-alive\n\n"
+                    continue
+                sent = version
+                yield payload
+        finally:
+            with self.condition:
+                self.clients -= 1
+                logger.info(f"SSE client disconnected ({self.clients} total)")
@@ -0,0 +1,463 @@
+## 센서 입력 기록 / 재생 (장애 재현, 회귀/성능 테스트용)
+##
+## 기록 : 실제 (또는 시뮬레이션) 장치를 Recording* 로 감싸 읽은 값을 시각과 함께 binary log 에 남깁니다.
+##        I2C 읽기/쓰기 (IMU 레지스터, FIFO), 시리얼 줄 (DHT, Pico, Bluetooth), ADC 값, TCP 로 보낸 데이터
+## 재생 : Replay* 장치가 기록을 같은 메소드로 돌려주므로 시나리오 파이프라인을 그대로 실행할 수 있고,
+##        SimClock(speed) 로 1x~100x 빠르게 돌립니다. TCP 데이터는 CLI 로 TCPServer 에 다시 보냅니다.
+##
+##   python Senario_2_Pi4.py --mode fifo --record /tmp/drop.trace          # Pi 에서 기록
+##   python Senario_2_Pi4.py --mode fifo --replay /tmp/drop.trace --speed 20 --tcp-host 127.0.0.1
+##   python sensorTrace.py info /tmp/drop.trace
+##   python sensorTrace.py tcp /tmp/drop.trace --host 127.0.0.1 --speed 50  # Server_socket.py 로 전송
+##
+## 파일 형식 (little-endian)
+##   header : magic 'SNTR', version (1B), 3B 예약, 기록 시작 epoch (f64)
+##   record : kind (1B), stream (1B), 이전 record 이후 경과 us (u32), payload 길이 (u16), payload
+##            I2C    : address (1B), register (1B), data
+##            SERIAL : 받은/보낸 bytes 그대로
+##            ADC    : channel (1B), value (u16)
+##            ADC_BURST : channel (1B), value (u16) x 변환 수   (MCP3208.read_burst 한 번의 채널별 값)
+##            TCP    : 보낸 bytes 그대로
+## record 마다 8바이트라서 500Hz IMU FIFO 를 기록해도 초당 7~8KB 정도입니다.
+
+import argparse
+import bisect
+import json
+import socket
+import struct
+import threading
+import time
+from collections import Counter, defaultdict, namedtuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import sensorDrivers
+
+MAGIC = b'SNTR'
+VERSION = 1
+HEADER = struct.Struct('<4sB3xd')
+RECORD = struct.Struct('<BBIH')
+ADC_PAYLOAD = struct.Struct('<BH')
+MAX_DELTA_US = 0xFFFFFFFF
+
+KIND_GAP = 0          # payload 없음. 긴 공백 (71분 초과) 을 나눠 기록
+KIND_I2C_READ = 1
+KIND_I2C_WRITE = 2
+KIND_SERIAL_RX = 3
+KIND_SERIAL_TX = 4
+KIND_ADC = 5
+KIND_TCP = 6
+KIND_ADC_BURST = 7
+KIND_NAMES = {KIND_GAP: 'gap', KIND_I2C_READ: 'i2c_read', KIND_I2C_WRITE: 'i2c_write',
+              KIND_SERIAL_RX: 'serial_rx', KIND_SERIAL_TX: 'serial_tx', KIND_ADC: 'adc', KIND_TCP: 'tcp',
+              KIND_ADC_BURST: 'adc_burst'}
+
+I2C_M_RD = 0x0001  # smbus2 i2c_msg 읽기 flag
+
+Record = namedtuple('Record', 't kind stream payload')  # t: 기록 시작 후 초
+
+
+class TraceEnd(EOFError):
+    """재생할 기록이 끝남"""
+
+
+class TraceWriter:
+    """여러 장치 스레드에서 동시에 write 해도 되는 기록기. clock 은 경과 초 (기본: monotonic)"""
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.monotonic):
+        self.path = path
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, time.time()))
+        self.started = clock()
+        self.last_us = 0
+        self.counts: Counter = Counter()
+
+    def write(self, kind: int, payload: bytes = b'', stream: int = 0) -> None:
+        with self.lock:
+            if self.file is None:
+                return
+            now_us = int((self.clock() - self.started) * 1e6)
+            delta = max(now_us - self.last_us, 0)
+            self.last_us += delta
+            while delta > MAX_DELTA_US:
+                self.file.write(RECORD.pack(KIND_GAP, 0, MAX_DELTA_US, 0))
+                delta -= MAX_DELTA_US
+            self.file.write(RECORD.pack(kind, stream, delta, len(payload)))
+            self.file.write(payload)
+            self.counts[kind] += 1
+
+    def write_i2c(self, kind: int, address: int, register: Optional[int], data, stream: int = 0) -> None:
+        self.write(kind, bytes((address, 0xFF if register is None else register)) + bytes(data), stream)
+
+    def close(self) -> None:
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TraceReader:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, version, self.started = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a sensor trace (v{VERSION}): {path}")
+
+    def __iter__(self) -> Iterator[Record]:
+        t_us = 0
+        with open(self.path, 'rb') as f:
+            f.seek(HEADER.size)
+            while True:
+                head = f.read(RECORD.size)
+                if len(head) < RECORD.size:
+                    return  # 기록 중 전원이 꺼져 잘린 마지막 record 는 무시
+                kind, stream, delta, length = RECORD.unpack(head)
+                payload = f.read(length)
+                if len(payload) < length:
+                    return
+                t_us += delta
+                if kind != KIND_GAP:
+                    yield Record(t_us / 1e6, kind, stream, payload)
+
+    def load(self) -> List[Record]:
+        return list(self)
+
+
+# ---------------------------------------------------------------- 기록
+
+class _Passthrough:
+    """감싼 장치에 없는 메소드/속성은 그대로 전달"""
+
+    def __init__(self, target, writer: TraceWriter, stream: int):
+        self.target = target
+        self.writer = writer
+        self.stream = stream
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.target, name)
+
+
+class RecordingBus(_Passthrough):
+    """smbus / smbus2 / SimulatedI2CBus 를 감싸 I2C 읽기/쓰기를 기록"""
+
+    def __init__(self, bus, writer: TraceWriter, stream: int = 0):
+        super().__init__(bus, writer, stream)
+        if hasattr(bus, 'i2c_rdwr'):
+            self.i2c_rdwr = self._i2c_rdwr  # 없는 bus 에서는 FifoAcquisition 이 block 읽기를 사용하도록
+
+    def read_byte_data(self, address: int, register: int) -> int:
+        value = self.target.read_byte_data(address, register)
+        self.writer.write_i2c(KIND_I2C_READ, address, register, (value,), self.stream)
+        return value
+
+    def read_i2c_block_data(self, address: int, register: int, length: int):
+        data = self.target.read_i2c_block_data(address, register, length)
+        self.writer.write_i2c(KIND_I2C_READ, address, register, data, self.stream)
+        return data
+
+    def write_byte_data(self, address: int, register: int, value: int) -> None:
+        self.target.write_byte_data(address, register, value)
+        self.writer.write_i2c(KIND_I2C_WRITE, address, register, (value,), self.stream)
+
+    def write_i2c_block_data(self, address: int, register: int, data) -> None:
+        self.target.write_i2c_block_data(address, register, data)
+        self.writer.write_i2c(KIND_I2C_WRITE, address, register, data, self.stream)
+
+    def _i2c_rdwr(self, *messages) -> None:
+        self.target.i2c_rdwr(*messages)
+        register = None
+        for message in messages:
+            if message.flags & I2C_M_RD:
+                self.writer.write_i2c(KIND_I2C_READ, message.addr, register, bytes(message), self.stream)
+            else:
+                register = bytes(message)[0] if message.len else None
+
+
+class RecordingSerial(_Passthrough):
+    """serial.Serial / SimulatedSerial 을 감싸 받은 데이터와 보낸 데이터를 기록"""
+
+    def readline(self, *args) -> bytes:
+        data = self.target.readline(*args)
+        if data:
+            self.writer.write(KIND_SERIAL_RX, data, self.stream)
+        return data
+
+    def read(self, *args) -> bytes:
+        data = self.target.read(*args)
+        if data:
+            self.writer.write(KIND_SERIAL_RX, data, self.stream)
+        return data
+
+    def write(self, data: bytes) -> int:
+        written = self.target.write(data)
+        self.writer.write(KIND_SERIAL_TX, bytes(data), self.stream)
+        return written
+
+
+class RecordingADC(_Passthrough):
+    """analogRead 를 제공하는 ADC (mcp3208.ADC, sensorDrivers.MCP3208) 를 감싸 변환 값을 기록"""
+
+    def analogRead(self, channel: int) -> int:
+        value = self.target.analogRead(channel)
+        self.writer.write(KIND_ADC, ADC_PAYLOAD.pack(channel, value), self.stream)
+        return value
+
+    def read_burst(self, channels, samples: int) -> Dict[int, List[int]]:
+        result = self.target.read_burst(channels, samples)
+        for channel, values in result.items():
+            self.writer.write(KIND_ADC_BURST, struct.pack(f'<B{len(values)}H', channel, *values), self.stream)
+        return result
+
+
+def encode_payload(data: Any) -> bytes:
+    """TCPClient.start_periodic_send 와 같은 방식으로 직렬화"""
+    return data.encode() if isinstance(data, str) else json.dumps(data).encode()
+
+
+# ---------------------------------------------------------------- 재생
+
+class ReplayBus:
+    """
+    I2C 기록 재생. (address, register) 별로 기록된 읽기 결과를 순서대로 돌려주고,
+    기록 시각이 아직 오지 않았으면 그때까지 (가상 시간) 기다립니다. 쓰기는 무시.
+    읽는 길이가 기록과 달라도 (smbus2 i2c_rdwr 로 기록한 FIFO 를 32바이트 block 으로 읽는 경우 등) 이어 붙여 나눠 줍니다.
+    """
+
+    def __init__(self, records: List[Record], clock: sensorDrivers.SimClock):
+        self.clock = clock
+        self.queues: Dict[Tuple[int, int], List[Record]] = defaultdict(list)
+        for record in records:
+            if record.kind == KIND_I2C_READ:
+                self.queues[(record.payload[0], record.payload[1])].append(record)
+        self.positions: Counter = Counter()
+        self.pending: Dict[Tuple[int, int], bytes] = defaultdict(bytes)
+
+    def _take(self, address: int, register: int, length: int) -> List[int]:
+        key = (address, register)
+        data = self.pending[key]
+        queue = self.queues[key]
+        while len(data) < length:
+            position = self.positions[key]
+            if position >= len(queue):
+                raise TraceEnd(f"No more recorded reads for 0x{address:02x}/0x{register:02x}")
+            record = queue[position]
+            self.positions[key] = position + 1
+            time.sleep(self.clock.real_delay(record.t))
+            data += record.payload[2:]
+        self.pending[key] = data[length:]
+        return list(data[:length])
+
+    def read_byte_data(self, address: int, register: int) -> int:
+        return self._take(address, register, 1)[0]
+
+    def read_i2c_block_data(self, address: int, register: int, length: int) -> List[int]:
+        return self._take(address, register, length)
+
+    def write_byte_data(self, address: int, register: int, value: int) -> None:
+        pass
+
+    def write_i2c_block_data(self, address: int, register: int, data) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class ReplaySerial(sensorDrivers.SimulatedSerial):
+    """
+    시리얼 기록 재생. 받은 데이터를 기록된 시각 (가상 시간) 에 수신 버퍼에 넣음. 보낸 데이터는 무시.
+    기록을 모두 넣고 수신 버퍼도 비면 TraceEnd
+    """
+
+    def __init__(self, records: List[Record], clock: sensorDrivers.SimClock, timeout: Optional[float] = 1.0,
+                 port: str = 'replay'):
+        super().__init__(clock=clock, timeout=timeout, port=port)
+        self.records = [record for record in records if record.kind == KIND_SERIAL_RX]
+        self.position = 0
+
+    def _next_due(self) -> Optional[float]:
+        return self.records[self.position].t if self.position < len(self.records) else None
+
+    def _pump(self) -> None:
+        now = self.clock.now()
+        while self.position < len(self.records) and self.records[self.position].t <= now:
+            self.rx += self.records[self.position].payload
+            self.stats['lines'] += 1
+            self.position += 1
+        if self.position == len(self.records) and not self.rx:
+            raise TraceEnd(f"No more recorded serial data on {self.port}")
+
+
+class ReplayADC:
+    """ADC 기록 재생. 채널별로 현재 (가상) 시각 직전에 기록된 값 (read_burst 는 burst) 을 돌려줌"""
+
+    def __init__(self, records: List[Record], clock: sensorDrivers.SimClock):
+        self.clock = clock
+        self.times: Dict[int, List[float]] = defaultdict(list)
+        self.values: Dict[int, List[int]] = defaultdict(list)
+        self.burst_times: Dict[int, List[float]] = defaultdict(list)
+        self.bursts: Dict[int, List[Tuple[int, ...]]] = defaultdict(list)
+        for record in records:
+            if record.kind == KIND_ADC:
+                channel, value = ADC_PAYLOAD.unpack(record.payload)
+                self.times[channel].append(record.t)
+                self.values[channel].append(value)
+            elif record.kind == KIND_ADC_BURST:
+                channel, *values = struct.unpack(f'<B{(len(record.payload) - 1) // 2}H', record.payload)
+                self.burst_times[channel].append(record.t)
+                self.bursts[channel].append(tuple(values))
+        self.end = max((times[-1] for times in (*self.times.values(), *self.burst_times.values())), default=0.0)
+
+    def analogRead(self, channel: int) -> int:
+        now = self.clock.now()
+        if now > self.end or not self.times[channel]:
+            raise TraceEnd(f"No more recorded ADC values for channel {channel}")
+        return self.values[channel][max(bisect.bisect_right(self.times[channel], now) - 1, 0)]
+
+    def read_burst(self, channels, samples: int) -> Dict[int, List[int]]:
+        """analogRead 로 기록한 trace 면 그 값을 samples 번 반복"""
+        now = self.clock.now()
+        if now > self.end:
+            raise TraceEnd("No more recorded ADC values")
+        result = {}
+        for channel in channels:
+            times = self.burst_times[channel]
+            if times:
+                result[channel] = list(self.bursts[channel][max(bisect.bisect_right(times, now) - 1, 0)])
+            else:
+                result[channel] = [self.analogRead(channel)] * samples
+        return result
+
+    def close(self) -> None:
+        pass
+
+
+class TraceSession:
+    """
+    시나리오의 --record / --replay 처리. 장치를 열 때 bus() / serial() / adc() 를 거치면
+    기록 모드에서는 실제 장치를 감싸고, 재생 모드에서는 실제 장치를 열지 않고 기록으로 대체합니다.
+    stream 은 같은 종류의 장치가 여럿일 때 구분하는 번호.
+    """
+
+    def __init__(self, record: Optional[str] = None, replay: Optional[str] = None,
+                 clock: Optional[sensorDrivers.SimClock] = None):
+        if record and replay:
+            raise ValueError("Cannot record and replay at the same time")
+        self.clock = clock or sensorDrivers.SimClock()
+        self.writer = TraceWriter(record, self.clock.now) if record else None
+        self.records = TraceReader(replay).load() if replay else None
+
+    @property
+    def replaying(self) -> bool:
+        return self.records is not None
+
+    def _select(self, stream: int) -> List[Record]:
+        return [record for record in self.records if record.stream == stream]
+
+    def bus(self, open_real: Callable[[], Any], stream: int = 0):
+        if self.replaying:
+            return ReplayBus(self._select(stream), self.clock)
+        bus = open_real()
+        return RecordingBus(bus, self.writer, stream) if self.writer else bus
+
+    def serial(self, open_real: Callable[[], Any], stream: int = 0, timeout: Optional[float] = 1.0):
+        if self.replaying:
+            return ReplaySerial(self._select(stream), self.clock, timeout=timeout, port=f"replay:{stream}")
+        ser = open_real()
+        return RecordingSerial(ser, self.writer, stream) if self.writer else ser
+
+    def adc(self, open_real: Callable[[], Any], stream: int = 0):
+        if self.replaying:
+            return ReplayADC(self._select(stream), self.clock)
+        adc = open_real()
+        return RecordingADC(adc, self.writer, stream) if self.writer else adc
+
+    def tcp_callback(self, callback: Callable[[], Any], stream: int = 0) -> Callable[[], Any]:
+        """TCPClient.start_periodic_send 콜백을 감싸 보낼 데이터를 기록"""
+        if self.writer is None:
+            return callback
+
+        def recorded():
+            data = callback()
+            if data:
+                self.writer.write(KIND_TCP, encode_payload(data), stream)
+            return data
+        return recorded
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+
+# ---------------------------------------------------------------- CLI
+
+def replay_tcp(records: List[Record], host: str, port: int = 12345, speed: float = 1.0,
+               stream: Optional[int] = None) -> int:
+    """기록한 TCP 데이터를 TCPServer (default/Server_socket.py) 에 같은 간격 (speed 배속) 으로 전송"""
+    payloads = [r for r in records if r.kind == KIND_TCP and (stream is None or r.stream == stream)]
+    clock = sensorDrivers.SimClock(speed)
+    with socket.create_connection((host, port), timeout=5.0) as sock:
+        sock.sendall(b"RASPI4_HELLO")
+        if sock.recv(1024) != b"PC_HELLO":
+            raise ConnectionError("Invalid handshake response")
+        offset = payloads[0].t if payloads else 0.0
+        for record in payloads:
+            time.sleep(clock.real_delay(record.t - offset))
+            sock.sendall(record.payload)
+    return len(payloads)
+
+
+def summarize(reader: TraceReader) -> Dict[str, Any]:
+    counts: Counter = Counter()
+    sizes: Counter = Counter()
+    duration = 0.0
+    for record in reader:
+        key = f"{KIND_NAMES.get(record.kind, record.kind)}[{record.stream}]"
+        counts[key] += 1
+        sizes[key] += len(record.payload)
+        duration = record.t
+    return {'started': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(reader.started)),
+            'duration': round(duration, 3), 'records': dict(counts), 'payload_bytes': dict(sizes)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sensor trace tools")
+    sub = parser.add_subparsers(dest='command', required=True)
+    info = sub.add_parser('info', help="기록 요약")
+    info.add_argument('trace')
+    dump = sub.add_parser('dump', help="record 출력")
+    dump.add_argument('trace')
+    dump.add_argument('--limit', type=int, default=50)
+    tcp = sub.add_parser('tcp', help="TCP 데이터를 TCPServer 에 다시 전송")
+    tcp.add_argument('trace')
+    tcp.add_argument('--host', default='127.0.0.1')
+    tcp.add_argument('--port', type=int, default=12345)
+    tcp.add_argument('--speed', type=float, default=1.0, help="배속 (1~100)")
+    tcp.add_argument('--stream', type=int, default=None)
+    args = parser.parse_args()
+
+    reader = TraceReader(args.trace)
+    if args.command == 'info':
+        print(json.dumps(summarize(reader), indent=2))
+    elif args.command == 'dump':
+        for i, record in enumerate(reader):
+            if i >= args.limit:
+                break
+            print(f"{record.t:12.6f} {KIND_NAMES.get(record.kind, record.kind):<10} {record.stream:>3} "
+                  f"{record.payload.hex() if record.kind in (KIND_I2C_READ, KIND_I2C_WRITE, KIND_ADC, KIND_ADC_BURST) else record.payload!r}")
+    else:
+        started = time.monotonic()
+        sent = replay_tcp(reader.load(), args.host, args.port, args.speed, args.stream)
+        print(f"Sent {sent} payloads in {time.monotonic() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
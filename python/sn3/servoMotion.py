@@ -0,0 +1,158 @@
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from threading import Condition, Event, Thread
+from typing import Callable, Optional
+
+from dutyTable import DutyTable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MotionPlan:
+    """
+    사다리꼴 속도 프로필 (가속 -> 등속 -> 감속) 로 start 에서 target 까지 이동하는 계획.
+    거리가 짧아 최고 속도에 닿지 못하면 삼각형 프로필이 됨
+    """
+    start: float
+    target: float
+    max_speed: float       # deg/s
+    acceleration: float    # deg/s^2
+    started: float = field(default_factory=time.monotonic)
+    duration: float = 0.0
+    completes_at: float = 0.0  # time.time() 기준 예상 완료 시각 (HTTP 응답용)
+    error: Optional[Exception] = None  # 이동 중 set_duty 가 실패하면 그 예외 (이동은 취소됨)
+
+    def __post_init__(self):
+        distance = abs(self.target - self.start)
+        self.direction = 1.0 if self.target >= self.start else -1.0
+        self.peak_speed = min(self.max_speed, math.sqrt(distance * self.acceleration))
+        self.ramp_time = self.peak_speed / self.acceleration if self.acceleration > 0 else 0.0
+        ramp_distance = 0.5 * self.acceleration * self.ramp_time ** 2
+        cruise_time = (distance - 2 * ramp_distance) / self.peak_speed if self.peak_speed > 0 else 0.0
+        self.cruise_time = max(0.0, cruise_time)
+        self.duration = 2 * self.ramp_time + self.cruise_time
+        self.completes_at = time.time() + self.duration
+
+    def position_at(self, elapsed: float) -> float:
+        if elapsed >= self.duration:
+            return self.target
+        a, v, t_ramp = self.acceleration, self.peak_speed, self.ramp_time
+        if elapsed < t_ramp:
+            travelled = 0.5 * a * elapsed ** 2
+        elif elapsed < t_ramp + self.cruise_time:
+            travelled = 0.5 * a * t_ramp ** 2 + v * (elapsed - t_ramp)
+        else:
+            remaining = self.duration - elapsed
+            travelled = abs(self.target - self.start) - 0.5 * a * remaining ** 2
+        return self.start + self.direction * travelled
+
+
+class MotionPlanner:
+    """
+    서보 이동을 요청 스레드와 분리하는 플래너입니다.
+    set_target() 은 계획만 세우고 바로 반환하며, 자체 타이머 스레드가 tick 마다 위치를 계산해 duty 를 바꿉니다.
+    이동 중 새 목표가 오면 현재 위치에서 다시 계획합니다 (가장 최근 목표가 우선).
+    duty 는 dutyTable.DutyTable 에서 꺼내 쓰고, 표 위치가 바뀔 때만 PWM 에 씁니다.
+    """
+
+    def __init__(self, set_duty: Callable[[float], None], duty_table: DutyTable,
+                 start_angle: float = 90, max_speed: float = 300.0, acceleration: float = 1500.0,
+                 tick: float = 0.02, settle_time: float = 0.1,
+                 on_error: Optional[Callable[[Exception], None]] = None):
+        """
+        set_duty    : PWM duty 설정 함수 (예: pwm.ChangeDutyCycle)
+        duty_table  : 각도 -> duty 조회표. 이동 범위도 표의 범위를 따름
+        tick        : 위치 갱신 주기. 50Hz 서보는 20ms 보다 빠르게 바꿔도 반영되지 않음
+        settle_time : 도착 후 duty 를 유지하는 시간. 이후 duty 0 으로 떨림 방지
+        on_error    : set_duty 실패 시 호출 (재초기화 등), 진행 중이던 이동은 취소됨
+        """
+        self.set_duty = set_duty
+        self.duty_table = duty_table
+        self.max_speed = max_speed
+        self.acceleration = acceleration
+        self.tick = tick
+        self.settle_time = settle_time
+        self.on_error = on_error
+
+        self.condition = Condition()
+        self.plan: Optional[MotionPlan] = None
+        self.position = float(start_angle)
+        self.applied_index: Optional[int] = None
+        self.idle = Event()
+        self.idle.set()
+        self.stopping = False
+        self.thread = Thread(target=self._run, name='servo-planner', daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        self.thread.join(timeout=timeout)
+
+    def set_target(self, angle: float) -> MotionPlan:
+        """목표 각도를 설정하고 계획을 반환 (이동 완료를 기다리지 않음)"""
+        angle = max(self.duty_table.min_angle, min(self.duty_table.max_angle, angle))
+        with self.condition:
+            plan = MotionPlan(self.position, angle, self.max_speed, self.acceleration)
+            self.plan = plan
+            self.idle.clear()
+            self.condition.notify_all()
+        return plan
+
+    @property
+    def target(self) -> float:
+        with self.condition:
+            return self.plan.target if self.plan is not None else self.position
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """진행 중인 이동이 끝날 때까지 대기. 끝나면 True (실패로 끝났는지는 MotionPlan.error 로 확인)"""
+        return self.idle.wait(timeout)
+
+    def _apply(self, angle: float) -> None:
+        index = self.duty_table.index(angle)
+        if index != self.applied_index:
+            self.set_duty(self.duty_table.table[index])
+            self.applied_index = index
+
+    def _finish(self) -> None:
+        self.plan = None
+        self.idle.set()
+
+    def _run(self) -> None:
+        with self.condition:
+            while not self.stopping:
+                plan = self.plan
+                if plan is None:
+                    self.condition.wait()
+                    continue
+
+                elapsed = time.monotonic() - plan.started
+                angle = plan.position_at(elapsed)
+                try:
+                    self._apply(angle)
+                    self.position = angle
+                    if elapsed < plan.duration:
+                        # 다음 tick 까지 대기. 새 목표가 오면 바로 깨어나 다시 계획
+                        self.condition.wait(timeout=self.tick)
+                        continue
+
+                    # 도착: 잠시 유지한 뒤 duty 0 (떨림 방지). 그 사이 새 목표가 오면 이어서 이동
+                    if self.condition.wait_for(lambda: self.plan is not plan or self.stopping,
+                                               timeout=self.settle_time):
+                        continue
+                    self.set_duty(0)
+                    self.applied_index = None
+                    self._finish()
+                except Exception as e:
+                    logger.error(f"Servo motion failed: {e}")
+                    plan.error = e
+                    self.applied_index = None
+                    self._finish()
+                    if self.on_error:
+                        self.on_error(e)
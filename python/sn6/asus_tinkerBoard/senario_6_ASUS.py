@@ -1,9 +1,11 @@
-import io
 import logging
 import socketserver
-from threading import Condition, Thread
+from threading import Thread
 from http import server
+import argparse
 import cv2
+import sensorDrivers
+import mjpegBroadcast
 
 PAGE = """\
 <html>
@@ -17,19 +19,9 @@ PAGE = """\
 </html>
 """
 
-class StreamingOutput(io.BufferedIOBase):
-    def __init__(self):
-        self.frame = None
-        self.condition = Condition()
-        print("StreamingOutput initialized.")
-
-    def write(self, buf):
-        with self.condition:
-            self.frame = buf
-            self.condition.notify_all()
-        #print("Frame written to output buffer.")
-
 class StreamingHandler(server.BaseHTTPRequestHandler):
+    timeout = 10  # 이 시간 동안 한 프레임도 받지 못하는 client 는 연결 종료
+
     def do_GET(self):
         if self.path == '/':
             self.send_response(301)
@@ -49,25 +41,17 @@ class StreamingHandler(server.BaseHTTPRequestHandler):
             self.send_header('Age', 0)
             self.send_header('Cache-Control', 'no-cache, private')
             self.send_header('Pragma', 'no-cache')
-            self.send_header('Content-Type', 'multipart/x-mixed-replace; boundary=FRAME')
+            self.send_header('Content-Type', mjpegBroadcast.CONTENT_TYPE)
             self.end_headers()
             print("Started streaming video at /stream.mjpg")
+            # 프레임마다 미리 만든 chunk 를 write 한 번으로. 늦으면 밀린 프레임은 건너뛰고 최신 프레임만 보냄
+            stats = {}
             try:
-                while True:
-                    with output.condition:
-                        output.condition.wait()
-                        frame = output.frame
-                    self.wfile.write(b'--FRAME\r\n')
-                    self.send_header('Content-Type', 'image/jpeg')
-                    self.send_header('Content-Length', len(frame))
-                    self.end_headers()
-                    self.wfile.write(frame)
-                    self.wfile.write(b'\r\n')
-                    #print("Sent a frame.")
+                output.stream(self.wfile.write, stats, idle_timeout=self.timeout)
             except Exception as e:
                 logging.warning(
-                    'Removed streaming client %s: %s',
-                    self.client_address, str(e))
+                    'Removed streaming client %s: %s (sent %d, skipped %d frames)',
+                    self.client_address, str(e), stats.get('sent', 0), stats.get('skipped', 0))
                 print(f"Streaming client {self.client_address} removed: {str(e)}")
         else:
             self.send_error(404)
@@ -111,13 +95,21 @@ def stream_processor(camera, output):
         output.write(processed_jpeg.tobytes())
 
 if __name__ == "__main__":
-    camera = cv2.VideoCapture(5)
+    parser = argparse.ArgumentParser(description="Scenario 6 TinkerBoard MJPEG streamer")
+    parser.add_argument('--simulate', action='store_true', help="카메라 없이 시뮬레이션 영상으로 실행")
+    parser.add_argument('--video', default=None, help="카메라 대신 재생할 녹화 영상 파일")
+    parser.add_argument('--speed', type=float, default=1.0, help="시뮬레이션/녹화 영상 배속")
+    args = parser.parse_args()
+
+    camera = sensorDrivers.open_camera('opencv', index=5, simulate=args.simulate, video=args.video,
+                                       clock=sensorDrivers.SimClock(args.speed))
     if not camera.isOpened():
         #print("Cannot open camera")
         exit()
     #print("Camera opened successfully.")
     
-    output = StreamingOutput()
+    output = mjpegBroadcast.MjpegBroadcaster()
+    print("StreamingOutput initialized.")
     
     processor_thread = Thread(target=stream_processor, args=(camera, output))
     processor_thread.daemon = True
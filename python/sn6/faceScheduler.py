@@ -0,0 +1,205 @@
+## 얼굴 검출 scheduler - 축소 영상에서 가끔 검출하고 그 사이에는 box 를 추적
+##
+## 기존 process_frame 은 640x480 전체 프레임에 매 프레임 detectMultiScale(gray, 1.1, 4) 를 실행해서
+## Pi 의 CPU 대부분을 얼굴 검출이 차지했습니다. FaceScheduler 는
+##   1. scale 배로 줄인 영상에서 검출 (연산량은 대략 scale^2 배)
+##   2. 마지막 검출 후 every 프레임이 지났을 때만 검출. motion_only 이면 움직임이 있을 때만,
+##      움직임이 없어도 max_idle 프레임마다 한 번은 검출 (가만히 있는 얼굴 / 사라진 얼굴 반영)
+##   3. 검출하지 않는 프레임에서는 box 안의 특징점을 optical flow (Lucas-Kanade) 로 따라가 box 를 옮김
+## scale=1, every=1, motion_only=False 이면 기존과 같은 결과 (매 프레임 전체 해상도 검출) 입니다.
+## 축소하면 cascade 최소 창 (24px) 때문에 검출 가능한 가장 작은 얼굴이 24/scale px 로 커집니다.
+##
+##   python faceScheduler.py clip.mp4 --scales 1 0.5 0.33 --every 1 5 10     # 녹화 영상으로 속도/정확도 비교
+
+import argparse
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+Box = Tuple[int, int, int, int]
+
+
+class _Track:
+    __slots__ = ('box', 'points')
+
+    def __init__(self, box, points):
+        self.box = box        # 축소 영상 좌표 (x, y, w, h) float
+        self.points = points  # (n, 1, 2) float32, 없으면 None (box 고정)
+
+
+class FaceScheduler:
+    def __init__(self, cascade, scale: float = 0.5, every: int = 5, motion_only: bool = True,
+                 max_idle: int = 30, track: bool = True):
+        """
+        scale       : 검출할 때 영상 축소 비율 (0~1)
+        every       : 검출 사이 최소 프레임 수 (1 이면 조건이 맞는 모든 프레임)
+        motion_only : 움직임 영역이 있을 때만 검출 (없으면 max_idle 프레임마다)
+        max_idle    : motion_only 일 때 움직임이 없어도 검출하는 주기 (프레임)
+        track       : 검출 사이 프레임에서 optical flow 로 box 이동 (False 면 마지막 box 유지)
+        """
+        if not 0 < scale <= 1:
+            raise ValueError("scale must be in (0, 1]")
+        self.cascade = cascade
+        self.scale = scale
+        self.every = max(1, every)
+        self.motion_only = motion_only
+        self.max_idle = max(self.every, max_idle)
+        self.track = track
+        self.tracks: List[_Track] = []
+        self.previous = None
+        self.since_detect: Optional[int] = None  # 마지막 검출 프레임부터 지난 프레임 수 (None: 아직 검출 전)
+        self.stats = {'frames': 0, 'detections': 0, 'tracked': 0, 'detect_s': 0.0, 'track_s': 0.0}
+
+    @property
+    def stateless(self) -> bool:
+        """프레임마다 독립적으로 검출 (이전 프레임의 검출 / 추적 상태를 쓰지 않음)"""
+        return self.every == 1 and not self.motion_only and not self.track
+
+    def due(self, motion: Sequence[Box]) -> bool:
+        if self.since_detect is None:
+            return True
+        if self.since_detect < self.every:
+            return False
+        return not self.motion_only or bool(motion) or self.since_detect >= self.max_idle
+
+    def _small(self, gray):
+        if self.scale == 1:
+            return gray
+        return cv2.resize(gray, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+
+    def _points(self, small, box):
+        x, y, w, h = (int(round(v)) for v in box)
+        mask = np.zeros(small.shape, dtype=np.uint8)
+        mask[max(y, 0):y + h, max(x, 0):x + w] = 255
+        return cv2.goodFeaturesToTrack(small, maxCorners=20, qualityLevel=0.01, minDistance=3, mask=mask)
+
+    def _detect(self, small) -> None:
+        started = time.perf_counter()
+        faces = self.cascade.detectMultiScale(small, 1.1, 4)
+        self.tracks = [_Track(tuple(float(v) for v in face),
+                              self._points(small, face) if self.track else None) for face in faces]
+        self.stats['detections'] += 1
+        self.stats['detect_s'] += time.perf_counter() - started
+        self.since_detect = 0
+
+    def _follow(self, small) -> None:
+        moving = [t for t in self.tracks if t.points is not None and len(t.points)]
+        if not moving or self.previous is None:
+            return
+        started = time.perf_counter()
+        old = np.concatenate([t.points for t in moving])
+        new, status, _ = cv2.calcOpticalFlowPyrLK(self.previous, small, old, None, winSize=(15, 15), maxLevel=2)
+        start = 0
+        for t in moving:
+            end = start + len(t.points)
+            good = status[start:end, 0] == 1
+            if good.sum() >= 3:
+                dx, dy = np.median(new[start:end][good] - old[start:end][good], axis=0)[0]
+                x, y, w, h = t.box
+                t.box = (x + float(dx), y + float(dy), w, h)
+                t.points = new[start:end][good].reshape(-1, 1, 2)
+            else:
+                t.points = None  # 놓친 box 는 다음 검출까지 그 자리에 유지
+            start = end
+        self.stats['tracked'] += 1
+        self.stats['track_s'] += time.perf_counter() - started
+
+    def step(self, gray, motion: Sequence[Box] = ()) -> List[Box]:
+        """gray: 전체 해상도 그레이스케일, motion: 이 프레임의 움직임 영역. 반환: 전체 해상도 얼굴 box"""
+        self.stats['frames'] += 1
+        small = self._small(gray)
+        if self.since_detect is not None:
+            self.since_detect += 1
+        if self.due(motion):
+            self._detect(small)
+        elif self.track:
+            self._follow(small)
+        self.previous = small if self.track else None
+        return [tuple(int(round(v / self.scale)) for v in t.box) for t in self.tracks]
+
+
+# ---------------------------------------------------------------- benchmark
+
+def _iou(a: Box, b: Box) -> float:
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[0] + a[2], b[0] + b[2]), min(a[1] + a[3], b[1] + b[3])
+    inter = max(0, x2 - x1) * max(0, y2 - y1)
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union else 0.0
+
+
+def _match(found: List[Box], reference: List[Box], threshold: float = 0.3) -> int:
+    return sum(any(_iou(box, ref) >= threshold for box in found) for ref in reference)
+
+
+def benchmark(path: str, configs: Sequence[Dict], limit: Optional[int] = None) -> List[Dict]:
+    """
+    녹화 영상의 프레임마다 기준 (전체 해상도, 매 프레임 검출) 과 configs 의 scheduler 결과를 비교.
+    recall: 기준 얼굴 중 IoU 0.3 이상으로 찾은 비율, precision: 찾은 box 중 기준과 맞는 비율
+    """
+    import framePipeline
+    cascade = framePipeline.load_face_cascade()
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise OSError(f"Cannot open video file: {path}")
+    grays, motions = [], []
+    motion = framePipeline.MotionReference()
+    while limit is None or len(grays) < limit:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        gray = framePipeline.to_gray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        grays.append(gray)
+        motions.append(motion.step(gray))
+    capture.release()
+    if not grays:
+        raise ValueError(f"No frames in {path}")
+
+    started = time.perf_counter()
+    reference = [framePipeline.face_boxes(cascade, gray) for gray in grays]
+    baseline_ms = (time.perf_counter() - started) / len(grays) * 1000
+    results = [{'config': 'baseline', 'ms_per_frame': round(baseline_ms, 2), 'detections': len(grays),
+                'recall': 1.0, 'precision': 1.0}]
+    for config in configs:
+        scheduler = FaceScheduler(cascade, **config)
+        hits = found_total = found_hits = 0
+        started = time.perf_counter()
+        outputs = [scheduler.step(gray, moving) for gray, moving in zip(grays, motions)]
+        elapsed = time.perf_counter() - started
+        for found, ref in zip(outputs, reference):
+            hits += _match(found, ref)
+            found_total += len(found)
+            found_hits += _match(ref, found)
+        faces = sum(len(ref) for ref in reference)
+        results.append({'config': ' '.join(f"{k}={v}" for k, v in config.items()),
+                        'ms_per_frame': round(elapsed / len(grays) * 1000, 2),
+                        'detections': scheduler.stats['detections'],
+                        'recall': round(hits / faces, 3) if faces else None,
+                        'precision': round(found_hits / found_total, 3) if found_total else None})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Face detection scheduler benchmark on recorded clips")
+    parser.add_argument('clips', nargs='+', help="녹화 영상 파일")
+    parser.add_argument('--scales', type=float, nargs='+', default=[1.0, 0.5, 0.33])
+    parser.add_argument('--every', type=int, nargs='+', default=[1, 5, 10])
+    parser.add_argument('--motion-only', action='store_true', help="움직임이 있을 때만 검출하는 설정으로 비교")
+    parser.add_argument('--no-track', action='store_true', help="검출 사이 box 추적 없이 비교")
+    parser.add_argument('--limit', type=int, default=None, help="영상마다 처리할 최대 프레임 수")
+    args = parser.parse_args()
+
+    configs = [{'scale': scale, 'every': every, 'motion_only': args.motion_only, 'track': not args.no_track}
+               for scale in args.scales for every in args.every]
+    for clip in args.clips:
+        print(clip)
+        print(f"  {'config':<55} {'ms/frame':>9} {'detect':>7} {'recall':>7} {'precision':>9}")
+        for r in benchmark(clip, configs, args.limit):
+            print(f"  {r['config']:<55} {r['ms_per_frame']:>9} {r['detections']:>7} "
+                  f"{str(r['recall']):>7} {str(r['precision']):>9}")
+
+
+if __name__ == "__main__":
+    main()
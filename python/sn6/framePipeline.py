@@ -0,0 +1,365 @@
+## sn6 MJPEG 스트리머 프레임 처리 pipeline (여러 프로세스)
+##
+## 기존 stream_processor 는 한 스레드에서 capture -> 색 변환 -> blur -> 움직임 감지 -> 얼굴 검출 -> JPEG 인코딩을
+## 차례로 하기 때문에 FPS 가 모든 단계 시간의 합으로 정해지고, GIL 때문에 스레드를 늘려도 코어를 나눠 쓰지 못했습니다.
+## FramePipeline 은 단계를 프로세스로 나눠 서로 다른 프레임을 동시에 처리합니다.
+##
+##   capture (메인 프로세스 스레드) -> preprocess -> detect (x detect_workers) -> encode -> output(jpeg)
+##
+## - 프레임은 shared memory 의 slot (raw / rgb / gray) 에 두고 queue 로는 slot 번호와 검출 결과만 보냄
+## - 각 단계는 queue 에 쌓인 것 중 가장 최근 프레임만 처리하고 나머지 slot 은 바로 반납 (밀리면 오래된 프레임을 버림)
+## - 빈 slot 이 없으면 capture 가 새 프레임을 버림. 카메라는 계속 읽으므로 지연이 쌓이지 않음
+## - 프레임마다 단계별 완료 시각을 기록해 interval 초마다 단계별 지연, end-to-end 지연, 출력 FPS, 버린 수를 로그로 남김
+##
+## 얼굴 검출은 faceScheduler.FaceScheduler (축소 영상, 가끔 검출 + 추적) 로 하며 face_options 로 설정합니다.
+## scheduler 는 검출 주기와 추적에 이전 프레임 상태를 쓰므로 worker 가 프레임을 나눠 받으면 맞지 않습니다.
+## 그래서 detect worker 는 기본 1 개이고, 여러 개는 매 프레임 검출하는 설정 (every=1, motion_only=False,
+## track=False) 에서만 허용합니다.
+##
+##   python senario_6_Pi4.py --simulate --host 127.0.0.1 --detect-workers 2 --face-every 1 --face-always --face-no-track
+
+import logging
+import multiprocessing as mp
+import queue
+import signal
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+import faceScheduler
+
+STAGES = ('capture', 'preprocess', 'detect', 'encode')
+MOTION_MIN_AREA = 1000   # 이보다 작은 변화 영역은 무시
+REFERENCE_EVERY = 10     # 움직임 비교 기준 프레임을 바꾸는 주기 (처리한 프레임 수)
+
+Box = Tuple[int, int, int, int]
+
+
+# ---------------------------------------------------------------- 처리 함수 (단일 스레드 / pipeline 공용)
+
+def load_face_cascade():
+    return cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+
+
+def to_gray(frame, out=None):
+    """그레이스케일 + blur (움직임 감지 / 얼굴 검출 입력)"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.GaussianBlur(gray, (21, 21), 0, dst=out)
+
+
+def motion_boxes(reference, gray, min_area: int = MOTION_MIN_AREA) -> List[Box]:
+    frame_delta = cv2.absdiff(reference, gray)
+    thresh = cv2.threshold(frame_delta, 30, 255, cv2.THRESH_BINARY)[1]
+    thresh = cv2.dilate(thresh, None, iterations=2)
+    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return [tuple(int(v) for v in cv2.boundingRect(c)) for c in contours if cv2.contourArea(c) >= min_area]
+
+
+def face_boxes(cascade, gray) -> List[Box]:
+    return [tuple(int(v) for v in face) for face in cascade.detectMultiScale(gray, 1.1, 4)]
+
+
+def draw_boxes(frame, motion: List[Box], faces: List[Box]):
+    for (x, y, w, h) in motion:
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+    for (x, y, w, h) in faces:
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 0), 2)
+    return frame
+
+
+class MotionReference:
+    """REFERENCE_EVERY 프레임마다 기준 프레임을 바꾸며 움직임 영역 검출"""
+
+    def __init__(self, every: int = REFERENCE_EVERY):
+        self.every = every
+        self.reference = None
+        self.count = 0
+
+    def step(self, gray) -> List[Box]:
+        boxes = motion_boxes(self.reference, gray) if self.reference is not None else []
+        if self.reference is None or self.count % self.every == 0:
+            self.reference = gray.copy()
+            self.count = 0
+        self.count += 1
+        return boxes
+
+
+# ---------------------------------------------------------------- shared memory slot
+
+class FrameSlots:
+    """slot 개수만큼의 raw (카메라 그대로) / rgb / gray 배열을 shared memory 에 둠"""
+
+    def __init__(self, spec: Dict, create: bool = False):
+        self.spec = spec
+        self.memory: List[shared_memory.SharedMemory] = []
+        self.arrays = {}
+        for name, shape in spec['shapes'].items():
+            full = (spec['count'],) + tuple(shape)
+            if create:
+                shm = shared_memory.SharedMemory(create=True, size=int(np.prod(full)))
+                spec['names'][name] = shm.name
+            else:
+                shm = shared_memory.SharedMemory(name=spec['names'][name])
+            self.memory.append(shm)
+            self.arrays[name] = np.ndarray(full, dtype=np.uint8, buffer=shm.buf)
+
+    @classmethod
+    def create(cls, count: int, raw_shape: Tuple[int, ...]) -> 'FrameSlots':
+        height, width = raw_shape[:2]
+        spec = {'count': count, 'names': {},
+                'shapes': {'raw': raw_shape, 'rgb': (height, width, 3), 'gray': (height, width)}}
+        return cls(spec, create=True)
+
+    def __getitem__(self, name: str):
+        return self.arrays[name]
+
+    def close(self, unlink: bool = False) -> None:
+        self.arrays = {}
+        for shm in self.memory:
+            shm.close()
+            if unlink:
+                shm.unlink()
+        self.memory = []
+
+
+# ---------------------------------------------------------------- 단계 프로세스
+
+def _latest(inbox, free, dropped, index: int, stop):
+    """queue 에서 가장 최근 항목만 꺼내고 나머지 slot 은 반납. 종료면 None"""
+    item = None
+    while item is None:
+        if stop.is_set():
+            return None
+        try:
+            item = inbox.get(timeout=0.5)
+        except queue.Empty:
+            continue
+    while True:
+        if item is None:  # 종료 신호. 같은 queue 를 읽는 다른 worker 에게도 전달
+            inbox.put(None)
+            return None
+        try:
+            newer = inbox.get_nowait()
+        except queue.Empty:
+            return item
+        if newer is None:
+            inbox.put(None)  # 같은 queue 를 읽는 다른 worker 용
+            return item
+        free.put(item['slot'])
+        with dropped.get_lock():
+            dropped[index] += 1
+        item = newer
+
+
+def _stage_main(stage: str, spec: Dict, inbox, outbox, free, dropped, stop, face_options: Dict) -> None:
+    # Ctrl+C 는 프로세스 그룹 전체에 가므로 무시하고 메인 프로세스의 close() (stop) 로만 종료
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    slots = FrameSlots(spec)
+    index = STAGES.index(stage)
+    motion = MotionReference() if stage == 'preprocess' else None
+    faces = faceScheduler.FaceScheduler(load_face_cascade(), **face_options) if stage == 'detect' else None
+    try:
+        while True:
+            item = _latest(inbox, free, dropped, index, stop)
+            if item is None:
+                break
+            slot = item['slot']
+            rgb, gray = slots['rgb'][slot], slots['gray'][slot]
+            if stage == 'preprocess':
+                cv2.cvtColor(slots['raw'][slot], cv2.COLOR_BGR2RGB, dst=rgb)
+                to_gray(rgb, out=gray)
+                item['motion'] = motion.step(gray)
+            elif stage == 'detect':
+                item['faces'] = faces.step(gray, item['motion'])
+                item['detected'] = faces.since_detect == 0
+            else:
+                draw_boxes(rgb, item['motion'], item['faces'])
+                ok, jpeg = cv2.imencode('.jpg', rgb)
+                free.put(slot)
+                item['jpeg'] = jpeg.tobytes() if ok else None
+            item['times'][stage] = time.monotonic()
+            outbox.put(item)
+    finally:
+        # 종료 중에는 다음 단계가 더 읽지 않으므로 queue 에 남은 것을 기다리지 않음
+        outbox.cancel_join_thread()
+        free.cancel_join_thread()
+        slots.close()
+
+
+# ---------------------------------------------------------------- 통계
+
+class PipelineStats:
+    def __init__(self, interval: float = 5.0, logger: Optional[logging.Logger] = None):
+        self.interval = interval
+        self.logger = logger or logging.getLogger(__name__)
+        self.totals = {'frames': 0, 'dropped': dict.fromkeys(STAGES, 0)}
+        self._reset(time.monotonic())
+
+    def _reset(self, now: float) -> None:
+        self.started = now
+        self.frames = 0
+        self.detections = 0
+        self.latency = {name: [0.0, 0.0] for name in STAGES[1:] + ('e2e',)}  # 합, 최대 (초)
+
+    def record(self, times: Dict[str, float], now: float, detected: bool = True) -> None:
+        self.frames += 1
+        self.detections += detected
+        self.totals['frames'] += 1
+        previous = times['capture']
+        for stage in STAGES[1:]:
+            self._add(stage, times[stage] - previous)
+            previous = times[stage]
+        self._add('e2e', now - times['capture'])
+
+    def _add(self, name: str, value: float) -> None:
+        entry = self.latency[name]
+        entry[0] += value
+        entry[1] = max(entry[1], value)
+
+    def summary(self, now: Optional[float] = None) -> Dict:
+        elapsed = max((now or time.monotonic()) - self.started, 1e-9)
+        result = {'elapsed': round(elapsed, 1), 'frames': self.frames, 'fps': round(self.frames / elapsed, 1),
+                  'face_detections': self.detections, 'dropped': dict(self.totals['dropped'])}
+        for name, (total, maximum) in self.latency.items():
+            if self.frames:
+                result[name] = (round(total / self.frames * 1000, 1), round(maximum * 1000, 1))
+        return result
+
+    def maybe_log(self, now: float) -> None:
+        if now - self.started < self.interval:
+            return
+        s = self.summary(now)
+        stages = ' '.join(f"{name}={'/'.join(str(v) for v in s[name])}ms" for name in self.latency if name in s)
+        drops = ','.join(f"{stage}:{count}" for stage, count in s['dropped'].items())
+        self.logger.info(f"pipeline {s['elapsed']}s fps={s['fps']} {stages} (mean/max) "
+                         f"face_detect={s['face_detections']}/{s['frames']} dropped={drops}")
+        self._reset(now)
+
+
+# ---------------------------------------------------------------- pipeline
+
+class FramePipeline:
+    def __init__(self, output: Callable[[bytes], None], detect_workers: int = 1, slots: Optional[int] = None,
+                 stats_interval: float = 5.0, face_options: Optional[Dict] = None,
+                 logger: Optional[logging.Logger] = None):
+        """
+        output         : 인코딩한 JPEG bytes 를 받는 함수 (StreamingOutput.write)
+        detect_workers : 얼굴 검출 프로세스 수. 2 이상은 face_options 가 매 프레임 검출 (FaceScheduler.stateless) 일 때만
+        face_options   : faceScheduler.FaceScheduler 설정 (scale, every, motion_only, max_idle, track)
+        slots          : shared memory frame slot 수 (기본: 단계 수 + detect_workers + 2)
+        """
+        face_options = dict(face_options or {})
+        if detect_workers > 1 and not faceScheduler.FaceScheduler(None, **face_options).stateless:
+            # worker 마다 scheduler 가 따로 있으면 검출 주기 counter 와 optical flow 가 프레임 일부만 보게 됨
+            raise ValueError("detect_workers > 1 requires face_options every=1, motion_only=False, track=False")
+        self.output = output
+        self.detect_workers = detect_workers
+        self.face_options = face_options
+        self.slot_count = slots or len(STAGES) + detect_workers + 2
+        self.logger = logger or logging.getLogger(__name__)
+        self.stats = PipelineStats(stats_interval, self.logger)
+        # Picamera2 등 스레드를 가진 객체가 있는 프로세스를 fork 하지 않도록 spawn
+        self.ctx = mp.get_context('spawn')
+        self.slots: Optional[FrameSlots] = None
+        self.processes: List = []
+        self.stop_event = self.ctx.Event()
+        self.dropped = self.ctx.Array('i', len(STAGES))
+        self.free = self.ctx.Queue()
+        self.queues = {stage: self.ctx.Queue() for stage in STAGES[1:]}
+        self.results = self.ctx.Queue()
+        self.sequence = 0
+        self.last_output = -1
+        self._receiver: Optional[threading.Thread] = None
+
+    def _start(self, raw_shape: Tuple[int, ...]) -> None:
+        self.slots = FrameSlots.create(self.slot_count, raw_shape)
+        for slot in range(self.slot_count):
+            self.free.put(slot)
+        outputs = {'preprocess': self.queues['detect'], 'detect': self.queues['encode'], 'encode': self.results}
+        workers = {'preprocess': 1, 'detect': self.detect_workers, 'encode': 1}
+        for stage in STAGES[1:]:
+            for i in range(workers[stage]):
+                process = self.ctx.Process(target=_stage_main, name=f"pipeline-{stage}-{i}", daemon=True,
+                                           args=(stage, self.slots.spec, self.queues[stage], outputs[stage],
+                                                 self.free, self.dropped, self.stop_event, self.face_options))
+                process.start()
+                self.processes.append(process)
+        self._receiver = threading.Thread(target=self._receive, name='pipeline-output', daemon=True)
+        self._receiver.start()
+        self.logger.info(f"frame pipeline started: {self.slot_count} slots of {raw_shape}, "
+                         f"detect_workers={self.detect_workers}")
+
+    def _receive(self) -> None:
+        while not self.stop_event.is_set():
+            try:
+                item = self.results.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+            now = time.monotonic()
+            # detect worker 가 여럿이면 순서가 바뀔 수 있음. 이미 더 새 프레임을 내보냈으면 버림
+            if item['seq'] < self.last_output or item['jpeg'] is None:
+                self._drop('encode')
+                continue
+            self.last_output = item['seq']
+            self.output(item['jpeg'])
+            self.stats.record(item['times'], now, item.get('detected', True))
+            for i, stage in enumerate(STAGES):
+                self.stats.totals['dropped'][stage] = self.dropped[i]
+            self.stats.maybe_log(now)
+
+    def _drop(self, stage: str) -> None:
+        with self.dropped.get_lock():
+            self.dropped[STAGES.index(stage)] += 1
+
+    def submit(self, frame) -> bool:
+        """capture 한 프레임을 빈 slot 에 복사해 pipeline 에 넣음. 빈 slot 이 없으면 버리고 False"""
+        if frame is None:
+            return False
+        if self.slots is None:
+            self._start(frame.shape)
+        if frame.shape != self.slots['raw'].shape[1:]:
+            self.logger.warning(f"Frame shape changed {frame.shape}, dropped")
+            self._drop('capture')
+            return False
+        try:
+            slot = self.free.get_nowait()
+        except queue.Empty:
+            self._drop('capture')
+            return False
+        np.copyto(self.slots['raw'][slot], frame)
+        self.queues['preprocess'].put({'seq': self.sequence, 'slot': slot, 'times': {'capture': time.monotonic()},
+                                       'motion': [], 'faces': []})
+        self.sequence += 1
+        return True
+
+    def run(self, capture: Callable[[], Optional[np.ndarray]]) -> None:
+        """capture() 로 읽은 프레임을 계속 넣음 (close() 까지)"""
+        while not self.stop_event.is_set():
+            frame = capture()
+            try:
+                self.submit(frame)
+            except (ValueError, OSError):
+                if self.stop_event.is_set():  # close() 와 겹침
+                    break
+                raise
+
+    def close(self) -> None:
+        self.stop_event.set()
+        for stage, inbox in self.queues.items():
+            inbox.put(None)
+        for process in self.processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+        if self._receiver is not None:
+            self._receiver.join(timeout=2.0)
+        if self.slots is not None:
+            self.slots.close(unlink=True)
+            self.slots = None
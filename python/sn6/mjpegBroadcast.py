@@ -0,0 +1,84 @@
+## MJPEG (multipart/x-mixed-replace) 방송
+##
+## 기존 StreamingHandler 는 client 마다, 프레임마다 send_header 로 헤더를 새로 만들고 boundary / 헤더 / JPEG / CRLF 를
+## 네 번 나눠 write 했습니다. 또 Condition.wait() 로 깨어난 뒤 쓰는 동안 온 프레임 알림은 놓쳐서
+## 이미 새 프레임이 있어도 그 다음 프레임까지 기다렸습니다.
+## MjpegBroadcaster 는 프레임마다 한 번만 (boundary + 헤더 + JPEG + CRLF) chunk 를 만들어 번호를 붙여 둡니다.
+## client 마다 (ThreadingMixIn 이 만든 요청 스레드가 writer) 마지막으로 보낸 번호보다 새 chunk 가 있으면
+## 가장 최근 것 하나만 write 한 번으로 보냅니다 (drop-to-latest). 느린 client 는 자기 프레임만 건너뛰고
+## 다른 client 나 프레임 처리 스레드를 늦추지 않습니다.
+##
+## sn6/mjpegBroadcast.py 와 sn6/asus_tinkerBoard/mjpegBroadcast.py 는 같은 파일입니다.
+
+import io
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+BOUNDARY = 'FRAME'
+CONTENT_TYPE = f'multipart/x-mixed-replace; boundary={BOUNDARY}'
+
+
+def make_chunk(jpeg: bytes) -> bytes:
+    """multipart part 하나 (boundary, 헤더, JPEG, CRLF)"""
+    header = f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n".encode('ascii')
+    return b''.join((header, jpeg, b'\r\n'))
+
+
+class MjpegBroadcaster(io.BufferedIOBase):
+    """StreamingOutput 대신 사용. write(jpeg) 는 처리 스레드, stream() 은 client 요청 스레드에서 호출"""
+
+    def __init__(self):
+        self.chunk: Optional[bytes] = None
+        self.sequence = 0
+        self.condition = threading.Condition()
+        self.clients = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, buf) -> int:
+        chunk = make_chunk(bytes(buf))  # lock 밖에서 만듦
+        with self.condition:
+            self.chunk = chunk
+            self.sequence += 1
+            self.condition.notify_all()
+        return len(buf)
+
+    def latest(self, after: int, timeout: Optional[float] = None) -> Tuple[int, Optional[bytes]]:
+        """번호가 after 보다 큰 chunk 가 생길 때까지 기다려 가장 최근 (번호, chunk). timeout 이면 (after, None)"""
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.sequence > after, timeout):
+                return after, None
+            return self.sequence, self.chunk
+
+    def stream(self, write: Callable[[bytes], Any], stats: Optional[Dict[str, int]] = None,
+               idle_timeout: Optional[float] = 10.0) -> None:
+        """
+        client 연결이 끊길 때까지 (write 에서 예외) 새 chunk 를 보냄. 연결 직후에는 현재 프레임부터.
+        idle_timeout 초 동안 새 프레임이 없으면 TimeoutError (카메라가 멈추면 write 가 없어 끊긴 client 를 알 수 없음).
+        stats 에 보낸 수 (sent) 와 이 client 가 늦어서 건너뛴 프레임 수 (skipped) 를 셈
+        """
+        stats = stats if stats is not None else {}
+        stats.setdefault('sent', 0)
+        stats.setdefault('skipped', 0)
+        with self.condition:
+            last = max(self.sequence - 1, 0)
+            self.clients += 1
+        waiting_since = time.monotonic()
+        try:
+            while True:
+                sequence, chunk = self.latest(last, timeout=1.0)
+                if chunk is None:
+                    if idle_timeout is not None and time.monotonic() - waiting_since >= idle_timeout:
+                        raise TimeoutError(f"no frame for {idle_timeout} s")
+                    continue
+                if stats['sent']:
+                    stats['skipped'] += sequence - last - 1
+                write(chunk)
+                stats['sent'] += 1
+                last = sequence
+                waiting_since = time.monotonic()
+        finally:
+            with self.condition:
+                self.clients -= 1
@@ -1,12 +1,14 @@
-import io
 import logging
 import socketserver
-from threading import Condition, Thread
+from threading import Thread
 from http import server
-from picamera2 import Picamera2
+import argparse
 import cv2
-import numpy as np
 import sys
+import sensorDrivers
+import framePipeline
+import faceScheduler
+import mjpegBroadcast
 sys.path.append('/usr/lib/python3/dist-packages')
 
 PAGE = """\
@@ -21,17 +23,9 @@ PAGE = """\
 </html>
 """
 
-class StreamingOutput(io.BufferedIOBase):
-    def __init__(self):
-        self.frame = None
-        self.condition = Condition()
-
-    def write(self, buf):
-        with self.condition:
-            self.frame = buf
-            self.condition.notify_all()
-
 class StreamingHandler(server.BaseHTTPRequestHandler):
+    timeout = 10  # 이 시간 동안 한 프레임도 받지 못하는 client 는 연결 종료
+
     def do_GET(self):
         if self.path == '/':
             self.send_response(301)
@@ -49,23 +43,16 @@ class StreamingHandler(server.BaseHTTPRequestHandler):
             self.send_header('Age', 0)
             self.send_header('Cache-Control', 'no-cache, private')
             self.send_header('Pragma', 'no-cache')
-            self.send_header('Content-Type', 'multipart/x-mixed-replace; boundary=FRAME')
+            self.send_header('Content-Type', mjpegBroadcast.CONTENT_TYPE)
             self.end_headers()
+            # 프레임마다 미리 만든 chunk 를 write 한 번으로. 늦으면 밀린 프레임은 건너뛰고 최신 프레임만 보냄
+            stats = {}
             try:
-                while True:
-                    with output.condition:
-                        output.condition.wait()
-                        frame = output.frame
-                    self.wfile.write(b'--FRAME\r\n')
-                    self.send_header('Content-Type', 'image/jpeg')
-                    self.send_header('Content-Length', len(frame))
-                    self.end_headers()
-                    self.wfile.write(frame)
-                    self.wfile.write(b'\r\n')
+                output.stream(self.wfile.write, stats, idle_timeout=self.timeout)
             except Exception as e:
                 logging.warning(
-                    'Removed streaming client %s: %s',
-                    self.client_address, str(e))
+                    'Removed streaming client %s: %s (sent %d, skipped %d frames)',
+                    self.client_address, str(e), stats.get('sent', 0), stats.get('skipped', 0))
         else:
             self.send_error(404)
             self.end_headers()
@@ -75,67 +62,94 @@ class StreamingServer(socketserver.ThreadingMixIn, server.HTTPServer):
     daemon_threads = True
 
 # OpenCV 얼굴 검출기 로드
-face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+face_cascade = framePipeline.load_face_cascade()
 
-def process_frame(frame, reference_frame):
-    # BGR에서 그레이스케일로 변환
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    gray = cv2.GaussianBlur(gray, (21, 21), 0)
-    
-    # 프레임 변화 감지
-    if reference_frame is not None:
-        frame_delta = cv2.absdiff(reference_frame, gray)
-        thresh = cv2.threshold(frame_delta, 30, 255, cv2.THRESH_BINARY)[1]
-        thresh = cv2.dilate(thresh, None, iterations=2)
-        contours, _ = cv2.findContours(thresh.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        for contour in contours:
-            if cv2.contourArea(contour) < 1000:  # Increased area threshold to reduce sensitivity
-                continue
-            (x, y, w, h) = cv2.boundingRect(contour)
-            cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
+def process_frame(frame, motion, faces):
+    # BGR에서 그레이스케일로 변환 + blur
+    gray = framePipeline.to_gray(frame)
     
-    # 얼굴 검출
-    faces = face_cascade.detectMultiScale(gray, 1.1, 4)
+    # 프레임 변화 감지 (motion: framePipeline.MotionReference, 10프레임마다 기준 프레임 교체)
+    moving = motion.step(gray)
     
-    # 검출된 얼굴에 사각형 그리기
-    for (x, y, w, h) in faces:
-        cv2.rectangle(frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
+    # 얼굴 검출 (faces: faceScheduler.FaceScheduler, 축소 영상에서 가끔 검출하고 사이 프레임은 추적)
+    face_boxes = faces.step(gray, moving)
     
-    return frame, gray
+    # 움직임 영역 (초록), 검출된 얼굴 (파랑) 에 사각형 그리기
+    return framePipeline.draw_boxes(frame, moving, face_boxes), gray
 
-picam2 = Picamera2()
-picam2.configure(picam2.create_video_configuration(main={"size": (640, 480)}))
-output = StreamingOutput()
+output = mjpegBroadcast.MjpegBroadcaster()
 
-def stream_processor():
+def stream_processor(camera, face_options):
+    """한 스레드에서 모든 단계를 차례로 처리 (--single-thread)"""
     global output
-    frame_count = 0
-    reference_frame = None
+    motion = framePipeline.MotionReference()
+    faces = faceScheduler.FaceScheduler(face_cascade, **face_options)
     while True:
-        buffer = picam2.capture_array("main") 
+        buffer = camera.capture_array("main")
         buffer = cv2.cvtColor(buffer, cv2.COLOR_BGR2RGB)
         
-        processed_frame, gray = process_frame(buffer, reference_frame)
-        
-        if reference_frame is None or frame_count % 10 == 0:
-            reference_frame = gray
-            frame_count = 0  # Reset frame count every 10 frames
-        frame_count += 1
+        processed_frame, gray = process_frame(buffer, motion, faces)
         
         _, processed_jpeg = cv2.imencode('.jpg', processed_frame)
         output.write(processed_jpeg.tobytes())
 
-# 스트림 처리를 위한 별도의 스레드 시작
-processor_thread = Thread(target=stream_processor)
-processor_thread.daemon = True
-processor_thread.start()
+def main(host: str = '192.168.0.4', port: int = 8000, simulate: bool = False, video=None, speed: float = 1.0,
+         single_thread: bool = False, detect_workers: int = 1, face_options=None):
+    """
+    simulate       : 카메라 대신 sensorDrivers.SimulatedCamera (움직이는 사각형)
+    video          : 녹화 영상 파일을 카메라 대신 재생 (speed 배속)
+    single_thread  : pipeline 대신 기존처럼 한 스레드에서 처리
+    detect_workers : pipeline 의 얼굴 검출 프로세스 수
+    face_options   : 얼굴 검출 scheduler 설정 (faceScheduler.FaceScheduler 인자)
+    """
+    face_options = face_options or {}
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    camera = sensorDrivers.open_camera('picamera2', size=(640, 480), simulate=simulate, video=video,
+                                       clock=sensorDrivers.SimClock(speed))
+
+    # 스트림 처리를 위한 별도의 스레드 시작
+    # pipeline: 단계별 프로세스로 나눠 처리 (framePipeline). 밀리면 오래된 프레임은 버림
+    pipeline = None if single_thread else framePipeline.FramePipeline(output.write, detect_workers=detect_workers,
+                                                                      face_options=face_options)
+    if pipeline is None:
+        processor_thread = Thread(target=stream_processor, args=(camera, face_options))
+    else:
+        processor_thread = Thread(target=pipeline.run, args=(lambda: camera.capture_array("main"),))
+    processor_thread.daemon = True
+    processor_thread.start()
+
+    camera.start()
 
-picam2.start()
+    try:
+        address = (host, port)
+        server = StreamingServer(address, StreamingHandler)
+        server.serve_forever()
+    finally:
+        if pipeline is not None:
+            pipeline.close()
+        camera.stop()
 
-try:
-    address = ('192.168.0.4', 8000)
-    server = StreamingServer(address, StreamingHandler)
-    server.serve_forever()
-finally:
-    picam2.stop()
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Scenario 6 Raspberry Pi 4 MJPEG streamer")
+    parser.add_argument('--host', default='192.168.0.4')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--simulate', action='store_true', help="카메라 없이 시뮬레이션 영상으로 실행")
+    parser.add_argument('--video', default=None, help="카메라 대신 재생할 녹화 영상 파일")
+    parser.add_argument('--speed', type=float, default=1.0, help="시뮬레이션/녹화 영상 배속")
+    parser.add_argument('--single-thread', action='store_true', help="pipeline 없이 한 스레드에서 처리")
+    parser.add_argument('--detect-workers', type=int, default=1,
+                        help="얼굴 검출 프로세스 수 (2 이상은 --face-every 1 --face-always --face-no-track 일 때만)")
+    # 얼굴 검출 속도/정확도 조절 (faceScheduler.py 로 녹화 영상에서 비교). --face-scale 1 --face-every 1 --face-always 는 기존 방식
+    parser.add_argument('--face-scale', type=float, default=0.5, help="얼굴 검출 영상 축소 비율")
+    parser.add_argument('--face-every', type=int, default=5, help="얼굴 검출 사이 최소 프레임 수")
+    parser.add_argument('--face-max-idle', type=int, default=30, help="움직임이 없어도 검출하는 주기 (프레임)")
+    parser.add_argument('--face-always', action='store_true', help="움직임과 관계없이 --face-every 마다 검출")
+    parser.add_argument('--face-no-track', action='store_true', help="검출 사이 box 추적 끄기")
+    args = parser.parse_args()
+    face_options = {'scale': args.face_scale, 'every': args.face_every, 'max_idle': args.face_max_idle,
+                    'motion_only': not args.face_always, 'track': not args.face_no_track}
+    if (args.detect_workers > 1 and not args.single_thread
+            and not faceScheduler.FaceScheduler(None, **face_options).stateless):
+        parser.error("--detect-workers > 1 requires --face-every 1 --face-always --face-no-track")
+    main(args.host, args.port, simulate=args.simulate, video=args.video, speed=args.speed,
+         single_thread=args.single_thread, detect_workers=args.detect_workers, face_options=face_options)
@@ -3,95 +3,133 @@
 ## Bluetooth module which is linked with ASUS TinkerBoard 2 has below serial number
 ## 6C:EC:EB:23:74:65
 
-import serial
-import spidev
-import time
-import sys
-import mcp3208
-import ASUS.GPIO as GPIO
-import threading
+import argparse
 import socketCommunication
-from threading import Lock
+import pwmBackend
+import sensorSnapshot
+import sensorDrivers
+import sensorTrace
+import adcSampler
+import bluetoothHandler
+try:
+    import ASUS.GPIO as GPIO
+except ImportError:  # TinkerBoard 가 아닌 곳에서 --simulate 로 실행 (LED 는 mock PWM)
+    GPIO = None
 
 class SensorData:
+    """
+    값은 sensorSnapshot 으로 보관. 메인 루프 한 곳에서만 update_data 를 호출하고,
+    TCP 전송 스레드의 get_data 는 lock 없이 현재 snapshot 을 읽음
+    """
     def __init__(self):
-        self.light_percentage = 0.0
-        self.lock = Lock()
+        self.store = sensorSnapshot.SnapshotStore({'light_percentage': 0.0}, format=self._format)
+
+    @staticmethod
+    def _format(snapshot):
+        return {
+            'light_percentage': f"{snapshot.light_percentage:.2f}",
+        }
         
     def update_data(self, light_percentage):
-        with self.lock:
-            self.light_percentage = light_percentage
+        self.store.publish(light_percentage=light_percentage)
     
     def get_data(self):
-        with self.lock:
-            return {
-                'light_percentage': f"{self.light_percentage:.2f}",
-            }
+        return self.store.current.as_dict()
 
 # GPIO and Serial setup
 channel = 0
 led_pin = 21
-serialB = serial.Serial("/dev/ttyS0", baudrate=9600, timeout=1.0)
-bus, device = 5, 0
-spi = spidev.SpiDev()
-spi.open(bus, device)
-spi.max_speed_hz = 1000000
-adc = mcp3208.ADC(spi)
-GPIO.setmode(GPIO.BOARD)
-GPIO.setup(led_pin, GPIO.OUT)
-pwm = GPIO.PWM(led_pin, 1000.0)  # 1000.0Hz
-pwm.start(0.0)  # 0.0~100.0
+# LED 를 하드웨어 PWM 핀에 연결했다면 {BOARD 핀: (pwmchip, channel)} 을 지정 (/sys/class/pwm 확인)
+# 비어 있으면 ASUS.GPIO 소프트웨어 PWM 사용
+led_hardware_pwm = {}
+spi_bus, spi_device = 5, 0
+# burst 주기마다 변환 adc_samples 개 (채널당 1600 샘플/s) 를 평균하고, adc_tau 초 시간 상수로 smoothing
+adc_samples, adc_burst_interval, adc_tau = 16, 0.01, 0.2
 
-def read_bluetooth():
-    if serialB.in_waiting:
-        return serialB.readline().decode().strip()
-    return None
+def main(simulate: bool = False, speed: float = 1.0, server_host: str = '192.168.0.2', record=None, replay=None):
+    """
+    simulate : Bluetooth, MCP3208, LED 대신 sensorDrivers 시뮬레이션 장치와 mock PWM 사용 (speed 배속)
+    record   : ADC 값, Bluetooth 수신/송신, TCP 전송 데이터를 sensorTrace 파일로 기록
+    replay   : ADC, Bluetooth 대신 sensorTrace 기록을 speed 배속으로 재생 (LED 는 mock PWM)
+    """
+    offline = simulate or replay is not None
+    clock = sensorDrivers.SimClock(speed if offline else 1.0)
+    trace = sensorTrace.TraceSession(record=record, replay=replay, clock=clock)
+    serialB = trace.serial(lambda: sensorDrivers.open_serial("/dev/ttyS0", 9600, timeout=1.0,
+                                                             profile='bluetooth' if simulate else None, clock=clock))
+    adc = trace.adc(lambda: sensorDrivers.open_adc(spi_bus, spi_device, 1000000, simulate=simulate, clock=clock))
+    sampler = adcSampler.AdcSampler(adc, (channel,), adc_samples, adc_burst_interval, adc_tau, clock)
+    if GPIO is not None:
+        GPIO.setmode(GPIO.BOARD)
+    pwm = pwmBackend.create_pwm(led_pin, 1000.0, backend='mock' if offline else 'auto', gpio=GPIO,
+                                hardware_pins=led_hardware_pwm)  # 1000.0Hz
+    pwm.start(0.0)  # 0.0~100.0
 
-def main():
     # TCP 클라이언트 및 센서 데이터 객체 초기화
     sensor_data = SensorData()
-    tcp_client = socketCommunication.TCPClient('192.168.0.2', 12345)
-    
-    # TCP 연결 시도
-    if not tcp_client.start():
-        print("Failed to establish TCP connection")
-        return
-        
+    tcp_client = socketCommunication.TCPClient(server_host, 12345)
+
     def get_sensor_data():
         """TCP 클라이언트가 호출할 콜백 함수"""
         return sensor_data.get_data()
-    
-    # 주기적 데이터 전송 시작 (2초 간격)
-    tcp_client.start_periodic_send(get_sensor_data, 2.0)
+
+    def answer_light(message):
+        """Bluetooth 스레드에서 호출. ADC 를 읽지 않고 현재 snapshot 값으로 바로 응답"""
+        return f"Light percentage: {sensor_data.store.current.light_percentage:.2f}%\n"
+
+    # 키워드 -> 응답 함수. 명령을 추가할 때는 여기에 등록
+    bluetooth = bluetoothHandler.BluetoothHandler(serialB, {'light': answer_light})
 
     try:
+        # TCP 연결 시도
+        if not tcp_client.start():
+            print("Failed to establish TCP connection")
+            return
+
+        # 주기적 데이터 전송 시작 (2초 간격)
+        tcp_client.start_periodic_send(trace.tcp_callback(get_sensor_data), 2.0)
+
+        sampler.start()
+        sampler.wait_new(1.0)
+        bluetooth.start()
         while True:
-            sensorInput = adc.analogRead(channel)
+            sensorInput = sampler.latest(channel)
+            if sensorInput is None:
+                sampler.wait_new(1.0)
+                continue
             lightPercentage = sensorInput / 4095 * 100.0
             pwm.ChangeDutyCycle(lightPercentage)
             
-            # 센서 데이터 업데이트
+            # 센서 데이터 업데이트 (Bluetooth 응답도 이 값을 사용)
             sensor_data.update_data(lightPercentage)
-            
-            bluetooth_data = read_bluetooth()
-            if bluetooth_data:
-                print(f"Received Message From bluetooth: {bluetooth_data}")
-                if "light" in bluetooth_data.lower():
-                    serialB.write(f"Light percentage: {lightPercentage:.2f}%\n".encode())
-            
-            time.sleep(0.1)
+
+            clock.sleep(0.1)
 
     except KeyboardInterrupt:
         print("Program terminated by user")
+    except sensorTrace.TraceEnd:
+        print("Replay finished")
     except Exception as e:
         print(f"An error occurred: {e}")
     finally:
+        bluetooth.stop()
         tcp_client.close()
-        spi.close()
-        pwm.stop()
-        GPIO.cleanup()
+        sampler.stop()
+        adc.close()
+        pwm.close()
+        if GPIO is not None:
+            GPIO.cleanup()
         serialB.close()
+        trace.close()
         print("Cleanup completed")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scenario 7 ASUS TinkerBoard light sensor")
+    parser.add_argument('--simulate', action='store_true', help="센서 없이 시뮬레이션 장치로 실행")
+    parser.add_argument('--speed', type=float, default=1.0, help="시뮬레이션 배속 (--simulate 일 때)")
+    parser.add_argument('--tcp-host', default='192.168.0.2', help="TCP 서버 주소")
+    parser.add_argument('--record', default=None, help="센서 입력과 TCP 전송 데이터를 기록할 파일")
+    parser.add_argument('--replay', default=None, help="장치 대신 재생할 기록 파일 (--speed 배속)")
+    args = parser.parse_args()
+    main(simulate=args.simulate, speed=args.speed, server_host=args.tcp_host, record=args.record,
+         replay=args.replay)
\ No newline at end of file
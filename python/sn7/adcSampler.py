@@ -0,0 +1,205 @@
+## MCP3208 burst 샘플링 + 평균 (sn7 조도 센서)
+##
+## 기존 루프는 0.1초마다 analogRead 한 번 (SPI 호출 1회 = 샘플 1개) 의 값으로 바로 LED 밝기를 정해서
+## ADC 잡음과 형광등 깜빡임 (100/120Hz) 이 그대로 LED 밝기와 TCP 값에 나타났습니다.
+## AdcSampler 는 별도 스레드에서 burst_interval 마다 채널별 samples 개를 MCP3208.read_burst 로
+## 한 번에 변환하고 (Linux spidev 는 SPI_IOC_MESSAGE ioctl 한 번)
+##   1. burst 안에서 최소/최대를 뺀 평균 (decimation, 튀는 값 제거)
+##   2. burst 사이에는 시간 상수 tau 초의 지수 평균 (smoothing)
+## 으로 채널별 부드러운 값을 만듭니다. 읽는 쪽은 latest() 로 마지막 값을, wait_new() 로 다음 값을 가져갑니다.
+##
+##   python adcSampler.py --simulate --speed 5    # analogRead 1회와 burst 평균의 흔들림 / SPI 호출 수 비교
+
+import argparse
+import logging
+import math
+import threading
+import time
+from typing import Dict, Optional, Sequence
+
+import sensorDrivers
+
+
+class AdcSampler:
+    def __init__(self, adc, channels: Sequence[int] = (0,), samples: int = 16, burst_interval: float = 0.01,
+                 tau: float = 0.2, clock: Optional[sensorDrivers.SimClock] = None,
+                 logger: Optional[logging.Logger] = None):
+        """
+        adc            : read_burst 를 제공하는 ADC (sensorDrivers.MCP3208, sensorTrace.RecordingADC / ReplayADC).
+                         없으면 analogRead 를 samples 번 호출
+        samples        : burst 한 번에 채널마다 변환할 횟수
+        burst_interval : burst 주기 (가상 초). samples / burst_interval 이 채널당 실효 샘플링 속도
+        tau            : burst 평균에 적용할 지수 평균 시간 상수 (초). 0 이면 burst 평균을 그대로 사용
+        """
+        if samples < 1:
+            raise ValueError("samples must be at least 1")
+        self.adc = adc
+        self.channels = tuple(channels)
+        self.samples = samples
+        self.burst_interval = burst_interval
+        self.tau = tau
+        self.clock = clock or sensorDrivers.SimClock()
+        self.logger = logger or logging.getLogger(__name__)
+        self.values: Dict[int, float] = {}  # 채널별 smoothing 한 값 (0~4095)
+        self.raw: Dict[int, float] = {}     # 채널별 마지막 burst 평균
+        self.sequence = 0
+        self.stats = {'bursts': 0, 'conversions': 0, 'spi_calls': 0, 'late': 0}
+        self.end_of_input: Optional[EOFError] = None
+        self.error: Optional[Exception] = None
+        self.started: Optional[float] = None
+        self.last_step: Optional[float] = None
+        self._new = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def decimate(values: Sequence[int]) -> float:
+        """최소/최대 한 개씩 뺀 평균 (값이 3개 미만이면 단순 평균)"""
+        if len(values) < 3:
+            return sum(values) / len(values)
+        return (sum(values) - min(values) - max(values)) / (len(values) - 2)
+
+    def _read(self) -> Dict[int, list]:
+        if hasattr(self.adc, 'read_burst'):
+            before = getattr(self.adc, 'transfers', None)
+            result = self.adc.read_burst(self.channels, self.samples)
+            after = getattr(self.adc, 'transfers', None)
+            self.stats['spi_calls'] += after - before if before is not None else 1
+            return result
+        self.stats['spi_calls'] += self.samples * len(self.channels)
+        return {ch: [self.adc.analogRead(ch) for _ in range(self.samples)] for ch in self.channels}
+
+    def step(self) -> Dict[int, float]:
+        """burst 한 번 읽고 값 갱신 (스레드 없이 호출해도 됨)"""
+        now = self.clock.now()
+        bursts = self._read()
+        alpha = 1.0
+        if self.tau > 0 and self.last_step is not None:
+            alpha = 1.0 - math.exp(-max(now - self.last_step, 0.0) / self.tau)
+        if self.last_step is None:
+            self.started = now
+        self.last_step = now
+        values = dict(self.values)
+        for ch, samples in bursts.items():
+            mean = self.decimate(samples)
+            self.raw[ch] = mean
+            values[ch] = mean if ch not in values else values[ch] + alpha * (mean - values[ch])
+            self.stats['conversions'] += len(samples)
+        with self._new:
+            self.values = values  # dict 교체 - latest() 는 lock 없이 읽음
+            self.sequence += 1
+            self.stats['bursts'] += 1
+            self._new.notify_all()
+        return values
+
+    def _run(self) -> None:
+        next_due = self.clock.now()
+        while not self._stop.is_set():
+            try:
+                self.step()
+            except EOFError as e:  # 재생 기록 끝
+                self.end_of_input = e
+                break
+            except Exception as e:
+                self.logger.exception("ADC burst failed")
+                self.error = e
+                break
+            next_due += self.burst_interval
+            delay = self.clock.real_delay(next_due)
+            if delay <= 0:
+                # 밀린 주기는 건너뜀 (따라잡으려고 연달아 읽지 않음)
+                self.stats['late'] += 1
+                next_due = self.clock.now()
+            else:
+                self._stop.wait(delay)
+        with self._new:
+            self._new.notify_all()
+
+    def start(self) -> 'AdcSampler':
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='adc-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _check(self) -> None:
+        if self.end_of_input is not None:
+            raise self.end_of_input
+        if self.error is not None:
+            raise RuntimeError("ADC sampler stopped") from self.error
+
+    def latest(self, channel: Optional[int] = None) -> Optional[float]:
+        """마지막 smoothing 값 (0~4095). 아직 burst 가 없으면 None"""
+        self._check()
+        return self.values.get(self.channels[0] if channel is None else channel)
+
+    def wait_new(self, timeout: Optional[float] = None) -> Optional[Dict[int, float]]:
+        """다음 burst 가 끝날 때까지 대기 후 채널별 값. timeout 이면 None"""
+        with self._new:
+            sequence = self.sequence
+            self._new.wait_for(lambda: self.sequence != sequence or self.end_of_input is not None
+                               or self.error is not None or self._thread is None, timeout)
+            self._check()
+            return dict(self.values) if self.sequence != sequence else None
+
+    def rates(self) -> Dict[str, float]:
+        """시작 후 (가상 시간 기준) 채널당 샘플링 속도와 SPI 호출 속도"""
+        if self.started is None:
+            return {'samples_per_s': 0.0, 'spi_calls_per_s': 0.0}
+        elapsed = max(self.clock.now() - self.started, 1e-9)
+        return {'samples_per_s': round(self.stats['conversions'] / len(self.channels) / elapsed, 1),
+                'spi_calls_per_s': round(self.stats['spi_calls'] / elapsed, 1)}
+
+
+def _spread(values) -> float:
+    mean = sum(values) / len(values)
+    return math.sqrt(sum((v - mean) ** 2 for v in values) / len(values))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP3208 single read vs burst average")
+    parser.add_argument('--simulate', action='store_true', help="MCP3208 대신 시뮬레이션 ADC")
+    parser.add_argument('--speed', type=float, default=1.0, help="시뮬레이션 배속")
+    parser.add_argument('--channel', type=int, default=0)
+    parser.add_argument('--samples', type=int, default=16)
+    parser.add_argument('--interval', type=float, default=0.01, help="burst 주기 (초)")
+    parser.add_argument('--tau', type=float, default=0.2)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--spi-bus', type=int, default=5)
+    parser.add_argument('--spi-device', type=int, default=0)
+    args = parser.parse_args()
+
+    clock = sensorDrivers.SimClock(args.speed if args.simulate else 1.0)
+    # 느린 변화 (조명) 는 빼고 잡음만 비교하도록 시뮬레이션 신호는 일정한 밝기 + 잡음
+    signal = sensorDrivers.combine(*(sensorDrivers.channel(lambda t: 0.5, sensorDrivers.noise(0.02, i, 1e-5))
+                                     for i in range(8))) if args.simulate else None
+    adc = sensorDrivers.open_adc(args.spi_bus, args.spi_device, 1000000, simulate=args.simulate, clock=clock,
+                                 signal=signal)
+    sampler = AdcSampler(adc, (args.channel,), args.samples, args.interval, args.tau, clock)
+    single, smoothed = [], []
+    try:
+        sampler.start()
+        sampler.wait_new(1.0)
+        end = time.monotonic() + args.seconds / clock.speed
+        while time.monotonic() < end:
+            # 기존 루프와 같은 0.1초 주기로 analogRead 1회 값과 smoothing 값을 같이 수집
+            single.append(adc.analogRead(args.channel))
+            smoothed.append(sampler.latest(args.channel))
+            clock.sleep(0.1)
+    finally:
+        sampler.stop()
+        adc.close()
+    rates = sampler.rates()
+    print(f"readings={len(single)} analogRead std={_spread(single):.1f} counts, "
+          f"burst+smoothing std={_spread(smoothed):.1f} counts")
+    print(f"bursts={sampler.stats['bursts']} late={sampler.stats['late']} "
+          f"samples/s={rates['samples_per_s']} spi_calls/s={rates['spi_calls_per_s']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+## Bluetooth (시리얼) 명령 처리 - 센서 루프와 분리
+##
+## 기존에는 10Hz ADC 루프 안에서 in_waiting 을 확인해 명령을 읽고 답을 write 했기 때문에
+## 명령에 대한 응답이 최대 100ms + 루프 작업 시간만큼 늦고, write 가 느리면 ADC 루프도 같이 멈췄습니다.
+## BluetoothHandler 는
+##   reader 스레드 : readline 에서 기다리다가 줄이 오면 바로 dispatch table 의 handler 호출
+##   writer 스레드 : 응답 queue 를 비우며 serial.write (느린 write 는 이 스레드만 기다림)
+## 로 나눠서 명령을 받자마자 답하고, 센서 루프는 Bluetooth 를 전혀 기다리지 않습니다.
+## handler 는 값을 직접 읽지 않고 SensorData snapshot 같이 lock 없이 읽을 수 있는 값을 사용해야 합니다.
+
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+Handler = Callable[[str], Optional[str]]  # 받은 메시지 -> 보낼 응답 (None 이면 응답 없음)
+
+
+class BluetoothHandler:
+    def __init__(self, serial, commands: Optional[Dict[str, Handler]] = None, queue_size: int = 32,
+                 logger: Optional[logging.Logger] = None):
+        """
+        serial   : readline / write 를 제공하는 장치 (serial.Serial, SimulatedSerial, ReplaySerial).
+                   readline 이 timeout 으로 돌아와야 stop() 이 바로 끝남
+        commands : {키워드: handler}. 메시지 (소문자) 에 키워드가 들어 있으면 등록 순서대로 처음 맞는 handler 호출
+        """
+        self.serial = serial
+        self.commands: Dict[str, Handler] = {}
+        self.default: Optional[Handler] = None
+        self.logger = logger or logging.getLogger(__name__)
+        self.responses: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.stats = {'received': 0, 'handled': 0, 'sent': 0, 'dropped': 0, 'errors': 0}
+        self.latency = {'last': 0.0, 'max': 0.0}  # 줄을 받은 뒤 응답 write 가 끝날 때까지 (초)
+        self.end_of_input: Optional[EOFError] = None
+        self._stop = threading.Event()
+        self._threads = []
+        for keyword, handler in (commands or {}).items():
+            self.register(keyword, handler)
+
+    def register(self, keyword: str, handler: Handler) -> None:
+        self.commands[keyword.lower()] = handler
+
+    def set_default(self, handler: Optional[Handler]) -> None:
+        """어떤 키워드와도 맞지 않는 메시지용 handler"""
+        self.default = handler
+
+    def dispatch(self, message: str) -> Optional[str]:
+        lowered = message.lower()
+        for keyword, handler in self.commands.items():
+            if keyword in lowered:
+                return handler(message)
+        return self.default(message) if self.default else None
+
+    def send(self, text: str, received: Optional[float] = None) -> bool:
+        """응답을 queue 에 넣음. queue 가 가득 차면 (writer 가 밀림) 버리고 False"""
+        try:
+            self.responses.put_nowait((text, received))
+            return True
+        except queue.Full:
+            self.stats['dropped'] += 1
+            self.logger.warning(f"Bluetooth response queue full, dropped: {text.strip()!r}")
+            return False
+
+    def _read_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                line = self.serial.readline()
+            except EOFError as e:  # 재생 기록 끝
+                self.end_of_input = e
+                break
+            except Exception:
+                if self._stop.is_set():
+                    break
+                self.stats['errors'] += 1
+                self.logger.exception("Bluetooth read failed")
+                time.sleep(0.5)
+                continue
+            if self._stop.is_set():
+                break
+            message = line.decode(errors='replace').strip()
+            if not message:
+                continue
+            received = time.monotonic()
+            self.stats['received'] += 1
+            self.logger.info(f"Received Message From bluetooth: {message}")
+            try:
+                response = self.dispatch(message)
+            except Exception:
+                self.stats['errors'] += 1
+                self.logger.exception(f"Bluetooth command failed: {message!r}")
+                continue
+            self.stats['handled'] += 1
+            if response is not None:
+                self.send(response, received)
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self.responses.get()
+            if item is None:
+                break
+            text, received = item
+            try:
+                self.serial.write(text.encode())
+                self.stats['sent'] += 1
+            except Exception:
+                self.stats['errors'] += 1
+                self.logger.exception("Bluetooth write failed")
+                continue
+            if received is not None:
+                self.latency['last'] = time.monotonic() - received
+                self.latency['max'] = max(self.latency['max'], self.latency['last'])
+
+    def start(self) -> 'BluetoothHandler':
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._read_loop, name='bluetooth-reader', daemon=True),
+                         threading.Thread(target=self._write_loop, name='bluetooth-writer', daemon=True)]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """남은 응답을 보낸 뒤 종료. serial 을 닫기 전에 호출"""
+        self._stop.set()
+        try:
+            self.responses.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
@@ -0,0 +1,66 @@
+## SensorData 용 snapshot 저장소
+##
+## 값을 바꿀 때마다 새 Snapshot (변경 불가) 을 만들어 참조 하나만 바꿔 끼웁니다.
+## 파이썬에서 속성 대입은 원자적이므로 읽는 쪽은 lock 없이 current 를 한 번 읽으면
+## 항상 서로 맞는 값 묶음을 얻습니다. 쓰는 쪽이 여러 스레드면 쓰는 쪽끼리만 lock 으로 순서를 정합니다.
+## get_data() 용 dict 와 JSON 은 snapshot 마다 처음 요청될 때 한 번만 만듭니다.
+
+import json
+import time
+from threading import Lock
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional
+
+
+class Snapshot:
+    """
+    version  : publish 할 때마다 증가 (캐시 키)
+    revision : timestamp 를 뺀 값이 실제로 바뀔 때만 증가 (변경 알림용)
+    """
+    __slots__ = ('version', 'revision', 'timestamp', 'values', '_format', '_dict', '_json')
+
+    def __init__(self, version: int, revision: int, timestamp: float, values: Mapping[str, Any],
+                 format: Optional[Callable[['Snapshot'], Dict[str, Any]]] = None):
+        self.version = version
+        self.revision = revision
+        self.timestamp = timestamp
+        self.values = values
+        self._format = format
+        self._dict: Optional[Dict[str, Any]] = None
+        self._json: Optional[str] = None
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self.values[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """get_data() 형식의 dict. 캐시된 dict 의 사본을 반환하므로 호출한 쪽에서 수정해도 됨"""
+        if self._dict is None:
+            # 여러 스레드가 동시에 만들어도 결과가 같으므로 lock 불필요
+            self._dict = self._format(self) if self._format else dict(self.values)
+        return dict(self._dict)
+
+    def json(self) -> str:
+        """as_dict() 의 JSON (키 정렬, 공백 없음 - Flask jsonify 와 같은 형식)"""
+        if self._json is None:
+            self._json = json.dumps(self.as_dict(), separators=(',', ':'), sort_keys=True)
+        return self._json
+
+
+class SnapshotStore:
+    def __init__(self, initial: Mapping[str, Any],
+                 format: Optional[Callable[[Snapshot], Dict[str, Any]]] = None):
+        self.format = format
+        self.write_lock = Lock()  # 쓰는 쪽끼리만 사용. 읽기는 lock 없음
+        self.current = Snapshot(0, 0, time.time(), MappingProxyType(dict(initial)), format)
+
+    def publish(self, **changes: Any) -> bool:
+        """값을 바꾼 새 snapshot 으로 교체. timestamp 외의 값이 바뀌었으면 True"""
+        with self.write_lock:
+            old = self.current
+            changed = any(old.values[name] != value for name, value in changes.items())
+            values = MappingProxyType({**old.values, **changes}) if changed else old.values
+            self.current = Snapshot(old.version + 1, old.revision + changed, time.time(), values, self.format)
+            return changed